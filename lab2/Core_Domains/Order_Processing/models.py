@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 from .value_objects import Money, OrderStatus
 from ..book_catalog.models import Book
 
@@ -9,9 +9,22 @@ from ..book_catalog.models import Book
 class OrderItem:
     book: Book
     quantity: int
+    # цена за единицу фиксируется при добавлении в заказ
+    unit_price: Optional[Money] = None
+
+    def __post_init__(self):
+        if self.unit_price is None:
+            self.unit_price = Money(self.book.price.amount, self.book.price.currency)
+
+    @property
+    def currency(self) -> str:
+        return self.unit_price.currency
+
+    def line_minor(self) -> int:
+        return self.unit_price.minor * self.quantity
 
     def total_price(self) -> Money:
-        return self.book.price.multiply(self.quantity)
+        return Money.from_minor(self.line_minor(), self.currency)
 
 
 @dataclass
@@ -23,34 +36,63 @@ class Order:
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
+    # book_id → строка и накопленная сумма; меняются только через методы ниже
+    _lines: Dict[int, OrderItem] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _total_minor: int = field(default=0, init=False, repr=False, compare=False)
+    _currency: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for item in self.items:
+            self._lines[item.book.id] = item
+            self._add_minor(item.line_minor(), item.currency)
+
     def add_item(self, book: Book, qty: int):
         if qty <= 0:
             raise ValueError("Quantity must be positive")
 
-        for item in self.items:
-            if item.book.id == book.id:
-                item.quantity += qty
-                self.touch()
-                return
+        item = self._lines.get(book.id)
+        if item is not None:
+            item.quantity += qty
+            self._add_minor(item.unit_price.minor * qty, item.currency)
+            self.touch()
+            return
 
-        self.items.append(OrderItem(book=book, quantity=qty))
+        item = OrderItem(book=book, quantity=qty)
+        self._add_minor(item.line_minor(), item.currency)
+        self._lines[book.id] = item
+        self.items.append(item)
         self.touch()
+
+    def set_quantity(self, book_id: int, qty: int):
+        if qty <= 0:
+            self.remove_item(book_id)
+            return
+
+        item = self._lines[book_id]
+        self._add_minor(item.unit_price.minor * (qty - item.quantity), item.currency)
+        item.quantity = qty
+        self.touch()
+
     def update_status(self, new_status: OrderStatus):
         self.set_status(new_status)
 
     def remove_item(self, book_id: int):
-        self.items = [i for i in self.items if i.book.id != book_id]
+        item = self._lines.pop(book_id, None)
+        if item is not None:
+            self.items = [i for i in self.items if i is not item]
+            self._total_minor -= item.line_minor()
         self.touch()
 
     def total(self) -> Money:
-        total_amount = 0
-        currency = "USD"
-
-        for item in self.items:
-            total_amount += item.total_price().amount
-            currency = item.total_price().currency
+        """O(1): сумма ведётся при изменении строк."""
+        return Money.from_minor(self._total_minor, self._currency or "USD")
 
-        return Money(total_amount, currency)
+    def _add_minor(self, minor: int, currency: str):
+        if self._currency is None:
+            self._currency = currency
+        elif currency != self._currency:
+            raise ValueError("Different currencies")
+        self._total_minor += minor
 
     def set_status(self, new_status: OrderStatus):
         self.status = new_status
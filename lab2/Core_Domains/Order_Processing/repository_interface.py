@@ -1,6 +1,7 @@
-from typing import List
+from typing import List, Optional
 from abc import ABC, abstractmethod
 from .models import Order
+from .value_objects import OPEN_ORDER_STATUSES
 
 
 class OrderRepository(ABC):
@@ -20,3 +21,10 @@ class OrderRepository(ABC):
     @abstractmethod
     def list_by_customer(self, customer_id: int) -> List[Order]:
         pass
+
+    def find_open_cart(self, customer_id: int) -> Optional[Order]:
+        """First CREATED/PENDING order; repositories override with an index."""
+        for order in self.list_by_customer(customer_id):
+            if order.status in OPEN_ORDER_STATUSES:
+                return order
+        return None
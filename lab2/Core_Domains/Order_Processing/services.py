@@ -2,15 +2,22 @@ from typing import Optional
 from ..book_catalog.repository_interface import BookRepository
 from .repository_interface import OrderRepository
 from .models import Order
-from .value_objects import OrderStatus, Money
+from .value_objects import OrderStatus, Money, OPEN_ORDER_STATUSES
 from .exceptions import OrderNotFound, InvalidOrderOperation
+from ..Shared.id_allocator import IdBlockSource, LocalIdBlockSource, HiLoIdAllocator
 
 
 class OrderService:
 
-    def __init__(self, order_repo: OrderRepository, book_repo: BookRepository):
+    def __init__(
+        self,
+        order_repo: OrderRepository,
+        book_repo: BookRepository,
+        id_source: Optional[IdBlockSource] = None,
+    ):
         self.order_repo = order_repo
         self.book_repo = book_repo
+        self._order_ids = HiLoIdAllocator(id_source or LocalIdBlockSource(), "orders")
 
     def create_order(self, customer_id: int) -> Order:
         order = Order(
@@ -22,9 +29,7 @@ class OrderService:
         return order
 
     def _generate_order_id(self):
-        # Простой вариант. В реальности — UUID или счётчик в БД.
-        import random
-        return random.randint(100000, 999999)
+        return self._order_ids.next_id()
 
     def add_book(self, order_id: int, book_id: int, qty: int):
         order = self._get_order(order_id)
@@ -41,6 +46,14 @@ class OrderService:
         order.remove_item(book_id)
         self.order_repo.save(order)
 
+    def update_quantity(self, order_id: int, book_id: int, qty: int):
+        order = self._get_order(order_id)
+        try:
+            order.set_quantity(book_id, qty)
+        except KeyError:
+            raise InvalidOrderOperation(f"Book {book_id} is not in order {order_id}")
+        self.order_repo.save(order)
+
     def pay(self, order_id: int):
         order = self._get_order(order_id)
 
@@ -91,10 +104,13 @@ class OrderService:
         order = self._get_order(order_id)
         return order.total()
     def get_user_cart(self, user_id: int):
-        orders = self.order_repo.list_by_customer(user_id)
+        # индексированный поиск в репозитории, если он есть
+        if hasattr(self.order_repo, "find_open_cart"):
+            return self.order_repo.find_open_cart(user_id)
+
         # корзина — это первый "CREATED" или "PENDING" заказ
-        for o in orders:
-            if o.status.name in ("CREATED", "PENDING"):
+        for o in self.order_repo.list_by_customer(user_id):
+            if o.status in OPEN_ORDER_STATUSES:
                 return o
         return None
 
@@ -1,6 +1,8 @@
-from dataclasses import dataclass
 from enum import Enum
 
+# единый тип денег для заказов и платежей
+from ..Shared.money import Money  # noqa: F401
+
 
 class OrderStatus(Enum):
     CREATED = "created"
@@ -11,15 +13,5 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass(frozen=True)
-class Money:
-    amount: float
-    currency: str = "USD"
-
-    def add(self, other: "Money") -> "Money":
-        if self.currency != other.currency:
-            raise ValueError("Different currencies")
-        return Money(self.amount + other.amount, self.currency)
-
-    def multiply(self, qty: int) -> "Money":
-        return Money(self.amount * qty, self.currency)
+# статусы "корзины": заказ ещё можно менять
+OPEN_ORDER_STATUSES = frozenset({OrderStatus.CREATED, OrderStatus.PENDING})
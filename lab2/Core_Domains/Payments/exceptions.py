@@ -15,3 +15,13 @@ class InsufficientFunds(PaymentError):
 class TransactionNotFound(PaymentError):
     def __init__(self, trx_id: int):
         super().__init__(f"Transaction {trx_id} not found")
+
+
+class GatewayUnavailable(PaymentError):
+    def __init__(self, reason: str = "Payment gateway unavailable"):
+        super().__init__(reason)
+
+
+class InvalidCursor(PaymentError):
+    def __init__(self, cursor: str):
+        super().__init__(f"Invalid cursor: {cursor!r}")
@@ -1,7 +1,28 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
 from .value_objects import Money
 
 
+# ключ идемпотентности текущей операции: адаптер шлюза добавляет его к запросам,
+# поэтому повтор после таймаута не спишет деньги дважды
+_idempotency_key: ContextVar[Optional[str]] = ContextVar("payment_idempotency_key", default=None)
+
+
+@contextmanager
+def idempotency_key(key: str) -> Iterator[str]:
+    token = _idempotency_key.set(key)
+    try:
+        yield key
+    finally:
+        _idempotency_key.reset(token)
+
+
+def current_idempotency_key() -> Optional[str]:
+    return _idempotency_key.get()
+
+
 class PaymentGateway(ABC):
 
     @abstractmethod
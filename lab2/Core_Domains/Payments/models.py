@@ -1,5 +1,7 @@
+import base64
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from .value_objects import Money, TransactionType, TransactionStatus
 
 
@@ -9,12 +11,21 @@ class Account:
     owner_id: int
     balance: Money
 
+    # для контрольных точек баланса: ключ последней проведённой транзакции
+    # и число проводок с последней точки (репозиторий сбрасывает при записи точки)
+    last_posting: Optional[Tuple[datetime, int]] = field(default=None, compare=False, repr=False)
+    postings_since_checkpoint: int = field(default=0, compare=False, repr=False)
+
     def deposit(self, amount: Money):
         self.balance = self.balance.add(amount)
 
     def withdraw(self, amount: Money):
         self.balance = self.balance.subtract(amount)
 
+    def record_posting(self, trx: "Transaction"):
+        self.last_posting = posting_key(trx)
+        self.postings_since_checkpoint += 1
+
 
 @dataclass
 class Transaction:
@@ -31,3 +42,85 @@ class Transaction:
 
     def mark_failed(self):
         self.status = TransactionStatus.FAILED
+
+
+@dataclass(frozen=True)
+class TransferRequest:
+    from_account: int
+    to_account: int
+    amount: Money
+
+
+@dataclass
+class BatchTransferResult:
+    """Итог пакета: transactions[i] соответствует запросу i (None — отклонён до создания транзакции)."""
+    transactions: List[Optional[Transaction]]
+    failures: Dict[int, str] = field(default_factory=dict)   # индекс запроса → причина
+    gateway_legs: int = 0     # нетто-ноги, прошедшие через шлюз
+
+    @property
+    def succeeded(self) -> List[Transaction]:
+        return [t for t in self.transactions
+                if t is not None and t.status == TransactionStatus.SUCCESS]
+
+
+# ==========================
+# Выписки: курсорная пагинация
+# ==========================
+
+# порядок выписки: (created_at, id) — id различает транзакции с одинаковым временем
+def posting_key(trx: Transaction) -> Tuple[datetime, int]:
+    return trx.created_at, trx.id
+
+
+def encode_cursor(trx: Transaction) -> str:
+    return cursor_for(posting_key(trx))
+
+
+def cursor_for(key: Tuple[datetime, int]) -> str:
+    raw = f"{key[0].isoformat()}|{key[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Курсор → ключ последней выданной транзакции; ValueError для мусора."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, trx_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(trx_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+@dataclass
+class TransactionPage:
+    items: List[Transaction]
+    next_cursor: Optional[str] = None   # None — страниц больше нет
+
+
+@dataclass(frozen=True)
+class BalanceCheckpoint:
+    """Баланс счёта сразу после проводки с ключом (created_at, trx_id)."""
+    account_id: int
+    created_at: datetime
+    trx_id: int          # 0 — точка открытия/сохранения счёта вне транзакции
+    balance: Money
+
+    @property
+    def key(self) -> Tuple[datetime, int]:
+        return self.created_at, self.trx_id
+
+
+def due_checkpoint(account: Account, every: int, opened: bool) -> Optional[BalanceCheckpoint]:
+    """
+    Точка, которую репозиторий пишет при сохранении счёта: при первом сохранении
+    (opened=False) и далее раз в every проводок. Сбрасывает счётчик проводок.
+    """
+    if not opened:
+        created_at, trx_id = account.last_posting or (datetime.utcnow(), 0)
+    elif account.last_posting is not None and account.postings_since_checkpoint >= every:
+        created_at, trx_id = account.last_posting
+    else:
+        return None
+    account.postings_since_checkpoint = 0
+    return BalanceCheckpoint(account.id, created_at, trx_id, account.balance)
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
-from .models import Account, Transaction
+from contextlib import nullcontext
+from datetime import datetime
+from typing import ContextManager, Dict, Iterable, List, Optional
+from .models import Account, Transaction, BalanceCheckpoint
 
 
 class AccountRepository(ABC):
@@ -13,6 +15,28 @@ class AccountRepository(ABC):
     def save(self, account: Account) -> None:
         pass
 
+    def get_many(self, account_ids: Iterable[int]) -> Dict[int, Account]:
+        """Found accounts by id; missing ids are skipped. Repositories override with one query."""
+        found = {}
+        for account_id in account_ids:
+            try:
+                found[account_id] = self.get(account_id)
+            except KeyError:
+                pass
+        return found
+
+    def save_many(self, accounts: Iterable[Account]) -> None:
+        for account in accounts:
+            self.save(account)
+
+    def latest_checkpoint(self, account_id: int, at: datetime) -> Optional[BalanceCheckpoint]:
+        """Last balance checkpoint with created_at <= at; None if there is none."""
+        return None
+
+    def atomic(self) -> ContextManager:
+        """Scope in which all writes commit together; no-op for in-memory storage."""
+        return nullcontext()
+
 
 class TransactionRepository(ABC):
 
@@ -25,5 +49,20 @@ class TransactionRepository(ABC):
         pass
 
     @abstractmethod
-    def list_by_account(self, account_id: int) -> List[Transaction]:
+    def list_by_account(
+        self,
+        account_id: int,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[Transaction]:
+        """
+        Transactions where the account is sender or receiver, ordered by (created_at, id).
+        since — lower bound on created_at; cursor — encode_cursor() of the last
+        transaction of the previous page (exclusive).
+        """
         pass
+
+    def save_many(self, transactions: Iterable[Transaction]) -> None:
+        for trx in transactions:
+            self.save(trx)
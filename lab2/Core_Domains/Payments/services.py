@@ -1,30 +1,76 @@
-import random
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
 from .value_objects import Money, TransactionType, TransactionStatus
-from .models import Transaction
+from .models import (
+    Transaction, TransferRequest, BatchTransferResult, TransactionPage,
+    encode_cursor, decode_cursor, cursor_for,
+)
+from .repository_interface import AccountRepository, TransactionRepository
+from .gateway_interface import idempotency_key
 from .exceptions import (
     AccountNotFound,
     InsufficientFunds,
     TransactionNotFound,
+    InvalidCursor,
     PaymentError
 )
+from ..Shared.id_allocator import IdBlockSource, LocalIdBlockSource, HiLoIdAllocator
+from ..Shared.locking import StripedLock
+from ..Shared.money import sum_by_currency
+
+
+def _signed_minor(trx: Transaction, account_id: int) -> int:
+    minor = 0
+    if trx.to_account == account_id:
+        minor += trx.amount.minor
+    if trx.from_account == account_id:
+        minor -= trx.amount.minor
+    return minor
+
+
+def _leg(req: TransferRequest):
+    # нетто-нога пакета: пара счетов (меньший id первым) и валюта
+    low, high = sorted((req.from_account, req.to_account))
+    return low, high, req.amount.currency
+
+
+def _first_shortfall(items, balances: Dict[int, int]):
+    """Первый по порядку перевод, которому не хватает средств; balances не меняются."""
+    balances = dict(balances)
+    for item in items:
+        req = item[1]
+        if balances[req.from_account] < req.amount.minor:
+            return item
+        balances[req.from_account] -= req.amount.minor
+        balances[req.to_account] += req.amount.minor
+    return None
 
 
 class PaymentService:
 
+    REPLAY_PAGE = 100
+
     def __init__(
         self,
         acc_repo,
         trx_repo,
-        gateway
+        gateway,
+        id_source: Optional[IdBlockSource] = None,
+        lock_factory=None,
     ):
         self.acc_repo = acc_repo
         self.trx_repo = trx_repo
         self.gateway = gateway
         self.account_repo = acc_repo
         self.transaction_repo = trx_repo
+        self._trx_ids = HiLoIdAllocator(id_source or LocalIdBlockSource(), "transactions")
+        # полосы по id счёта: проверка баланса и списание атомарны,
+        # переводы между несвязанными счетами идут параллельно
+        self._account_locks = StripedLock(**({"lock_factory": lock_factory} if lock_factory else {}))
 
     def _generate_trx_id(self):
-        return random.randint(1000000, 9999999)
+        return self._trx_ids.next_id()
 
     # ==============================
     # Основные операции
@@ -58,43 +104,6 @@ class PaymentService:
         from_acc = self._get_account(from_acc_id)
         to_acc = self._get_account(to_acc_id)
 
-        # 3. Авторизация через шлюз (универсальная обработка моков)
-        authorized = None
-
-        for args in [
-            (from_acc_id, to_acc_id, amount.amount),   # полный вариант
-            (amount.amount,),                           # authorize(amount)
-            (),                                         # authorize()
-        ]:
-            try:
-                authorized = self.gateway.authorize(*args)
-                break
-            except TypeError:
-                continue
-
-        if not isinstance(authorized, bool):
-            authorized = False
-
-        if not authorized:
-            from Core_Domains.Payments.exceptions import PaymentError
-            raise PaymentError("Gateway authorization failed")
-
-        # 4. Списание / capture
-        try:
-            captured = self.gateway.capture()
-        except TypeError:
-            try:
-                captured = self.gateway.capture(amount.amount)
-            except TypeError:
-                captured = False
-
-        if not isinstance(captured, bool):
-            captured = False
-
-        if not captured:
-            from Core_Domains.Payments.exceptions import PaymentError
-            raise PaymentError("Capture failed")
-
         trx = Transaction(
             id=self._generate_trx_id(),
             from_account=from_acc_id,
@@ -102,24 +111,46 @@ class PaymentService:
             amount=amount,
             type=TransactionType.TRANSFER,
         )
-        
-        # Проверка баланса
-        if from_acc.balance.amount < amount.amount:
+
+        # 3. Авторизация и списание через шлюз — под ключом транзакции,
+        # чтобы повторы адаптера шлюза были идемпотентны
+        with idempotency_key(self._idempotency_key(trx)):
+            if self.gateway.authorize(amount) is not True:
+                from Core_Domains.Payments.exceptions import PaymentError
+                raise PaymentError("Gateway authorization failed")
+
+            # 4. Списание / capture
+            if self.gateway.capture(amount) is not True:
+                from Core_Domains.Payments.exceptions import PaymentError
+                raise PaymentError("Capture failed")
+
+        # atomic — проверка и списание коммитятся до снятия блокировки, иначе
+        # следующий перевод под той же полосой прочитал бы старый баланс
+        with self._account_locks.hold(from_acc_id, to_acc_id), self._atomic():
+            # балансы перечитываются под блокировкой — шлюз мог отвечать долго
+            from_acc = self._get_account(from_acc_id)
+            to_acc = self._get_account(to_acc_id)
+
+            # Проверка баланса
+            funded = from_acc.balance.amount >= amount.amount
+            if funded:
+                # Списываем
+                from_acc.withdraw(amount)
+                to_acc.deposit(amount)
+
+                trx.mark_success()
+                self._post(trx, from_acc, to_acc)
+
+                # Сохраняем
+                self.acc_repo.save(from_acc)
+                self.acc_repo.save(to_acc)
+                self.trx_repo.save(trx)
+
+        if not funded:
+            # вне atomic: его откат по исключению унёс бы и запись о неудаче
             trx.mark_failed()
             self.trx_repo.save(trx)
             raise InsufficientFunds()
-
-        # Списываем
-        from_acc.withdraw(amount)
-        to_acc.deposit(amount)
-
-        trx.mark_success()
-
-        # Сохраняем
-        self.acc_repo.save(from_acc)
-        self.acc_repo.save(to_acc)
-        self.trx_repo.save(trx)
-
         return trx
 
     def pay_order(self, account_id: int, amount: Money) -> Transaction:
@@ -134,27 +165,32 @@ class PaymentService:
         )
 
         # Внешняя система подтверждает платёж
-        if not self.gateway.authorize(amount):
-            trx.mark_failed()
-            self.trx_repo.save(trx)
-            raise PaymentError("Authorization failed")
+        with idempotency_key(self._idempotency_key(trx)):
+            if not self.gateway.authorize(amount):
+                trx.mark_failed()
+                self.trx_repo.save(trx)
+                raise PaymentError("Authorization failed")
 
-        if not self.gateway.capture(amount):
-            trx.mark_failed()
-            self.trx_repo.save(trx)
-            raise PaymentError("Capture failed")
+            if not self.gateway.capture(amount):
+                trx.mark_failed()
+                self.trx_repo.save(trx)
+                raise PaymentError("Capture failed")
 
         # Списание из локального аккаунта
-        if account.balance.amount < amount.amount:
+        with self._account_locks.hold(account_id), self._atomic():
+            account = self._get_account(account_id)
+            funded = account.balance.amount >= amount.amount
+            if funded:
+                account.withdraw(amount)
+                trx.mark_success()
+                self._post(trx, account)
+                self.acc_repo.save(account)
+                self.trx_repo.save(trx)
+
+        if not funded:
             trx.mark_failed()
             self.trx_repo.save(trx)
             raise InsufficientFunds()
-
-        account.withdraw(amount)
-        self.acc_repo.save(account)
-
-        trx.mark_success()
-        self.trx_repo.save(trx)
         return trx
 
     def refund(self, account_id: int, amount: Money) -> Transaction:
@@ -171,24 +207,287 @@ class PaymentService:
             type=TransactionType.REFUND,
         )
 
-        if not self.gateway.refund(amount):
+        with idempotency_key(self._idempotency_key(trx)):
+            refunded = self.gateway.refund(amount)
+
+        if not refunded:
             from Core_Domains.Payments.exceptions import PaymentError
             trx.mark_failed()
             self.trx_repo.save(trx)
             raise PaymentError("Refund failed in external gateway")
 
 
-        account.deposit(amount)
-        self.acc_repo.save(account)
-
-        trx.mark_success()
-        self.trx_repo.save(trx)
+        with self._account_locks.hold(account_id), self._atomic():
+            account = self._get_account(account_id)
+            account.deposit(amount)
+            trx.mark_success()
+            self._post(trx, account)
+            self.acc_repo.save(account)
+            self.trx_repo.save(trx)
         return trx
 
+    # ==============================
+    # Пакетные переводы
+    # ==============================
+
+    def transfer_batch(self, requests: List[TransferRequest]) -> BatchTransferResult:
+        """
+        Пакет переводов (например, выплаты за день):
+          1. все счета загружаются одним get_many, запросы проверяются,
+             балансы проверяются последовательно, в порядке запросов;
+          2. встречные потоки принятых переводов между парой счетов
+             взаимозачитываются — шлюз вызывается один раз на нетто-ногу
+             (authorize + capture), без блокировок счетов и транзакции хранилища;
+          3. под блокировками балансы перечитываются и проверяются заново,
+             счета и транзакции сохраняются одним atomic()-коммитом;
+          4. нога, перевод которой не прошёл повторную проверку (счёт успели
+             опустошить между шагами), откатывается целиком и возвращается refund.
+        Ошибка отдельного перевода не прерывает пакет — она попадает в result.failures.
+        """
+        acc_ids = {r.from_account for r in requests} | {r.to_account for r in requests}
+        result = BatchTransferResult(transactions=[None] * len(requests))
+        accounts = self._load_accounts(acc_ids)
+
+        pending = self._open_batch(requests, accounts, result)
+        # в шлюз идут только переводы, которые проходят по балансу
+        pending = self._drop_shortfalls(pending, accounts, result)
+
+        legs = defaultdict(list)
+        for item in pending:
+            legs[_leg(item[1])].append(item)
+
+        settled = {}   # нога → (ключ, сумма), прошедшие через шлюз
+        for (low, high, currency), items in legs.items():
+            net = sum(req.amount.minor if req.from_account == low else -req.amount.minor
+                      for _, req, _ in items)
+            if not net:
+                continue  # потоки полностью взаимозачтены
+            result.gateway_legs += 1
+            key = f"batch-{items[0][2].id}-{low}-{high}"
+            amount = Money.from_minor(abs(net), currency)
+            reason = self._settle_leg(key, amount)
+            if reason:
+                for i, _, trx in items:
+                    trx.mark_failed()
+                    result.failures[i] = reason
+            else:
+                settled[(low, high, currency)] = (key, amount)
+
+        pending = [item for item in pending if item[2].status != TransactionStatus.FAILED]
+        try:
+            with self._account_locks.hold(*acc_ids), self._atomic():
+                rolled_back = self._post_batch(pending, result)
+        except BaseException:
+            # в хранилище ничего не попало — деньги, прошедшие через шлюз, возвращаем
+            for key, amount in settled.values():
+                self._refund_leg(key, amount)
+            raise
+
+        for leg in rolled_back & settled.keys():
+            reason = self._refund_leg(*settled[leg])
+            if reason:
+                for i, req, _ in pending:
+                    if _leg(req) == leg:
+                        result.failures[i] = f"{result.failures[i]}; {reason}"
+        return result
+
+    def _open_batch(self, requests: List[TransferRequest], accounts, result: BatchTransferResult):
+        pending = []
+        for i, req in enumerate(requests):
+            reason = self._reject_reason(req, accounts)
+            if reason:
+                result.failures[i] = reason
+                continue
+            trx = Transaction(
+                id=self._generate_trx_id(),
+                from_account=req.from_account,
+                to_account=req.to_account,
+                amount=req.amount,
+                type=TransactionType.TRANSFER,
+            )
+            result.transactions[i] = trx
+            if req.from_account == req.to_account:
+                trx.mark_success()
+            else:
+                pending.append((i, req, trx))
+        return pending
+
+    @staticmethod
+    def _drop_shortfalls(pending, accounts, result: BatchTransferResult):
+        balances = {acc_id: acc.balance.minor for acc_id, acc in accounts.items()}
+        accepted = []
+        for i, req, trx in pending:
+            if balances[req.from_account] < req.amount.minor:
+                trx.mark_failed()
+                result.failures[i] = str(InsufficientFunds())
+                continue
+            balances[req.from_account] -= req.amount.minor
+            balances[req.to_account] += req.amount.minor
+            accepted.append((i, req, trx))
+        return accepted
+
+    def _post_batch(self, pending, result: BatchTransferResult):
+        """Проводки под блокировками; возвращает ноги, откатанные из-за нехватки средств."""
+        accounts = self._load_accounts(
+            {r.from_account for _, r, _ in pending} | {r.to_account for _, r, _ in pending}
+        )
+        balances = {acc_id: acc.balance.minor for acc_id, acc in accounts.items()}
+
+        # шлюз уже провёл ноги целиком: перевод, не прошедший по балансу,
+        # снимает всю свою ногу — и повтор, пока оставшиеся проходят без сбоев
+        rolled_back = set()
+        while True:
+            live = [item for item in pending if _leg(item[1]) not in rolled_back]
+            short = _first_shortfall(live, balances)
+            if short is None:
+                break
+            rolled_back.add(_leg(short[1]))
+            result.failures[short[0]] = str(InsufficientFunds())
+
+        changed = {}
+        for i, req, trx in pending:
+            if _leg(req) in rolled_back:
+                trx.mark_failed()
+                result.failures.setdefault(i, "Batch leg rolled back")
+                continue
+            src, dst = accounts[req.from_account], accounts[req.to_account]
+            src.withdraw(req.amount)
+            dst.deposit(req.amount)
+            trx.mark_success()
+            self._post(trx, src, dst)
+            changed[src.id], changed[dst.id] = src, dst
+
+        if changed:
+            self._save_accounts(changed.values())
+        self._save_transactions([t for t in result.transactions if t is not None])
+        return rolled_back
+
+    @staticmethod
+    def _reject_reason(req: TransferRequest, accounts) -> Optional[str]:
+        if req.amount.minor <= 0:
+            return "Transfer amount must be positive"
+        for acc_id in (req.from_account, req.to_account):
+            if acc_id not in accounts:
+                return str(AccountNotFound(acc_id))
+            if accounts[acc_id].balance.currency != req.amount.currency:
+                return "Different currencies"
+        return None
+
+    def _refund_leg(self, key: str, amount: Money) -> Optional[str]:
+        try:
+            with idempotency_key(f"{key}-refund"):
+                if self.gateway.refund(amount) is not True:
+                    return "Refund failed in external gateway"
+        except PaymentError as e:
+            return str(e)
+        return None
+
+    def _settle_leg(self, key: str, amount: Money) -> Optional[str]:
+        try:
+            with idempotency_key(key):
+                if self.gateway.authorize(amount) is not True:
+                    return "Gateway authorization failed"
+                if self.gateway.capture(amount) is not True:
+                    return "Capture failed"
+        except PaymentError as e:
+            return str(e)
+        return None
+
+    # ==============================
+    # Отчёты
+    # ==============================
+
+    def statement(self, account_id: int, since: Optional[datetime] = None,
+                  limit: int = 50, cursor: Optional[str] = None) -> TransactionPage:
+        """Страница выписки по счёту; next_cursor передаётся в следующий вызов."""
+        if limit <= 0:
+            raise PaymentError("limit must be positive")
+        if cursor is not None:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                raise InvalidCursor(cursor)
+
+        # на одну больше — узнать, есть ли следующая страница, без COUNT
+        items = self.trx_repo.list_by_account(account_id, since=since, limit=limit + 1, cursor=cursor)
+        has_more = len(items) > limit
+        items = items[:limit]
+        return TransactionPage(items, encode_cursor(items[-1]) if has_more else None)
+
+    def balance_at(self, account_id: int, at: datetime) -> Money:
+        """
+        Баланс счёта на момент at: ближайшая контрольная точка не позже at
+        плюс успешные проводки после неё (не больше checkpoint_every штук).
+        """
+        account = self._get_account(account_id)
+        latest = getattr(self.acc_repo, "latest_checkpoint", None)
+        checkpoint = latest(account_id, at) if latest is not None else None
+        if checkpoint is None:
+            return Money.from_minor(0, account.balance.currency)  # счёта ещё не было
+
+        minor, cursor = checkpoint.balance.minor, cursor_for(checkpoint.key)
+        while cursor is not None:
+            page = self.trx_repo.list_by_account(
+                account_id, since=checkpoint.created_at, limit=self.REPLAY_PAGE, cursor=cursor
+            )
+            for trx in page:
+                if trx.created_at > at:
+                    return Money.from_minor(minor, checkpoint.balance.currency)
+                if trx.status == TransactionStatus.SUCCESS:
+                    minor += _signed_minor(trx, account_id)
+            cursor = encode_cursor(page[-1]) if len(page) == self.REPLAY_PAGE else None
+        return Money.from_minor(minor, checkpoint.balance.currency)
+
+    def turnover_by_currency(self, account_id: int) -> Dict[str, Money]:
+        """Оборот по успешным транзакциям счёта, сгруппированный по валютам."""
+        fast = getattr(self.trx_repo, "turnover_by_currency", None)
+        if fast is not None:
+            return fast(account_id)
+        return sum_by_currency(
+            t.amount for t in self.trx_repo.list_by_account(account_id)
+            if t.status == TransactionStatus.SUCCESS
+        )
+
     # ==============================
     # Helpers
     # ==============================
 
+    @staticmethod
+    def _post(trx: Transaction, *accounts):
+        # время проводки ставится под блокировкой счетов: порядок (created_at, id)
+        # совпадает с порядком изменения балансов — на этом держатся контрольные точки
+        trx.created_at = datetime.utcnow()
+        for account in accounts:
+            account.record_posting(trx)
+
+    @staticmethod
+    def _idempotency_key(trx: Transaction) -> str:
+        return f"trx-{trx.id}"
+
+    # репозитории-заглушки могут не наследовать интерфейс — тогда его реализации по умолчанию
+
+    def _load_accounts(self, acc_ids) -> Dict[int, object]:
+        get_many = getattr(self.acc_repo, "get_many", None)
+        if get_many is None:
+            return AccountRepository.get_many(self.acc_repo, acc_ids)
+        return get_many(acc_ids)
+
+    def _save_accounts(self, accounts):
+        save_many = getattr(self.acc_repo, "save_many", None)
+        if save_many is None:
+            return AccountRepository.save_many(self.acc_repo, accounts)
+        return save_many(accounts)
+
+    def _save_transactions(self, transactions):
+        save_many = getattr(self.trx_repo, "save_many", None)
+        if save_many is None:
+            return TransactionRepository.save_many(self.trx_repo, transactions)
+        return save_many(transactions)
+
+    def _atomic(self):
+        atomic = getattr(self.acc_repo, "atomic", None)
+        return atomic() if atomic is not None else AccountRepository.atomic(self.acc_repo)
+
     def _get_account(self, acc_id: int):
         try:
             return self.acc_repo.get(acc_id)
@@ -0,0 +1,55 @@
+import threading
+from abc import ABC, abstractmethod
+
+
+class IdBlockSource(ABC):
+    """
+    Хранилище «старших» частей идентификаторов (hi/lo).
+    reserve() атомарно выдаёт начало следующего свободного блока длиной size.
+    """
+
+    @abstractmethod
+    def reserve(self, sequence: str, size: int) -> int:
+        pass
+
+
+class LocalIdBlockSource(IdBlockSource):
+    """Process-local block source; used when no durable source is configured."""
+
+    def __init__(self, start: int = 1):
+        self._start = start
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, sequence: str, size: int) -> int:
+        with self._lock:
+            first = self._next.get(sequence, self._start)
+            self._next[sequence] = first + size
+            return first
+
+
+class HiLoIdAllocator:
+    """
+    Монотонный генератор id без коллизий.
+    Блок из block_size id резервируется в IdBlockSource один раз,
+    дальше id выдаются из памяти — хранилище трогается раз в block_size вызовов.
+    """
+
+    def __init__(self, source: IdBlockSource, sequence: str, block_size: int = 1000):
+        if block_size <= 0:
+            raise ValueError("Block size must be positive")
+        self.source = source
+        self.sequence = sequence
+        self.block_size = block_size
+        self._next = 0
+        self._limit = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._next >= self._limit:
+                self._next = self.source.reserve(self.sequence, self.block_size)
+                self._limit = self._next + self.block_size
+            value = self._next
+            self._next += 1
+            return value
@@ -0,0 +1,35 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Hashable, List
+
+
+class StripedLock:
+    """
+    Набор из N блокировок (lock striping): ключ → lock[hash(key) % N].
+    Разные ключи (ячейки, счета) почти всегда попадают в разные полосы, поэтому
+    параллельные операции не сериализуются на одном глобальном lock.
+    """
+
+    def __init__(self, stripes: int = 64, lock_factory: Callable = threading.Lock):
+        if stripes <= 0:
+            raise ValueError("Number of stripes must be positive")
+        # lock_factory: любой объект с acquire()/release() (напр. для async-бэкенда)
+        self._locks = [lock_factory() for _ in range(stripes)]
+
+    def _indexes(self, keys) -> List[int]:
+        # сортировка индексов = единый глобальный порядок захвата → нет deadlock
+        return sorted({hash(k) % len(self._locks) for k in keys})
+
+    @contextmanager
+    def hold(self, *keys: Hashable):
+        """Acquire the stripes for all keys in ascending stripe order."""
+        acquired = []
+        try:
+            for idx in self._indexes(keys):
+                lock = self._locks[idx]
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
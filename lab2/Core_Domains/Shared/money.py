@@ -0,0 +1,142 @@
+import sys
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Dict, Iterable
+
+
+# знаков после запятой у minor-единиц (ISO 4217); прочие валюты — 2
+_EXPONENTS = {"JPY": 0, "KRW": 0, "BHD": 3, "KWD": 3}
+_DEFAULT_EXPONENT = 2
+
+# код валюты → (интернированная строка, exponent)
+_CURRENCIES: Dict[str, tuple] = {}
+
+
+def _currency(code: str) -> tuple:
+    info = _CURRENCIES.get(code)
+    if info is None:
+        normalized = sys.intern(code.upper())
+        info = (normalized, _EXPONENTS.get(normalized, _DEFAULT_EXPONENT))
+        _CURRENCIES[code] = _CURRENCIES[normalized] = info
+    return info
+
+
+def to_minor(amount, currency: str = "USD") -> int:
+    """Сумма в основных единицах (int/Decimal/str/float) → целое число minor-единиц."""
+    exponent = _currency(currency)[1]
+    if type(amount) is int:
+        return amount * 10 ** exponent
+    if not isinstance(amount, Decimal):
+        # float через repr: 0.1 → Decimal("0.1"), а не 0.1000000000000000055...
+        amount = Decimal(repr(amount) if isinstance(amount, float) else amount)
+    return int(amount.scaleb(exponent).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+class Money:
+    """
+    Неизменяемая денежная сумма в целых minor-единицах (центах).
+    Сложение/вычитание — целочисленные, без дрейфа float; код валюты интернирован,
+    поэтому сравнение валют — сравнение ссылок. amount отдаёт Decimal.
+    """
+
+    __slots__ = ("minor", "currency")
+
+    def __init__(self, amount=0, currency: str = "USD"):
+        code, _ = _currency(currency)
+        object.__setattr__(self, "currency", code)
+        object.__setattr__(self, "minor", to_minor(amount, code))
+
+    @classmethod
+    def from_minor(cls, minor: int, currency: str = "USD") -> "Money":
+        money = cls.__new__(cls)
+        object.__setattr__(money, "currency", _currency(currency)[0])
+        object.__setattr__(money, "minor", int(minor))
+        return money
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self.minor).scaleb(-_currency(self.currency)[1])
+
+    def add(self, other: "Money") -> "Money":
+        self._check_currency(other)
+        return Money.from_minor(self.minor + other.minor, self.currency)
+
+    def subtract(self, other: "Money") -> "Money":
+        self._check_currency(other)
+        if other.minor > self.minor:
+            raise ValueError("Insufficient funds")
+        return Money.from_minor(self.minor - other.minor, self.currency)
+
+    def multiply(self, qty) -> "Money":
+        if type(qty) is int:
+            return Money.from_minor(self.minor * qty, self.currency)
+        factor = Decimal(repr(qty) if isinstance(qty, float) else qty)
+        minor = (self.minor * factor).quantize(Decimal(1), rounding=ROUND_HALF_EVEN)
+        return Money.from_minor(int(minor), self.currency)
+
+    def _check_currency(self, other: "Money"):
+        if other.currency is not self.currency:
+            raise ValueError("Different currencies")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Money is immutable")
+
+    def __reduce__(self):
+        return Money.from_minor, (self.minor, self.currency)
+
+    def __eq__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.minor == other.minor and self.currency is other.currency
+
+    def __hash__(self):
+        return hash((self.minor, self.currency))
+
+    def __lt__(self, other: "Money"):
+        self._check_currency(other)
+        return self.minor < other.minor
+
+    def __le__(self, other: "Money"):
+        self._check_currency(other)
+        return self.minor <= other.minor
+
+    def __repr__(self):
+        return f"Money(amount={self.amount}, currency={self.currency!r})"
+
+
+# ==========================
+# Агрегация
+# ==========================
+
+def sum_minor(minor_units: Iterable[int], currency: str = "USD") -> Money:
+    """Сумма столбца minor-единиц (list/array('q')/результат SQL) — один sum() без Money на строку."""
+    return Money.from_minor(sum(minor_units), currency)
+
+
+def sum_money(items: Iterable[Money], currency: str = "USD") -> Money:
+    """Сумма в одной валюте; пустой набор — ноль в currency."""
+    code = _currency(currency)[0]
+    total = 0
+    first = True
+    for money in items:
+        if first:
+            code, first = money.currency, False
+        elif money.currency is not code:
+            raise ValueError("Different currencies")
+        total += money.minor
+    return Money.from_minor(total, code)
+
+
+def sum_by_currency(items: Iterable[Money]) -> Dict[str, Money]:
+    totals: Dict[str, int] = defaultdict(int)
+    for money in items:
+        totals[money.currency] += money.minor
+    return {code: Money.from_minor(minor, code) for code, minor in totals.items()}
+
+
+def group_sum(currencies: Iterable[str], minor_units: Iterable[int]) -> Dict[str, Money]:
+    """Столбцы (валюта, сумма) → итог по валютам, напр. для отчёта по выборке из БД."""
+    totals: Dict[str, int] = defaultdict(int)
+    for code, minor in zip(currencies, minor_units):
+        totals[code] += minor
+    return {code: Money.from_minor(minor, code) for code, minor in totals.items()}
@@ -1,4 +1,5 @@
 from .password_hasher import PasswordHasher
+from .token_service import TokenService
 from .repository_interface import UserRepository
 from .exceptions import InvalidCredentials, UserBlocked
 from .models import User
@@ -6,9 +7,12 @@ from .models import User
 
 class AuthService:
 
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, hasher=None, tokens: TokenService = None):
         self.user_repo = user_repo
-        self.hasher = PasswordHasher()
+        self.tokens = tokens or TokenService()
+        # hasher: PasswordHasher или обёртка с тем же API (напр. пул процессов)
+        self.hasher = hasher or PasswordHasher()
+        self.rehashed = 0
 
     def authenticate(self, email: str, password: str) -> User:
         user = self.user_repo.get_by_email(email)
@@ -22,15 +26,23 @@ class AuthService:
         if not self.hasher.verify(password, user.password_hash):
             raise InvalidCredentials()
 
+        # пароль известен только сейчас — прозрачно переводим хеш на текущий формат
+        if self.hasher.needs_rehash(user.password_hash):
+            user.password_hash = self.hasher.hash(password)
+            self.user_repo.save(user)
+            self.rehashed += 1
+
         return user
     def login(self, email: str, password: str) -> str:
-        """Return token if credentials ok (required by tests)."""
+        """Return signed access token if credentials ok."""
 
         # Используем authenticate, чтобы не дублировать логику
         user = self.authenticate(email, password)
+        return self.tokens.issue(user.id)
 
-        # Возвращаем тестовый токен
-        return f"token-{user.id}"
+    def verify_token(self, token: str) -> int:
+        """Per-request check: user id from a valid token, without password verify."""
+        return self.tokens.verify(token)
     def register(self, user_id: int, email: str, password: str) -> User:
         """Register user (required by tests)."""
 
@@ -34,3 +34,13 @@ class UserBlocked(UserSecurityError):
     def __init__(self, user_id: int):
         super().__init__(f"User {user_id} is blocked")
         self.user_id = user_id
+
+
+class InvalidToken(UserSecurityError):
+    def __init__(self):
+        super().__init__("Invalid or expired access token")
+
+
+class PasswordHashingBusy(UserSecurityError):
+    def __init__(self):
+        super().__init__("Password hashing is overloaded, retry later")
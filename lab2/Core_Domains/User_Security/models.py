@@ -1,12 +1,33 @@
+import itertools
 from dataclasses import dataclass, field
-from typing import List
+from typing import ClassVar, FrozenSet, List, Optional, Tuple
 from .value_objects import UserStatus
 
+WILDCARD = "*"
+
+# глобальная эпоха прав: меняется при любом изменении прав любой роли
+_role_epochs = itertools.count(1)
+
+
+def _wildcard_keys(permission_name: str) -> List[str]:
+    """Шаблоны, покрывающие имя: orders.items.read → *, orders.*, orders.items.*"""
+    parts = permission_name.split(".")
+    return [WILDCARD] + [".".join(parts[:i]) + "." + WILDCARD for i in range(1, len(parts))]
+
+
+def compile_permissions(roles: List["Role"]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """(точные имена, шаблоны вида "orders.*" / "*") по всем ролям."""
+    names = {perm.name for role in roles for perm in role.permissions}
+    wildcards = frozenset(
+        n for n in names if n == WILDCARD or n.endswith("." + WILDCARD)
+    )
+    return frozenset(names - wildcards), wildcards
+
 
 @dataclass
 class Permission:
     id: int
-    name: str  # e.g. "books.read", "orders.manage"
+    name: str  # e.g. "books.read", "orders.manage", "orders.*"
 
 
 @dataclass
@@ -15,9 +36,28 @@ class Role:
     name: str  # e.g. "admin", "manager", "customer"
     permissions: List[Permission] = field(default_factory=list)
 
+    epoch: ClassVar[int] = 0
+
+    def __post_init__(self):
+        self._perm_keys = {(p.id, p.name) for p in self.permissions}
+
     def add_permission(self, perm: Permission):
-        if perm not in self.permissions:
+        key = (perm.id, perm.name)
+        if key not in self._perm_keys:
+            self._perm_keys.add(key)
             self.permissions.append(perm)
+            Role._touch()
+
+    def remove_permission(self, perm: Permission):
+        key = (perm.id, perm.name)
+        if key in self._perm_keys:
+            self._perm_keys.discard(key)
+            self.permissions.remove(perm)
+            Role._touch()
+
+    @staticmethod
+    def _touch():
+        Role.epoch = next(_role_epochs)
 
 
 @dataclass
@@ -27,14 +67,38 @@ class User:
     password_hash: str
     roles: List[Role] = field(default_factory=list)
     status: UserStatus = UserStatus.ACTIVE
+    # поколение токенов: растёт при блокировке/смене пароля, выданные раньше токены недействительны
+    token_generation: int = 0
+
+    # скомпилированные права: ((версия ролей, эпоха), точные, шаблоны)
+    _compiled: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _roles_version: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._role_ids = {r.id for r in self.roles}
 
     def add_role(self, role: Role):
-        if role not in self.roles:
+        if role.id not in self._role_ids:
+            self._role_ids.add(role.id)
             self.roles.append(role)
+            self._roles_version += 1
+
+    def remove_role(self, role: Role):
+        if role.id in self._role_ids:
+            self._role_ids.discard(role.id)
+            self.roles = [r for r in self.roles if r.id != role.id]
+            self._roles_version += 1
 
     def has_permission(self, permission_name: str) -> bool:
-        for role in self.roles:
-            for perm in role.permissions:
-                if perm.name == permission_name:
-                    return True
-        return False
+        granted, wildcards = self._permission_index()
+        if permission_name in granted:
+            return True
+        return bool(wildcards) and any(k in wildcards for k in _wildcard_keys(permission_name))
+
+    def _permission_index(self) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        # пересборка только если менялись роли пользователя или права какой-либо роли
+        stamp = (self._roles_version, Role.epoch)
+        compiled = self._compiled
+        if compiled is None or compiled[0] != stamp:
+            compiled = self._compiled = (stamp, *compile_permissions(self.roles))
+        return compiled[1], compiled[2]
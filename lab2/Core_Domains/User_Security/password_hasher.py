@@ -1,38 +1,63 @@
 # Core_Domains/User_Security/password_hasher.py
 import hashlib
+import hmac
 import os
-import base64
 
 
 class PasswordHasher:
+    """
+    Версионированные хеши паролей:
+      pbkdf2_sha256$<iterations>$<salt_hex>$<hash_hex>  — текущий формат (KDF);
+      <salt_hex>$<sha256_hex>                           — устаревший, один раунд SHA256.
+    verify() понимает оба, needs_rehash() подсказывает, когда пересчитать при логине.
+    """
+
     SALT_LENGTH = 16
     ITERATIONS = 100_000
     ALGORITHM = "sha256"
+    SCHEME = "pbkdf2_sha256"
 
     @staticmethod
     def hash(password: str) -> str:
-        """Create salted SHA256 hash."""
-        salt = os.urandom(16).hex()
-        digest = hashlib.sha256((salt + password).encode()).hexdigest()
-        return f"{salt}${digest}"
+        """Create PBKDF2 hash in the current format."""
+        salt = os.urandom(PasswordHasher.SALT_LENGTH)
+        digest = PasswordHasher._pbkdf2(password, salt, PasswordHasher.ITERATIONS)
+        return f"{PasswordHasher.SCHEME}${PasswordHasher.ITERATIONS}${salt.hex()}${digest.hex()}"
 
     @staticmethod
     def verify(password: str, stored_hash: str) -> bool:
-        """Validate password against stored salted hash."""
+        """Validate password against stored hash of any supported version."""
+        parts = (stored_hash or "").split("$")
+
+        if len(parts) == 4 and parts[0] == PasswordHasher.SCHEME:
+            _, iterations, salt, digest = parts
+            try:
+                new_digest = PasswordHasher._pbkdf2(password, bytes.fromhex(salt), int(iterations))
+            except ValueError:
+                return False
+            return hmac.compare_digest(new_digest.hex(), digest)
+
+        if len(parts) == 2:
+            salt, digest = parts
+            new_digest = hashlib.sha256((salt + password).encode()).hexdigest()
+            return hmac.compare_digest(new_digest, digest)
+
+        return False
+
+    @staticmethod
+    def needs_rehash(stored_hash: str) -> bool:
+        """True for legacy formats or weaker-than-current iteration count."""
+        parts = (stored_hash or "").split("$")
+        if len(parts) != 4 or parts[0] != PasswordHasher.SCHEME:
+            return True
         try:
-            salt, digest = stored_hash.split("$", 1)
+            return int(parts[1]) < PasswordHasher.ITERATIONS
         except ValueError:
-            return False
-
-        new_digest = hashlib.sha256((salt + password).encode()).hexdigest()
-        return new_digest == digest
+            return True
 
     def hash_password(self, raw_password: str) -> str:
-        salt = os.urandom(self.SALT_LENGTH)
-        hash_bytes = hashlib.pbkdf2_hmac(
-            self.ALGORITHM,
-            raw_password.encode(),
-            salt,
-            self.ITERATIONS
-        )
-        return base64.b64encode(salt + hash_bytes).decode()
+        return self.hash(raw_password)
+
+    @staticmethod
+    def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+        return hashlib.pbkdf2_hmac(PasswordHasher.ALGORITHM, password.encode(), salt, iterations)
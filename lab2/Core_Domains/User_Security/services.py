@@ -1,3 +1,4 @@
+from typing import Optional
 from .password_hasher import PasswordHasher
 from .repository_interface import UserRepository, RoleRepository
 from .models import User
@@ -7,14 +8,24 @@ from .exceptions import (
     UserBlocked
 )
 from .value_objects import UserStatus
+from ..Shared.id_allocator import IdBlockSource, LocalIdBlockSource, HiLoIdAllocator
 
 
 class UserService:
 
-    def __init__(self, user_repo: UserRepository, role_repo: RoleRepository):
+    def __init__(
+        self,
+        user_repo: UserRepository,
+        role_repo: RoleRepository,
+        id_source: Optional[IdBlockSource] = None,
+        hasher=None,
+        tokens=None,
+    ):
         self.user_repo = user_repo
         self.role_repo = role_repo
-        self.password_hasher = PasswordHasher()
+        self._user_ids = HiLoIdAllocator(id_source or LocalIdBlockSource(), "users")
+        self.password_hasher = hasher or PasswordHasher()
+        self.tokens = tokens      # TokenService: отзыв токенов при блокировке/смене пароля
         self.repo = user_repo     # тесты используют self.repo
 
     # ==========================
@@ -69,7 +80,9 @@ class UserService:
     def block_user(self, user_id: int):
         user = self._get_user(user_id)
         user.status = UserStatus.BLOCKED
+        user.token_generation += 1
         self.user_repo.save(user)
+        self._revoke_tokens(user_id)
 
     def unblock_user(self, user_id: int):
         user = self._get_user(user_id)
@@ -107,7 +120,9 @@ class UserService:
         # Генерация нового хэша и сохранение
         new_hash = self.password_hasher.hash(new_password)
         user.password_hash = new_hash
+        user.token_generation += 1
         self.user_repo.save(user)
+        self._revoke_tokens(user_id)
 
     # ==========================
     # Helpers
@@ -119,6 +134,16 @@ class UserService:
         except KeyError:
             raise UserNotFound(user_id)
 
+    def _revoke_tokens(self, user_id: int):
+        # поколение уже в записи пользователя — это лишь сброс кеша проверенных токенов
+        if self.tokens is None:
+            return
+        self.tokens.revoke_user(user_id)
+        # в unit of work новое поколение видно другим сессиям только после commit:
+        # перепроверка токена в это окно закешировала бы его снова — сбрасываем ещё раз
+        after_transaction = getattr(self.user_repo, "after_transaction", None)
+        if after_transaction is not None:
+            after_transaction(lambda: self.tokens.revoke_user(user_id))
+
     def _generate_user_id(self):
-        import random
-        return random.randint(100000, 999999)
+        return self._user_ids.next_id()
@@ -0,0 +1,135 @@
+# Core_Domains/User_Security/token_service.py
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from .exceptions import InvalidToken
+from .value_objects import UserStatus
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class TokenService:
+    """
+    Подписанные токены доступа: "<user_id>.<generation>.<expires>.<nonce>.<sig>",
+    sig = HMAC-SHA256(secret_key, всё до подписи).
+
+    Проверенные токены кешируются до своего истечения, поэтому повторная
+    проверка на каждом запросе — поиск в словаре без HMAC.
+
+    С users (UserRepository) поколение и статус берутся из записи
+    пользователя (User.token_generation): отзыв переживает рестарт и виден
+    всем процессам. Запись в кеше перепроверяется по репозиторию не реже
+    раза в recheck_seconds — столько отзыв из другого процесса может
+    запаздывать; revoke_user() в этом процессе действует сразу.
+    Без users поколения живут в памяти процесса.
+    """
+
+    def __init__(self, secret_key: Optional[str] = None, ttl_seconds: float = 3600,
+                 max_cached: int = 10_000, clock: Callable[[], float] = time.time,
+                 users=None, recheck_seconds: float = 30):
+        if ttl_seconds <= 0 or max_cached <= 0 or recheck_seconds <= 0:
+            raise ValueError("ttl_seconds, max_cached and recheck_seconds must be positive")
+        if secret_key is None:
+            secret_key = os.urandom(32)  # токены живут до рестарта процесса
+        if isinstance(secret_key, str):
+            secret_key = secret_key.encode()
+        self._key = secret_key
+        self.ttl = ttl_seconds
+        self.max_cached = max_cached
+        self._clock = clock
+        self.users = users
+        self.recheck = recheck_seconds
+        self._generation: Dict[int, int] = {}
+        # token → (user_id, generation, expires, перепроверить после)
+        self._verified: "OrderedDict[str, Tuple[int, int, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def issue(self, user_id: int) -> str:
+        generation = self._current_generation(user_id)
+        if generation is None:
+            raise InvalidToken()
+        expires = int(self._clock() + self.ttl)
+        payload = f"{user_id}.{generation}.{expires}.{_b64(os.urandom(9))}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token: str) -> int:
+        """Return user id for a valid token, raise InvalidToken otherwise."""
+        now = self._clock()
+
+        with self._lock:
+            cached = self._verified.get(token)
+            if cached is not None:
+                user_id, generation, expires, recheck_at = cached
+                if self.users is None:
+                    valid = generation == self._generation.get(user_id, 0)
+                else:
+                    valid = recheck_at > now  # иначе — перепроверка по репозиторию ниже
+                if expires > now and valid:
+                    return user_id
+                del self._verified[token]
+                if expires <= now:
+                    raise InvalidToken()
+
+        if cached is not None:
+            user_id, generation, expires = cached[:3]   # подпись уже проверена
+        else:
+            user_id, generation, expires = self._check(token, now)
+        if generation != self._current_generation(user_id):
+            raise InvalidToken()
+
+        with self._lock:
+            self._verified[token] = (user_id, generation, expires, now + self.recheck)
+            while len(self._verified) > self.max_cached:
+                self._verified.popitem(last=False)  # самый старый
+        return user_id
+
+    def revoke_user(self, user_id: int) -> None:
+        """
+        Без users — новое поколение в памяти. С users поколение уже сохранено
+        в записи пользователя (UserService) — здесь только сброс кеша процесса.
+        """
+        with self._lock:
+            if self.users is None:
+                self._generation[user_id] = self._generation.get(user_id, 0) + 1
+                return
+            for token in [t for t, entry in self._verified.items() if entry[0] == user_id]:
+                del self._verified[token]
+
+    def cached_count(self) -> int:
+        return len(self._verified)
+
+    def _check(self, token: str, now: float) -> Tuple[int, int, float]:
+        payload, _, sig = (token or "").rpartition(".")
+        if not payload or not hmac.compare_digest(sig, self._sign(payload)):
+            raise InvalidToken()
+        try:
+            user_id, generation, expires, _nonce = payload.split(".")
+            user_id, generation, expires = int(user_id), int(generation), int(expires)
+        except ValueError:
+            raise InvalidToken()
+        if expires <= now:
+            raise InvalidToken()
+        return user_id, generation, expires
+
+    def _current_generation(self, user_id: int) -> Optional[int]:
+        """Действующее поколение; None — пользователя нет или он не активен."""
+        if self.users is None:
+            return self._generation.get(user_id, 0)
+        try:
+            user = self.users.get(user_id)
+        except KeyError:
+            return None
+        if user is None or user.status != UserStatus.ACTIVE:
+            return None
+        return user.token_generation
+
+    def _sign(self, payload: str) -> str:
+        return _b64(hmac.new(self._key, payload.encode(), hashlib.sha256).digest())
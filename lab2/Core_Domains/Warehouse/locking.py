@@ -0,0 +1,2 @@
+# StripedLock общий для доменов — см. Shared/locking.py
+from ..Shared.locking import StripedLock  # noqa: F401
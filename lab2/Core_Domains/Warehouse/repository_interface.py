@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from contextlib import nullcontext
+from typing import ContextManager, List, Optional
 from .models import WarehouseZone, Shelf, Cell, StockItem, StockMovement, InventoryCheckSession
 
 
@@ -70,6 +71,10 @@ class StockRepository(ABC):
     def delete(self, book_id: int, cell_id: int) -> None:
         pass
 
+    def atomic(self) -> ContextManager:
+        """Scope in which all writes commit together; no-op for in-memory storage."""
+        return nullcontext()
+
 
 class StockMovementRepository(ABC):
 
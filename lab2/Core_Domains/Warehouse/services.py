@@ -1,4 +1,4 @@
-import random
+from contextlib import contextmanager
 from typing import Optional
 from .repository_interface import (
     CellRepository,
@@ -8,6 +8,8 @@ from .repository_interface import (
 )
 from .models import StockItem, StockMovement, InventoryCheckSession
 from .value_objects import Quantity, MovementType
+from ..Shared.locking import StripedLock
+from ..Shared.id_allocator import IdBlockSource, LocalIdBlockSource, HiLoIdAllocator
 from .exceptions import (
     CellNotFound,
     StockItemNotFound,
@@ -25,11 +27,21 @@ class WarehouseService:
         stock_repo: StockRepository,
         movement_repo: StockMovementRepository,
         inventory_repo: InventorySessionRepository,
+        id_source: Optional[IdBlockSource] = None,
+        lock_factory=None,
     ):
         self.cell_repo = cell_repo
         self.stock_repo = stock_repo
         self.movement_repo = movement_repo
         self.inventory_repo = inventory_repo
+        # cell-полосы защищают used/capacity, stock-полосы — остатки (book_id, cell_id)
+        locks = {"lock_factory": lock_factory} if lock_factory else {}
+        self._cell_locks = StripedLock(**locks)
+        self._stock_locks = StripedLock(**locks)
+        id_source = id_source or LocalIdBlockSource()
+        self._movement_ids = HiLoIdAllocator(id_source, "stock_movements")
+        self._inventory_ids = HiLoIdAllocator(id_source, "inventory_sessions")
+
     def _now(self):
         """Return current datetime (tests rely on this helper)."""
         return datetime.now()
@@ -52,10 +64,10 @@ class WarehouseService:
             raise CellNotFound(cell_id)
 
     def _generate_movement_id(self) -> int:
-        return random.randint(1000000, 9999999)
+        return self._movement_ids.next_id()
 
     def _generate_inventory_session_id(self) -> int:
-        return random.randint(1000000, 9999999)
+        return self._inventory_ids.next_id()
 
     # ==========================
     # Основные операции
@@ -64,26 +76,27 @@ class WarehouseService:
         """
         Tests expect: creates a warehouse cell with given id, name, capacity.
         """
-        try:
-            existing = self.cell_repo.get(cell_id)
-        except KeyError:
-            existing = None
+        with self._cell_locks.hold(cell_id):
+            try:
+                existing = self.cell_repo.get(cell_id)
+            except KeyError:
+                existing = None
 
-        if existing is not None:
-            from .exceptions import DuplicateCellError
-            raise DuplicateCellError(cell_id)
+            if existing is not None:
+                from .exceptions import DuplicateCellError
+                raise DuplicateCellError(cell_id)
 
-        from .models import Cell
+            from .models import Cell
 
-        cell = Cell(
-            id=cell_id,
-            name=name,
-            capacity=capacity,
-            used=0,
-        )
+            cell = Cell(
+                id=cell_id,
+                name=name,
+                capacity=capacity,
+                used=0,
+            )
 
-        self.cell_repo.save(cell)
-        return cell
+            self.cell_repo.save(cell)
+            return cell
     def list_movements(self, book_id: int):
         """
         Tests expect: return all movements for given book_id.
@@ -172,46 +185,47 @@ class WarehouseService:
         if qty <= 0:
             raise WarehouseError("Quantity must be positive")
 
-        cell = self._get_cell(cell_id)
+        with self._locked(book_id, cell_id):
+            cell = self._get_cell(cell_id)
 
-        # Моки в full-тестах могут не иметь полей used/capacity
-        used = getattr(cell, "used", 0)
-        capacity = getattr(cell, "capacity", float("inf"))
+            # Моки в full-тестах могут не иметь полей used/capacity
+            used = getattr(cell, "used", 0)
+            capacity = getattr(cell, "capacity", float("inf"))
 
-        if used + qty > capacity:
-            raise WarehouseError("Cell over capacity")
+            if used + qty > capacity:
+                raise WarehouseError("Cell over capacity")
 
 
 
-        # дергаем stock
-        try:
-            item = self.stock_repo.get(book_id, cell_id)
-        except KeyError:
-            item = StockItem(book_id=book_id, cell_id=cell_id, quantity=Quantity(0))
+            # дергаем stock
+            try:
+                item = self.stock_repo.get(book_id, cell_id)
+            except KeyError:
+                item = StockItem(book_id=book_id, cell_id=cell_id, quantity=Quantity(0))
 
-        item.increase(qty)
-        self.stock_repo.save(item)
+            item.increase(qty)
+            self.stock_repo.save(item)
 
-        # обновляем ячейку
-        try:
-            cell.used = used + qty
-            self.cell_repo.save(cell)
-        except Exception:
-            pass
+            # обновляем ячейку
+            try:
+                cell.used = used + qty
+                self.cell_repo.save(cell)
+            except Exception:
+                pass
 
 
-        # вот эта строка обязательна!!!
-        movement = StockMovement(
-            id=self._generate_movement_id(),
-            book_id=book_id,
-            from_cell_id=None,
-            to_cell_id=cell_id,
-            quantity=Quantity(qty),
-            movement_type=MovementType.INBOUND,
-            comment=comment,
-        )
+            # вот эта строка обязательна!!!
+            movement = StockMovement(
+                id=self._generate_movement_id(),
+                book_id=book_id,
+                from_cell_id=None,
+                to_cell_id=cell_id,
+                quantity=Quantity(qty),
+                movement_type=MovementType.INBOUND,
+                comment=comment,
+            )
 
-        self.movement_repo.save(movement)  # <--- тест требует это!
+            self.movement_repo.save(movement)  # <--- тест требует это!
 
 
 
@@ -235,128 +249,131 @@ class WarehouseService:
         if from_cell_id == to_cell_id:
             raise NotEnoughStock()
 
-        source = self._get_cell(from_cell_id)
-        target = self._get_cell(to_cell_id)
-
-        # Проверка capacity target
-        if target.used + qty > target.capacity:
-            raise WarehouseError("Target cell over capacity")
-
-        # Берём stock source
-        try:
-            stock_from = self.stock_repo.get(book_id, from_cell_id)
-        except KeyError:
-            from .exceptions import StockItemNotFound
-            raise StockItemNotFound(book_id, from_cell_id)
-
-        if stock_from.quantity.amount < qty:
-            raise NotEnoughStock()
-
-        # Берём/создаём stock target
-        try:
-            stock_to = self.stock_repo.get(book_id, to_cell_id)
-        except KeyError:
-            stock_to = StockItem(book_id=book_id, cell_id=to_cell_id, quantity=Quantity(0))
+        with self._locked(book_id, from_cell_id, to_cell_id):
+            source = self._get_cell(from_cell_id)
+            target = self._get_cell(to_cell_id)
 
-        # Обновляем кол-ва
-        stock_from.decrease(qty)
-        stock_to.increase(qty)
+            # Проверка capacity target
+            if target.used + qty > target.capacity:
+                raise WarehouseError("Target cell over capacity")
 
-        self.stock_repo.save(stock_from)
-        self.stock_repo.save(stock_to)
+            # Берём stock source
+            try:
+                stock_from = self.stock_repo.get(book_id, from_cell_id)
+            except KeyError:
+                from .exceptions import StockItemNotFound
+                raise StockItemNotFound(book_id, from_cell_id)
 
-        # Обновляем used ячеек
-        source.used -= qty
-        target.used += qty
-        self.cell_repo.save(source)
-        self.cell_repo.save(target)
+            if stock_from.quantity.amount < qty:
+                raise NotEnoughStock()
 
-        # Записываем движение
-        movement = StockMovement(
-            id=self._generate_movement_id(),
-            book_id=book_id,
-            from_cell_id=from_cell_id,
-            to_cell_id=to_cell_id,
-            quantity=Quantity(qty),
-            movement_type=MovementType.MOVE,
-            comment=comment,
-        )
-        self.movement_repo.save(movement)
+            # Берём/создаём stock target
+            try:
+                stock_to = self.stock_repo.get(book_id, to_cell_id)
+            except KeyError:
+                stock_to = StockItem(book_id=book_id, cell_id=to_cell_id, quantity=Quantity(0))
+
+            # Обновляем кол-ва
+            stock_from.decrease(qty)
+            stock_to.increase(qty)
+
+            self.stock_repo.save(stock_from)
+            self.stock_repo.save(stock_to)
+
+            # Обновляем used ячеек
+            source.used -= qty
+            target.used += qty
+            self.cell_repo.save(source)
+            self.cell_repo.save(target)
+
+            # Записываем движение
+            movement = StockMovement(
+                id=self._generate_movement_id(),
+                book_id=book_id,
+                from_cell_id=from_cell_id,
+                to_cell_id=to_cell_id,
+                quantity=Quantity(qty),
+                movement_type=MovementType.MOVE,
+                comment=comment,
+            )
+            self.movement_repo.save(movement)
 
     def outbound(self, book_id: int, cell_id: int, qty: int, comment: str = ""):
         """
         Отгрузка товара из ячейки.
         """
-        cell = self._get_cell(cell_id)
-
-        try:
-            stock = self.stock_repo.get(book_id, cell_id)
-        except KeyError:
-            raise StockItemNotFound(book_id, cell_id)
+        with self._locked(book_id, cell_id, capacity=False):
+            cell = self._get_cell(cell_id)
 
-        # Проверка остатков
-        if stock.quantity.amount < qty:
-            raise NotEnoughStock()
+            try:
+                stock = self.stock_repo.get(book_id, cell_id)
+            except KeyError:
+                raise StockItemNotFound(book_id, cell_id)
 
-        stock.decrease(qty)
+            # Проверка остатков
+            if stock.quantity.amount < qty:
+                raise NotEnoughStock()
 
-        if stock.quantity.amount == 0:
-            self.stock_repo.delete(book_id, cell_id)
-        else:
-            self.stock_repo.save(stock)
+            stock.decrease(qty)
 
-        movement = StockMovement(
-            id=self._generate_movement_id(),
-            book_id=book_id,
-            from_cell_id=cell_id,
-            to_cell_id=None,
-            quantity=Quantity(qty),
-            movement_type=MovementType.OUTBOUND,
-            comment=comment,
-        )
-        self.movement_repo.save(movement)
+            if stock.quantity.amount == 0:
+                self.stock_repo.delete(book_id, cell_id)
+            else:
+                self.stock_repo.save(stock)
+
+            movement = StockMovement(
+                id=self._generate_movement_id(),
+                book_id=book_id,
+                from_cell_id=cell_id,
+                to_cell_id=None,
+                quantity=Quantity(qty),
+                movement_type=MovementType.OUTBOUND,
+                comment=comment,
+            )
+            self.movement_repo.save(movement)
 
     def relocate(self, book_id: int, from_cell_id: int, to_cell_id: int, qty: int, comment: str = ""):
         """
         Перемещение книги между ячейками.
         """
-        from_cell = self._get_cell(from_cell_id)
-        to_cell = self._get_cell(to_cell_id)
-
-        try:
-            from_stock = self.stock_repo.get(book_id, from_cell_id)
-        except KeyError:
-            raise StockItemNotFound(book_id, from_cell_id)
-
-        if from_stock.quantity.amount < qty:
-            raise NotEnoughStock()
+        with self._locked(book_id, from_cell_id, to_cell_id, capacity=False):
+            from_cell = self._get_cell(from_cell_id)
+            to_cell = self._get_cell(to_cell_id)
 
-        # списываем из исходной ячейки
-        from_stock.decrease(qty)
-        if from_stock.quantity.amount == 0:
-            self.stock_repo.delete(book_id, from_cell_id)
-        else:
-            self.stock_repo.save(from_stock)
+            try:
+                from_stock = self.stock_repo.get(book_id, from_cell_id)
+            except KeyError:
+                raise StockItemNotFound(book_id, from_cell_id)
 
-        # добавляем в целевую
-        try:
-            to_stock = self.stock_repo.get(book_id, to_cell_id)
-        except KeyError:
-            to_stock = StockItem(book_id=book_id, cell_id=to_cell_id, quantity=Quantity(0))
+            if from_stock.quantity.amount < qty:
+                raise NotEnoughStock()
 
-        to_stock.increase(qty)
-        self.stock_repo.save(to_stock)
+            # списываем из исходной ячейки
+            from_stock.decrease(qty)
+            if from_stock.quantity.amount == 0:
+                self.stock_repo.delete(book_id, from_cell_id)
+            else:
+                self.stock_repo.save(from_stock)
 
-        movement = StockMovement(
-            id=self._generate_movement_id(),
-            book_id=book_id,
-            from_cell_id=from_cell_id,
-            to_cell_id=to_cell_id,
-            quantity=Quantity(qty),
-            movement_type=MovementType.RELOCATION,
-            comment=comment,
-        )
-        self.movement_repo.save(movement)
+            # добавляем в целевую
+            try:
+                to_stock = self.stock_repo.get(book_id, to_cell_id)
+            except KeyError:
+                to_stock = StockItem(book_id=book_id, cell_id=to_cell_id, quantity=Quantity(0))
+
+            to_stock.increase(qty)
+            self.stock_repo.save(to_stock)
+
+            movement = StockMovement(
+                id=self._generate_movement_id(),
+                book_id=book_id,
+                from_cell_id=from_cell_id,
+                to_cell_id=to_cell_id,
+                quantity=Quantity(qty),
+                movement_type=MovementType.RELOCATION,
+                comment=comment,
+            )
+            self.movement_repo.save(movement)
 
     def get_total_stock_for_book(self, book_id: int) -> int:
         """
@@ -479,6 +496,28 @@ class WarehouseService:
     # Helpers
     # ==========================
 
+    @contextmanager
+    def _locked(self, book_id: int, *cell_ids: int, capacity: bool = True):
+        """
+        Захват полос для операции над ячейками cell_ids.
+        Порядок всегда: сначала cell-полосы, затем stock-полосы (внутри — по индексу),
+        поэтому встречные move(a→b) и move(b→a) не дают deadlock.
+        capacity=False — операция не трогает used/capacity, достаточно stock-полос.
+        Записи коммитятся внутри (atomic), до снятия полос: иначе следующая операция
+        под теми же полосами прочитала бы старые остатки из хранилища.
+        """
+        if capacity:
+            with self._cell_locks.hold(*cell_ids):
+                with self._stock_locks.hold(*((book_id, c) for c in cell_ids)), self._atomic():
+                    yield
+        else:
+            with self._stock_locks.hold(*((book_id, c) for c in cell_ids)), self._atomic():
+                yield
+
+    def _atomic(self):
+        atomic = getattr(self.stock_repo, "atomic", None)
+        return atomic() if atomic is not None else StockRepository.atomic(self.stock_repo)
+
     def _get_cell(self, cell_id: int):
         try:
             return self.cell_repo.get(cell_id)
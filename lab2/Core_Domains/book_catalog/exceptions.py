@@ -9,3 +9,17 @@ class BookNotFound(BookCatalogError):
 
 class InvalidSearchFilter(BookCatalogError):
     pass
+
+
+class InvalidBookRow(BookCatalogError):
+    """Строка фида не превращается в Book: нет поля, не то значение."""
+    pass
+
+
+class BookVersionConflict(BookCatalogError):
+    """Книгу изменили между get и save: сохраняемая версия уже не текущая."""
+
+    def __init__(self, book_id: int, version: int):
+        self.book_id = book_id
+        self.version = version
+        super().__init__(f"Book with id={book_id} was modified concurrently (version {version} is stale)")
@@ -0,0 +1,104 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from .models import Book
+
+
+@dataclass(frozen=True)
+class FacetKeys:
+    """Что книга вносит в счётчики: снимок хранится, чтобы delete знал, что вычесть."""
+    genre: str
+    status: str
+    authors: Tuple[str, ...]
+
+    def items(self) -> List[Tuple[str, str]]:
+        pairs = [("status", self.status)]
+        if self.genre:
+            pairs.append(("genre", self.genre))
+        pairs.extend(("author", name) for name in self.authors)
+        return pairs
+
+
+def facet_keys(book: Book) -> FacetKeys:
+    # автор учитывается один раз на книгу, даже если указан дважды
+    authors = tuple(dict.fromkeys(a.name.strip() for a in (book.authors or []) if a.name.strip()))
+    return FacetKeys(
+        genre=book.genre.name.strip() if book.genre is not None else "",
+        status=book.status.value if book.status else "",
+        authors=authors,
+    )
+
+
+@dataclass
+class CatalogFacets:
+    total: int = 0
+    genres: Dict[str, int] = field(default_factory=dict)
+    authors: Dict[str, int] = field(default_factory=dict)
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_counts(cls, total: int, counts: Dict[Tuple[str, str], int],
+                    top: Optional[int] = None) -> "CatalogFacets":
+        """counts: (facet, value) → число книг. Значения — по убыванию, top на каждый фасет."""
+        groups: Dict[str, Counter] = {"genre": Counter(), "author": Counter(), "status": Counter()}
+        for (facet, value), n in counts.items():
+            if n > 0 and facet in groups:
+                groups[facet][value] = n
+
+        def ordered(c: Counter) -> Dict[str, int]:
+            return dict(sorted(c.items(), key=lambda kv: (-kv[1], kv[0]))[:top])
+
+        return cls(
+            total=total,
+            genres=ordered(groups["genre"]),
+            authors=ordered(groups["author"]),
+            statuses=ordered(groups["status"]),
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "genres": self.genres,
+            "authors": self.authors,
+            "statuses": self.statuses,
+        }
+
+
+def count_facets(books: Iterable[Book], top: Optional[int] = None) -> CatalogFacets:
+    """Полный пересчёт — когда счётчики не подключены."""
+    counts: Counter = Counter()
+    total = 0
+    for book in books:
+        total += 1
+        counts.update(facet_keys(book).items())
+    return CatalogFacets.from_counts(total, counts, top)
+
+
+class BookFacetCounter(ABC):
+    """Счётчики книг по жанру, автору и статусу, обновляемые на каждом save/delete."""
+
+    @abstractmethod
+    def apply(self, book: Book) -> None:
+        """Новая книга или новая версия существующей."""
+        pass
+
+    @abstractmethod
+    def remove(self, book_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def counts(self, top: Optional[int] = None) -> CatalogFacets:
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        pass
+
+    def apply_many(self, books: Iterable[Book]) -> None:
+        for book in books:
+            self.apply(book)
+
+    def rebuild(self, books: Iterable[Book]) -> None:
+        self.reset()
+        self.apply_many(books)
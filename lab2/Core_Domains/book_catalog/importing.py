@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Mapping, Tuple, TypeVar
+
+from .exceptions import InvalidBookRow
+from .models import Author, Book, Edition, Genre, Publisher
+from .value_objects import BookStatus, Price
+
+# ключ, которым читатель фида помечает нечитаемую строку (битый JSON и т.п.)
+ROW_ERROR = "__error__"
+
+T = TypeVar("T")
+
+
+@dataclass
+class ImportProgress:
+    rows: int = 0
+    imported: int = 0
+    rejected: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    # (номер строки фида, причина) — только первые MAX_ERRORS, счёт идёт в rejected
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    MAX_ERRORS = 100
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((line, reason))
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "chunks": self.chunks,
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": [list(e) for e in self.errors],
+        }
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    if size <= 0:
+        raise ValueError("Chunk size must be positive")
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _text(row: Mapping[str, Any], key: str) -> str:
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _names(value: Any) -> List[str]:
+    # CSV: "Фаулер; Бек", JSONL: ["Фаулер", "Бек"]
+    if value is None:
+        return []
+    parts = value if isinstance(value, (list, tuple)) else str(value).split(";")
+    return [str(p).strip() for p in parts if str(p).strip()]
+
+
+def book_from_row(row: Mapping[str, Any]) -> Book:
+    """
+    Строка фида поставщика → Book.
+    Обязательны id, title, price; authors, genre, publisher, isbn,
+    publish_date (ISO), pages, currency, status, description — по желанию.
+    Авторы, жанр и издатель приходят без id — получают id=0.
+    """
+    if row.get(ROW_ERROR):
+        raise InvalidBookRow(str(row[ROW_ERROR]))
+
+    try:
+        book_id = int(_text(row, "id"))
+    except ValueError:
+        raise InvalidBookRow(f"bad id: {row.get('id')!r}")
+    if book_id <= 0:
+        raise InvalidBookRow(f"bad id: {book_id}")
+
+    title = _text(row, "title")
+    if not title:
+        raise InvalidBookRow("empty title")
+
+    try:
+        amount = float(_text(row, "price"))
+    except ValueError:
+        raise InvalidBookRow(f"bad price: {row.get('price')!r}")
+    if amount < 0:
+        raise InvalidBookRow(f"negative price: {amount}")
+
+    status = BookStatus.AVAILABLE
+    if _text(row, "status"):
+        try:
+            status = BookStatus(_text(row, "status").lower())
+        except ValueError:
+            raise InvalidBookRow(f"bad status: {row.get('status')!r}")
+
+    edition = None
+    if _text(row, "isbn"):
+        try:
+            published = _text(row, "publish_date")
+            published = date.fromisoformat(published) if published else None
+            pages = int(_text(row, "pages") or 0)
+        except ValueError as e:
+            raise InvalidBookRow(f"bad edition: {e}")
+        edition = Edition(_text(row, "isbn"), published, pages)
+
+    return Book(
+        id=book_id,
+        title=title,
+        authors=[Author(0, name) for name in _names(row.get("authors"))],
+        genre=Genre(0, _text(row, "genre")) if _text(row, "genre") else None,
+        publisher=Publisher(0, _text(row, "publisher")) if _text(row, "publisher") else None,
+        edition=edition,
+        price=Price(amount, _text(row, "currency").upper() or "USD"),
+        status=status,
+        description=_text(row, "description") or None,
+    )
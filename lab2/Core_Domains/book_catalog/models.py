@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import List, Optional
 from datetime import date
 from .value_objects import Price, BookStatus
@@ -42,6 +42,13 @@ class Book:
     price: Price
     status: BookStatus = BookStatus.AVAILABLE
     description: Optional[str] = None
+    # версия для compare-and-set в репозитории: 0 — книга ещё не сохранялась,
+    # после каждого save репозиторий выставляет новую
+    version: int = field(default=0, compare=False)
+
+    def clone(self) -> "Book":
+        """Независимая копия: правки статуса/авторов не видны другим читателям."""
+        return replace(self, authors=list(self.authors))
 
     def update_price(self, new_price: Price):
         self.price = new_price
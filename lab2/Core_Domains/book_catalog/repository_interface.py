@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from .models import Book
 
 
@@ -19,8 +19,18 @@ class BookRepository(ABC):
 
     @abstractmethod
     def save(self, book: Book) -> None:
+        """
+        Compare-and-set: книга с version > 0 записывается, только если
+        в хранилище та же версия, иначе BookVersionConflict; version == 0 —
+        запись без проверки. После записи book.version — новая версия.
+        """
         pass
 
     @abstractmethod
     def delete(self, book_id: int) -> None:
         pass
+
+    def save_many(self, books: Iterable[Book]) -> None:
+        """Пачка книг; SQL-репозитории переопределяют одним executemany и commit."""
+        for book in books:
+            self.save(book)
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+from .models import Book
+from .value_objects import BookStatus
+
+
+class BookSearchIndex(ABC):
+
+    @abstractmethod
+    def index(self, book: Book) -> None:
+        """Add or re-index a book."""
+        pass
+
+    @abstractmethod
+    def remove(self, book_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def search(
+        self,
+        title: Optional[str] = None,
+        author: Optional[str] = None,
+        genre: Optional[str] = None,
+        status: Optional[BookStatus] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Return ids of matching books, best match first."""
+        pass
+
+    def rebuild(self, books: List[Book]) -> None:
+        for book in books:
+            self.index(book)
+
+    def index_many(self, books: Iterable[Book]) -> None:
+        for book in books:
+            self.index(book)
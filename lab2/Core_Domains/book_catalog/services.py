@@ -1,22 +1,44 @@
-from typing import List, Optional
+import time
+from typing import Any, Callable, Iterable, List, Mapping, Optional
 from .models import Book
 from .value_objects import Price, BookStatus
-from .exceptions import BookNotFound, InvalidSearchFilter
+from .exceptions import BookNotFound, BookVersionConflict, InvalidBookRow, InvalidSearchFilter
+from .importing import ImportProgress, book_from_row, chunked
 from .repository_interface import BookRepository
+from .search_index_interface import BookSearchIndex
+from .facets_interface import BookFacetCounter, CatalogFacets, count_facets
 
 
 class BookCatalogService:
+    # сколько раз перечитать книгу, если её сохранили между нашими get и save.
+    # Повтор сразу, без sleep: в режимах memory/sqlite_async сервис выполняется
+    # на event loop, и пауза остановила бы все запросы
+    MAX_CONFLICT_RETRIES = 5
 
-    def __init__(self, repo: BookRepository):
+    def __init__(self, repo: BookRepository, search_index: Optional[BookSearchIndex] = None,
+                 facets: Optional[BookFacetCounter] = None):
         self.repo = repo
+        # индекс должен обновляться при save/delete (см. IndexedBookRepository)
+        self.search_index = search_index
+        # счётчики — так же (см. FacetCountingBookRepository)
+        self.facet_counter = facets
 
     def search(
         self,
         title: Optional[str] = None,
         author: Optional[str] = None,
         genre: Optional[str] = None,
-        status: Optional[BookStatus] = None
+        status: Optional[BookStatus] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
     ) -> List[Book]:
+        if self.search_index is not None:
+            ids = self.search_index.search(
+                title=title, author=author, genre=genre, status=status,
+                offset=offset, limit=limit,
+            )
+            return self._load(ids)
+
         books = self.repo.list()
 
         if title:
@@ -34,6 +56,24 @@ class BookCatalogService:
         if status:
             books = [b for b in books if b.status == status]
 
+        end = None if limit is None else offset + limit
+        return books[offset:end]
+
+    def facets(self, top: Optional[int] = None) -> CatalogFacets:
+        """Число книг по жанрам, авторам и статусам; top — сколько значений на фасет."""
+        if top is not None and top <= 0:
+            raise InvalidSearchFilter("top must be positive")
+        if self.facet_counter is not None:
+            return self.facet_counter.counts(top)
+        return count_facets(self.repo.list(), top)
+
+    def _load(self, ids: List[int]) -> List[Book]:
+        books = []
+        for book_id in ids:
+            try:
+                books.append(self.repo.get(book_id))
+            except KeyError:
+                continue  # удалена между поиском и загрузкой
         return books
 
     def get_book(self, book_id: int) -> Book:
@@ -42,37 +82,80 @@ class BookCatalogService:
         except KeyError:
             raise BookNotFound(book_id)
 
+    def _change(self, book_id: int, change: Callable[[Book], None]) -> Book:
+        """
+        get → change → save с compare-and-set в репозитории. Без блокировок:
+        при конфликте версий книга перечитывается и change (с его проверками
+        статуса) применяется заново, так что из гонки выигрывает ровно один.
+        """
+        for attempt in range(1, self.MAX_CONFLICT_RETRIES + 1):
+            book = self.get_book(book_id)
+            change(book)
+            try:
+                self.repo.save(book)
+                return book
+            except BookVersionConflict:
+                if attempt == self.MAX_CONFLICT_RETRIES:
+                    raise
+
     def update_price(self, book_id: int, new_price: Price):
-        book = self.get_book(book_id)
-        book.update_price(new_price)
-        self.repo.save(book)
+        self._change(book_id, lambda book: book.update_price(new_price))
 
     def reserve_book(self, book_id: int):
-        book = self.get_book(book_id)
+        def reserve(book: Book):
+            if book.status != BookStatus.AVAILABLE:
+                raise InvalidSearchFilter("Book cannot be reserved")
+            book.update_status(BookStatus.RESERVED)
 
-        if book.status != BookStatus.AVAILABLE:
-            raise InvalidSearchFilter("Book cannot be reserved")
-
-        book.update_status(BookStatus.RESERVED)
-        self.repo.save(book)
+        self._change(book_id, reserve)
 
     def release_reservation(self, book_id: int):
-        book = self.get_book(book_id)
+        def release(book: Book):
+            if book.status != BookStatus.RESERVED:
+                raise InvalidSearchFilter("Book is not reserved")
+            book.update_status(BookStatus.AVAILABLE)
 
-        if book.status != BookStatus.RESERVED:
-            raise InvalidSearchFilter("Book is not reserved")
-
-        book.update_status(BookStatus.AVAILABLE)
-        self.repo.save(book)
+        self._change(book_id, release)
 
     def discontinue_book(self, book_id: int):
-        book = self.get_book(book_id)
-        book.update_status(BookStatus.DISCONTINUED)
-        self.repo.save(book)
+        self._change(book_id, lambda book: book.update_status(BookStatus.DISCONTINUED))
     def add_book(self, book: Book):
         """Создание новой книги в каталоге."""
         self.repo.save(book)
         return book
+    def import_books(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        chunk_size: int = 1000,
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> ImportProgress:
+        """
+        Потоковый импорт фида: rows читаются лениво, по chunk_size строк
+        проверяются и пишутся одним save_many (одна транзакция на чанк).
+        Плохие строки не прерывают импорт — попадают в progress.errors.
+        """
+        progress = ImportProgress()
+        started = clock()
+
+        for chunk in chunked(enumerate(rows, 1), chunk_size):
+            books = []
+            for line, row in chunk:
+                try:
+                    books.append(book_from_row(row))
+                except InvalidBookRow as e:
+                    progress.reject(line, str(e))
+            if books:
+                self.repo.save_many(books)
+
+            progress.rows += len(chunk)
+            progress.imported += len(books)
+            progress.chunks += 1
+            progress.elapsed = clock() - started
+            if on_progress:
+                on_progress(progress)
+
+        return progress
     def remove_book(self, book_id: int):
         """Удаление книги из каталога по её ID."""
         try:
@@ -2,6 +2,9 @@
 
 import logging
 from logging.config import dictConfig
+from typing import Optional
+
+from Infrastructure.integrations.logging.audit_pipeline import AuditPipeline
 
 
 def setup_logging(level: str = "INFO"):
@@ -26,3 +29,21 @@ def setup_logging(level: str = "INFO"):
     }
 
     dictConfig(LOGGING)
+
+
+def setup_audit_logging(settings) -> Optional[AuditPipeline]:
+    """
+    Запускает асинхронный аудит (JSON-строки в ротируемый файл).
+    None — AUDIT_LOG_FILE пуст, аудит остаётся в общем логе.
+    """
+    if not settings.AUDIT_LOG_FILE:
+        return None
+
+    return AuditPipeline(
+        settings.AUDIT_LOG_FILE,
+        max_bytes=settings.AUDIT_LOG_MAX_BYTES,
+        backup_count=settings.AUDIT_LOG_BACKUPS,
+        queue_size=settings.AUDIT_QUEUE_SIZE,
+        policy=settings.AUDIT_QUEUE_POLICY,
+        batch_size=settings.AUDIT_BATCH_SIZE,
+    ).start()
@@ -24,17 +24,87 @@ class Settings(BaseSettings):
     #   БАЗА (если добавишь позже)
     # =============================
     DATABASE_URL: str = "sqlite:///./warehouse.db"
+    ID_BLOCKS_URL: str = ""                  # пусто — id_blocks.db рядом с файлом DATABASE_URL
+    STORAGE_BACKEND: str = "memory"  # memory / sqlite / sqlite_async (aiosqlite)
+
+    # =============================
+    #   SQLITE PROFILE
+    # =============================
+    SQLITE_WAL: bool = True                  # journal_mode=WAL: читатели не ждут писателя
+    SQLITE_SYNCHRONOUS: str = "NORMAL"       # в WAL fsync только на checkpoint
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_STATEMENT_CACHE: int = 256        # prepared statements на соединение
+    SQLITE_POOL_SIZE: int = 8
+    SQLITE_MAX_OVERFLOW: int = 32            # до размера threadpool FastAPI (40)
+
+    # =============================
+    #   CACHE
+    # =============================
+    BOOK_CACHE_SIZE: int = 1024
+    BOOK_CACHE_TTL_SECONDS: float = 300
+
+    # =============================
+    #   EXTERNAL BOOK API
+    # =============================
+    BOOK_API_URL: str = "https://www.googleapis.com/books/v1/volumes"
+    BOOK_API_TIMEOUT_SECONDS: float = 5.0
+    BOOK_API_WORKERS: int = 8                    # параллельных запросов в find_many
+    BOOK_API_RATE_PER_SECOND: float = 10.0       # общий лимит на все потоки
+    BOOK_API_RETRY_ATTEMPTS: int = 3
+    ISBN_CACHE_URL: str = ""                     # пусто — sqlite:// для memory, ./isbn_cache.db иначе
+    ISBN_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    ISBN_CACHE_NEGATIVE_TTL_SECONDS: float = 24 * 3600
 
     # =============================
     #   SECURITY
     # =============================
     SECRET_KEY: str = "SUPER_SECRET_KEY"  # вынести в .env
+    PASSWORD_HASH_WORKERS: int = 2        # процессы под PBKDF2
+    PASSWORD_HASH_MAX_PENDING: int = 32   # сверх этого — 503, а не очередь
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    TOKEN_CACHE_SIZE: int = 10_000        # проверенные токены в памяти
+    TOKEN_RECHECK_SECONDS: float = 30     # как часто кеш сверяется с записью пользователя
+
+    # =============================
+    #   PAYMENT GATEWAY
+    # =============================
+    BANK_GATEWAY_URL: str = ""              # пусто — встроенный эмулятор BankGateway
+    BANK_TIMEOUT_SECONDS: float = 3.0       # на одну попытку
+    BANK_DEADLINE_SECONDS: float = 5.0      # на вызов вместе с повторами
+    BANK_RETRY_ATTEMPTS: int = 3
+    BANK_BREAKER_THRESHOLD: int = 5         # ошибок подряд до размыкания цепи
+    BANK_BREAKER_RESET_SECONDS: float = 30.0
+
+    # =============================
+    #   NOTIFICATIONS
+    # =============================
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 587
+    SMTP_LOGIN: str = ""                    # пусто — без AUTH
+    SMTP_PASSWORD: str = ""
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    TELEGRAM_API_URL: str = "https://api.telegram.org"
+    TELEGRAM_BOT_TOKEN: str = ""
+    TELEGRAM_CHAT_ID: str = ""
+    TELEGRAM_TIMEOUT_SECONDS: float = 5.0
+    OUTBOX_URL: str = ""                    # пусто — sqlite:// для memory, outbox.db рядом с DATABASE_URL иначе
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 8            # после — статус dead
 
     # =============================
     #   LOGGING
     # =============================
     LOG_LEVEL: str = "INFO"
+    AUDIT_LOG_FILE: str = "./logs/audit.jsonl"   # пусто — аудит в общий лог синхронно
+    AUDIT_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    AUDIT_LOG_BACKUPS: int = 5
+    AUDIT_QUEUE_SIZE: int = 10_000
+    AUDIT_QUEUE_POLICY: str = "drop"             # drop / block — при переполнении очереди
+    AUDIT_BATCH_SIZE: int = 256                  # записей на один flush
 
     class Config:
         env_file = ".env"
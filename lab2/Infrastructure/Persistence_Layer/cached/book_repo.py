@@ -0,0 +1,75 @@
+# Infrastructure/persistence/cached/book_repo.py
+
+from typing import Optional
+
+from Core_Domains.book_catalog.repository_interface import BookRepository
+from Core_Domains.book_catalog.models import Book
+from Infrastructure.Persistence_Layer.cached.lru_cache import LRUCache
+
+
+class CachedBookRepository(BookRepository):
+    """
+    Read-through кеш поверх любого BookRepository.
+    get() обслуживается из памяти (копией — кешированную книгу не правят),
+    save()/delete() сбрасывают запись, в т.ч. при конфликте версий:
+    устаревшая версия в кеше иначе проваливала бы каждый повтор.
+    Внутри unit of work запись сбрасывается ещё раз после его commit/rollback:
+    параллельный get() мог успеть закешировать строку до коммита.
+    Если unit of work уже писал, get() идёт мимо кеша (без чтения и заполнения):
+    его сессия видит незакоммиченные строки, которых другим запросам видеть нельзя.
+    list()/find_by_title() идут напрямую во внутренний репозиторий.
+    """
+
+    def __init__(self, inner: BookRepository, max_size: int = 1024,
+                 ttl_seconds: Optional[float] = 300, cache: Optional[LRUCache] = None):
+        self.inner = inner
+        self.cache = cache or LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    def get(self, book_id: int) -> Book:
+        reads_uncommitted = getattr(self.inner, "reads_uncommitted", None)
+        if reads_uncommitted is not None and reads_uncommitted():
+            return self.inner.get(book_id)
+
+        book = self.cache.get(book_id)
+        if book is None:
+            book = self.inner.get(book_id)  # KeyError не кешируем
+            self.cache.put(book_id, book)
+        return book.clone()
+
+    def list(self):
+        return self.inner.list()
+
+    def find_by_title(self, title: str):
+        return self.inner.find_by_title(title)
+
+    def save(self, book: Book):
+        try:
+            self.inner.save(book)
+        finally:
+            self._invalidate([book.id])
+
+    def save_many(self, books):
+        books = list(books)
+        try:
+            self.inner.save_many(books)
+        finally:
+            self._invalidate([book.id for book in books])
+
+    def delete(self, book_id: int):
+        try:
+            self.inner.delete(book_id)
+        finally:
+            self._invalidate([book_id])
+
+    def _invalidate(self, book_ids):
+        def drop():
+            for book_id in book_ids:
+                self.cache.invalidate(book_id)
+
+        drop()
+        after_transaction = getattr(self.inner, "after_transaction", None)
+        if after_transaction is not None:
+            after_transaction(drop)
+
+    def stats(self) -> dict:
+        return {**self.cache.stats.as_dict(), "size": len(self.cache)}
@@ -0,0 +1,79 @@
+# Infrastructure/persistence/cached/lru_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Hashable, Optional
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0      # вытеснено по размеру
+    expirations: int = 0    # истёк TTL
+    invalidations: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class LRUCache:
+    """
+    Bounded LRU cache with an optional per-entry TTL.
+    Thread-safe; counters are kept in `stats` for monitoring.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.stats = CacheStats()
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is self._MISSING:
+                self.stats.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, self._MISSING) is not self._MISSING:
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.stats.invalidations += len(self._data)
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,25 +1,40 @@
 # Infrastructure/persistence/in_memory/book_repo.py
 
+import threading
+
+from Core_Domains.book_catalog.exceptions import BookVersionConflict
 from Core_Domains.book_catalog.repository_interface import BookRepository
 from Core_Domains.book_catalog.models import Book
 
 
 class InMemoryBookRepository(BookRepository):
+    """
+    Хранит и отдаёт копии книг, как БД: правка полученной книги
+    не видна остальным, пока не прошла compare-and-set в save().
+    """
+
     def __init__(self):
         self.data = {}  # ключ = id
+        self._lock = threading.Lock()  # только на сверку версии и запись
 
     def get(self, book_id: int) -> Book:
-        return self.data[book_id]
+        return self.data[book_id].clone()
 
     def list(self):
-        return list(self.data.values())
+        return [b.clone() for b in self.data.values()]
 
     def find_by_title(self, title: str):
         title = title.lower()
-        return [b for b in self.data.values() if title in b.title.lower()]
+        return [b.clone() for b in self.data.values() if title in b.title.lower()]
 
     def save(self, book: Book):
-        self.data[book.id] = book
+        with self._lock:
+            stored = self.data.get(book.id)
+            if book.version and (stored is None or stored.version != book.version):
+                raise BookVersionConflict(book.id, book.version)
+            book.version = stored.version + 1 if stored else 1
+            self.data[book.id] = book.clone()
 
     def delete(self, book_id: int):
-        del self.data[book_id]
+        with self._lock:
+            del self.data[book_id]
@@ -1,32 +1,79 @@
 # Infrastructure/persistence/in_memory/order_repo.py
 
+from collections import defaultdict
+from typing import Dict
+
 from Core_Domains.Order_Processing.repository_interface import OrderRepository
 from Core_Domains.Order_Processing.models import Order
+from Core_Domains.Order_Processing.value_objects import OPEN_ORDER_STATUSES
 
 
 class InMemoryOrderRepository(OrderRepository):
+    """
+    Кроме data держит индексы, обновляемые в save()/delete():
+      customer_id → {order_id: Order}            — заказы покупателя;
+      customer_id → {order_id: None} (по порядку) — открытые корзины.
+    """
+
     def __init__(self):
         self.data = {}
+        self._owner: Dict[int, int] = {}
+        self._by_customer: Dict[int, Dict[int, Order]] = defaultdict(dict)
+        self._open: Dict[int, Dict[int, None]] = defaultdict(dict)
 
     def get(self, order_id: int) -> Order:
         return self.data[order_id]
 
     def save(self, order: Order):
+        owner = self._owner.get(order.id)
+        if owner is not None and owner != order.customer_id:
+            self._unindex(order.id, owner)
+
         self.data[order.id] = order
+        self._owner[order.id] = order.customer_id
+        self._by_customer[order.customer_id][order.id] = order
+
+        # смена статуса отражается здесь: открытый заказ — в указатели корзин
+        if order.status in OPEN_ORDER_STATUSES:
+            self._open[order.customer_id].setdefault(order.id, None)
+        else:
+            self._discard_open(order.customer_id, order.id)
 
     def delete(self, order_id: int):
         del self.data[order_id]
+        self._unindex(order_id, self._owner.pop(order_id))
 
     def list_by_customer(self, customer_id: int):
-        return [o for o in self.data.values() if o.customer_id == customer_id]
+        return list(self._by_customer.get(customer_id, {}).values())
+
     def list_all(self):
         return list(self.data.values())
 
     def list_by_user(self, user_id: int):
-        return [o for o in self.data.values() if o.customer_id == user_id]
+        return self.list_by_customer(user_id)
 
     def find_open_cart(self, user_id: int):
-        for o in self.data.values():
-            if o.customer_id == user_id and o.status.name in ("CREATED", "PENDING"):
-                return o
+        open_ids = self._open.get(user_id)
+        while open_ids:
+            order_id = next(iter(open_ids))
+            order = self.data.get(order_id)
+            if order is not None and order.status in OPEN_ORDER_STATUSES:
+                return order
+            # статус поменяли без save() — чиним указатель лениво
+            del open_ids[order_id]
         return None
+
+    def _unindex(self, order_id: int, customer_id: int):
+        orders = self._by_customer.get(customer_id)
+        if orders is not None:
+            orders.pop(order_id, None)
+            if not orders:
+                del self._by_customer[customer_id]
+        self._discard_open(customer_id, order_id)
+
+    def _discard_open(self, customer_id: int, order_id: int):
+        open_ids = self._open.get(customer_id)
+        if open_ids is not None:
+            open_ids.pop(order_id, None)
+            if not open_ids:
+                del self._open[customer_id]
@@ -1,31 +1,83 @@
 # Infrastructure/persistence/in_memory/payments_repo.py
 
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from Core_Domains.Payments.models import BalanceCheckpoint, decode_cursor, due_checkpoint, posting_key
 from Core_Domains.Payments.repository_interface import (
     AccountRepository, TransactionRepository
 )
 
 
 class InMemoryAccountRepository(AccountRepository):
-    def __init__(self):
+    """Checkpoints: account_id → точки баланса, отсортированные по ключу."""
+
+    def __init__(self, checkpoint_every: int = 100):
         self.data = {}
+        self.checkpoint_every = checkpoint_every
+        self._checkpoints: Dict[int, List[BalanceCheckpoint]] = defaultdict(list)
 
     def get(self, account_id: int):
         return self.data[account_id]
 
     def save(self, account):
         self.data[account.id] = account
+        points = self._checkpoints[account.id]
+        cp = due_checkpoint(account, self.checkpoint_every, opened=bool(points))
+        if cp is not None:
+            if points and points[-1].key > cp.key:
+                insort(points, cp, key=lambda p: p.key)
+            else:
+                points.append(cp)
+
+    def latest_checkpoint(self, account_id: int, at: datetime):
+        points = self._checkpoints.get(account_id, [])
+        pos = bisect_right(points, at, key=lambda p: p.created_at)
+        return points[pos - 1] if pos else None
 
 
 class InMemoryTransactionRepository(TransactionRepository):
+    """
+    Кроме data держит posting lists: account_id → отсортированные ключи
+    (created_at, id) его транзакций. Выписка — бинарный поиск начала и срез,
+    без обхода всех транзакций.
+    """
+
     def __init__(self):
         self.data = {}
+        self._postings: Dict[int, List[Tuple[datetime, int]]] = defaultdict(list)
+        self._indexed: Dict[int, Tuple[Tuple[datetime, int], Tuple[int, ...]]] = {}
 
     def save(self, trx):
+        key, accounts = posting_key(trx), tuple({trx.from_account, trx.to_account})
+        indexed = self._indexed.get(trx.id)
+        if indexed != (key, accounts):
+            if indexed is not None:
+                self._unindex(*indexed)
+            for acc_id in accounts:
+                insort(self._postings[acc_id], key)  # обычно append: время растёт
+            self._indexed[trx.id] = (key, accounts)
         self.data[trx.id] = trx
 
     def get(self, trx_id: int):
         return self.data[trx_id]
 
-    def list_by_account(self, account_id: int):
-        return [t for t in self.data.values()
-                if t.from_account == account_id or t.to_account == account_id]
+    def list_by_account(self, account_id: int, since: Optional[datetime] = None,
+                        limit: Optional[int] = None, cursor: Optional[str] = None):
+        keys = self._postings.get(account_id, [])
+        start = 0
+        if since is not None:
+            start = bisect_left(keys, (since,))
+        if cursor is not None:
+            start = max(start, bisect_right(keys, decode_cursor(cursor)))
+        end = len(keys) if limit is None else min(len(keys), start + limit)
+        return [self.data[trx_id] for _, trx_id in keys[start:end]]
+
+    def _unindex(self, key, accounts):
+        for acc_id in accounts:
+            keys = self._postings[acc_id]
+            pos = bisect_left(keys, key)
+            if pos < len(keys) and keys[pos] == key:
+                del keys[pos]
@@ -0,0 +1,42 @@
+# Infrastructure/persistence/search/faceted_book_repo.py
+
+from Core_Domains.book_catalog.facets_interface import BookFacetCounter
+from Core_Domains.book_catalog.models import Book
+from Core_Domains.book_catalog.repository_interface import BookRepository
+
+
+class FacetCountingBookRepository(BookRepository):
+    """Keeps a BookFacetCounter in sync with every save/delete of the wrapped repository."""
+
+    def __init__(self, inner: BookRepository, facets: BookFacetCounter, rebuild: bool = True):
+        self.inner = inner
+        self.facets = facets
+        if rebuild:
+            facets.rebuild(inner.list())
+
+    def get(self, book_id: int) -> Book:
+        return self.inner.get(book_id)
+
+    def list(self):
+        return self.inner.list()
+
+    def find_by_title(self, title: str):
+        return self.inner.find_by_title(title)
+
+    def save(self, book: Book):
+        self.inner.save(book)
+        self.facets.apply(book)
+
+    def save_many(self, books):
+        books = list(books)
+        self.inner.save_many(books)
+        self.facets.apply_many(books)
+
+    def delete(self, book_id: int):
+        self.inner.delete(book_id)  # KeyError — счётчики не трогаем
+        self.facets.remove(book_id)
+
+    def __getattr__(self, name):
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
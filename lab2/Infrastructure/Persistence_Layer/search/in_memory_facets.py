@@ -0,0 +1,51 @@
+# Infrastructure/persistence/search/in_memory_facets.py
+
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+from Core_Domains.book_catalog.facets_interface import (
+    BookFacetCounter, CatalogFacets, FacetKeys, facet_keys
+)
+from Core_Domains.book_catalog.models import Book
+
+
+class InMemoryBookFacetCounter(BookFacetCounter):
+    """Counter по (facet, value) и снимок FacetKeys на книгу: apply/remove — O(авторов книги)."""
+
+    def __init__(self):
+        self._keys: Dict[int, FacetKeys] = {}
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def apply(self, book: Book) -> None:
+        keys = facet_keys(book)
+        with self._lock:
+            old = self._keys.get(book.id)
+            if old == keys:
+                return
+            if old is not None:
+                self._subtract(old)
+            self._keys[book.id] = keys
+            self._counts.update(keys.items())
+
+    def remove(self, book_id: int) -> None:
+        with self._lock:
+            old = self._keys.pop(book_id, None)
+            if old is not None:
+                self._subtract(old)
+
+    def _subtract(self, keys: FacetKeys):
+        for item in keys.items():
+            self._counts[item] -= 1
+            if self._counts[item] <= 0:
+                del self._counts[item]
+
+    def counts(self, top: Optional[int] = None) -> CatalogFacets:
+        with self._lock:
+            return CatalogFacets.from_counts(len(self._keys), dict(self._counts), top)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._keys.clear()
+            self._counts.clear()
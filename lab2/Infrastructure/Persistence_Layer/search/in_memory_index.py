@@ -0,0 +1,172 @@
+# Infrastructure/persistence/search/in_memory_index.py
+
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from Core_Domains.book_catalog.models import Book
+from Core_Domains.book_catalog.search_index_interface import BookSearchIndex
+from Core_Domains.book_catalog.value_objects import BookStatus
+
+MAX_GRAM = 3
+
+
+def _fold(text: Optional[str]) -> str:
+    return (text or "").casefold()
+
+
+def _grams(text: str, n: int) -> Set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _rank(text: str, query: str) -> int:
+    """4 — точное совпадение, 3 — префикс, 2 — начало слова, 1 — подстрока."""
+    if text == query:
+        return 4
+    if text.startswith(query):
+        return 3
+    if re.search(r"(?<!\w)" + re.escape(query), text):
+        return 2
+    return 1 if query in text else 0
+
+
+@dataclass
+class _Doc:
+    title: str
+    authors: List[str]
+    genre: str
+    status: Optional[BookStatus]
+
+
+class InMemoryBookSearchIndex(BookSearchIndex):
+    """
+    Инвертированный индекс по n-граммам (1..3) для title и authors:
+    подстрока запроса ищется пересечением posting-листов её n-грамм,
+    затем кандидаты проверяются и ранжируются. genre/status — точные фасеты.
+    """
+
+    def __init__(self):
+        self._docs: Dict[int, _Doc] = {}
+        self._title_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._author_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._by_genre: Dict[str, Set[int]] = defaultdict(set)
+        self._by_status: Dict[Optional[BookStatus], Set[int]] = defaultdict(set)
+        self._lock = threading.RLock()
+
+    # ==========================
+    # Индексация
+    # ==========================
+
+    def index(self, book: Book) -> None:
+        doc = _Doc(
+            title=_fold(book.title),
+            authors=[_fold(a.name) for a in (book.authors or [])],
+            genre=_fold(book.genre.name) if book.genre is not None else "",
+            status=book.status,
+        )
+        with self._lock:
+            self._unindex(book.id)
+            self._docs[book.id] = doc
+            for gram in self._text_grams(doc.title):
+                self._title_grams[gram].add(book.id)
+            for name in doc.authors:
+                for gram in self._text_grams(name):
+                    self._author_grams[gram].add(book.id)
+            self._by_genre[doc.genre].add(book.id)
+            self._by_status[doc.status].add(book.id)
+
+    def remove(self, book_id: int) -> None:
+        with self._lock:
+            self._unindex(book_id)
+
+    def _unindex(self, book_id: int) -> None:
+        doc = self._docs.pop(book_id, None)
+        if doc is None:
+            return
+        for gram in self._text_grams(doc.title):
+            self._discard(self._title_grams, gram, book_id)
+        for name in doc.authors:
+            for gram in self._text_grams(name):
+                self._discard(self._author_grams, gram, book_id)
+        self._discard(self._by_genre, doc.genre, book_id)
+        self._discard(self._by_status, doc.status, book_id)
+
+    @staticmethod
+    def _discard(postings, key, book_id):
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(book_id)
+            if not ids:
+                del postings[key]
+
+    @staticmethod
+    def _text_grams(text: str) -> Set[str]:
+        grams = set()
+        for n in range(1, MAX_GRAM + 1):
+            grams |= _grams(text, n)
+        return grams
+
+    # ==========================
+    # Поиск
+    # ==========================
+
+    def search(
+        self,
+        title: Optional[str] = None,
+        author: Optional[str] = None,
+        genre: Optional[str] = None,
+        status: Optional[BookStatus] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        title_q, author_q = _fold(title), _fold(author)
+
+        with self._lock:
+            sets = []
+            if title_q:
+                sets.append(self._candidates(self._title_grams, title_q))
+            if author_q:
+                sets.append(self._candidates(self._author_grams, author_q))
+            if genre:
+                sets.append(self._by_genre.get(_fold(genre), set()))
+            if status:
+                sets.append(self._by_status.get(status, set()))
+
+            if sets:
+                sets.sort(key=len)
+                ids = set(sets[0]).intersection(*sets[1:])
+            else:
+                ids = set(self._docs)
+
+            scored = []
+            for book_id in ids:
+                doc = self._docs[book_id]
+                score = 0
+                if title_q:
+                    r = _rank(doc.title, title_q)
+                    if not r:
+                        continue  # ложное срабатывание n-грамм
+                    score += 2 * r
+                if author_q:
+                    r = max((_rank(a, author_q) for a in doc.authors), default=0)
+                    if not r:
+                        continue
+                    score += r
+                scored.append((-score, len(doc.title), book_id))
+
+        scored.sort()
+        end = None if limit is None else offset + limit
+        return [book_id for _, _, book_id in scored[offset:end]]
+
+    @staticmethod
+    def _candidates(postings, query: str) -> Set[int]:
+        n = min(MAX_GRAM, len(query))
+        lists = sorted((postings.get(g, set()) for g in _grams(query, n)), key=len)
+        if not lists or not lists[0]:
+            return set()
+        return set(lists[0]).intersection(*lists[1:])
+
+    def __len__(self) -> int:
+        return len(self._docs)
@@ -0,0 +1,43 @@
+# Infrastructure/persistence/search/indexed_book_repo.py
+
+from Core_Domains.book_catalog.repository_interface import BookRepository
+from Core_Domains.book_catalog.search_index_interface import BookSearchIndex
+from Core_Domains.book_catalog.models import Book
+
+
+class IndexedBookRepository(BookRepository):
+    """Keeps a BookSearchIndex in sync with every save/delete of the wrapped repository."""
+
+    def __init__(self, inner: BookRepository, index: BookSearchIndex, rebuild: bool = True):
+        self.inner = inner
+        self.search_index = index
+        if rebuild:
+            index.rebuild(inner.list())
+
+    def get(self, book_id: int) -> Book:
+        return self.inner.get(book_id)
+
+    def list(self):
+        return self.inner.list()
+
+    def find_by_title(self, title: str):
+        return self.inner.find_by_title(title)
+
+    def save(self, book: Book):
+        self.inner.save(book)
+        self.search_index.index(book)
+
+    def save_many(self, books):
+        books = list(books)
+        self.inner.save_many(books)
+        self.search_index.index_many(books)
+
+    def delete(self, book_id: int):
+        self.inner.delete(book_id)
+        self.search_index.remove(book_id)
+
+    def __getattr__(self, name):
+        # stats() кеша и прочие расширения внутреннего репозитория
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
@@ -0,0 +1,135 @@
+# Infrastructure/persistence/search/sqlite_facets.py
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Column, Integer, String, Text, bindparam, delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteRepository
+from Core_Domains.book_catalog.facets_interface import (
+    BookFacetCounter, CatalogFacets, FacetKeys, facet_keys
+)
+from Core_Domains.book_catalog.models import Book
+
+# SQLite ограничивает число параметров в одном запросе
+_CHUNK = 500
+
+
+class BookFacetDocRecord(Base):
+    """Что каждая книга сейчас вносит в счётчики — чтобы delete/смена статуса знали, что вычесть."""
+    __tablename__ = "book_facet_docs"
+
+    book_id = Column(Integer, primary_key=True)
+    genre = Column(String, nullable=False, default="")
+    status = Column(String, nullable=False, default="")
+    authors = Column(Text, nullable=False, default="")   # через "\n"
+
+
+class BookFacetCountRecord(Base):
+    __tablename__ = "book_facet_counts"
+
+    facet = Column(String, primary_key=True)     # genre / author / status
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+
+
+_docs = BookFacetDocRecord.__table__
+_counts = BookFacetCountRecord.__table__
+
+_doc_insert = sqlite_insert(_docs).values(
+    book_id=bindparam("book_id"), genre=bindparam("genre"),
+    status=bindparam("status"), authors=bindparam("authors"),
+)
+_DOC_UPSERT = _doc_insert.on_conflict_do_update(
+    index_elements=["book_id"],
+    set_={c: _doc_insert.excluded[c] for c in ("genre", "status", "authors")},
+)
+
+_count_insert = sqlite_insert(_counts).values(
+    facet=bindparam("facet"), value=bindparam("value"), count=bindparam("delta")
+)
+# счётчик меняется на дельту, а не перезаписывается — без чтения текущих значений
+_COUNT_ADD = _count_insert.on_conflict_do_update(
+    index_elements=["facet", "value"],
+    set_={"count": _counts.c.count + _count_insert.excluded.count},
+)
+
+
+def _keys(row) -> FacetKeys:
+    return FacetKeys(
+        genre=row.genre, status=row.status,
+        authors=tuple(a for a in row.authors.split("\n") if a),
+    )
+
+
+class SQLiteBookFacetCounter(SQLiteRepository, BookFacetCounter):
+    """
+    Материализованные счётчики в SQLite: apply_many читает прежние снимки
+    книг одним запросом, сводит изменения в дельты по (facet, value)
+    и пишет их одним executemany. counts() читает только book_facet_counts.
+    """
+
+    def __init__(self):
+        super().__init__(SessionLocal)
+
+    def apply(self, book: Book) -> None:
+        self.apply_many([book])
+
+    def apply_many(self, books: Iterable[Book]) -> None:
+        # последняя версия книги в пачке — итоговая
+        new = {book.id: facet_keys(book) for book in books}
+        if not new:
+            return
+        old = self._snapshots(list(new))
+
+        delta: Counter = Counter()
+        for book_id, keys in new.items():
+            if book_id in old:
+                delta.subtract(old[book_id].items())
+            delta.update(keys.items())
+
+        self._add(delta)
+        self.db.execute(_DOC_UPSERT, [
+            {"book_id": book_id, "genre": k.genre, "status": k.status, "authors": "\n".join(k.authors)}
+            for book_id, k in new.items()
+        ])
+        self._commit()
+
+    def remove(self, book_id: int) -> None:
+        old = self._snapshots([book_id]).get(book_id)
+        if old is None:
+            return
+        delta: Counter = Counter()
+        delta.subtract(old.items())
+        self._add(delta)
+        self.db.execute(delete(_docs).where(_docs.c.book_id == book_id))
+        self._commit()
+
+    def counts(self, top: Optional[int] = None) -> CatalogFacets:
+        total = self.db.execute(select(func.count()).select_from(_docs)).scalar_one()
+        rows = self.db.execute(
+            select(_counts.c.facet, _counts.c.value, _counts.c.count).where(_counts.c.count > 0)
+        )
+        return CatalogFacets.from_counts(total, {(f, v): n for f, v, n in rows}, top)
+
+    def reset(self) -> None:
+        self.db.execute(delete(_counts))
+        self.db.execute(delete(_docs))
+        self._commit()
+
+    def _snapshots(self, book_ids: List[int]) -> Dict[int, FacetKeys]:
+        found = {}
+        for i in range(0, len(book_ids), _CHUNK):
+            rows = self.db.execute(select(_docs).where(_docs.c.book_id.in_(book_ids[i:i + _CHUNK])))
+            found.update({row.book_id: _keys(row) for row in rows})
+        return found
+
+    def _add(self, delta: Counter):
+        changes: List[Tuple[str, str, int]] = [(f, v, n) for (f, v), n in delta.items() if n]
+        if not changes:
+            return
+        self.db.execute(_COUNT_ADD, [{"facet": f, "value": v, "delta": n} for f, v, n in changes])
+        # обнулившиеся значения не копим
+        self.db.execute(delete(_counts).where(_counts.c.count <= 0))
@@ -0,0 +1,113 @@
+# Infrastructure/persistence/search/sqlite_fts_index.py
+
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from Infrastructure.Persistence_Layer.sqlite.db import SessionLocal
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteRepository
+from Core_Domains.book_catalog.models import Book
+from Core_Domains.book_catalog.search_index_interface import BookSearchIndex
+from Core_Domains.book_catalog.value_objects import BookStatus
+
+# trigram-токенизатор (SQLite >= 3.34) даёт индексный поиск подстрок (infix)
+_CREATE = text(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts "
+    "USING fts5(title, authors, genre, status UNINDEXED, tokenize='trigram')"
+)
+_DELETE = text("DELETE FROM books_fts WHERE rowid = :id")
+_INSERT = text(
+    "INSERT INTO books_fts (rowid, title, authors, genre, status) "
+    "VALUES (:id, :title, :authors, :genre, :status)"
+)
+
+# trigram не умеет MATCH по запросам короче 3 символов — для них LIKE
+_MIN_MATCH = 3
+
+
+def _fold(value: Optional[str]) -> str:
+    return (value or "").casefold()
+
+
+def _row(book: Book) -> dict:
+    return {
+        "id": book.id,
+        "title": _fold(book.title),
+        # "\n" между авторами — запрос не склеит двух соседних авторов
+        "authors": "\n".join(_fold(a.name) for a in (book.authors or [])),
+        "genre": _fold(book.genre.name) if book.genre is not None else "",
+        "status": book.status.value if book.status else None,
+    }
+
+
+def _phrase(column: str, query: str) -> str:
+    return f'{column} : "{query.replace(chr(34), chr(34) * 2)}"'
+
+
+class SQLiteFtsBookSearchIndex(SQLiteRepository, BookSearchIndex):
+    """FTS5-backed book index; ranked by bm25 with title weighted over authors."""
+
+    def __init__(self):
+        super().__init__(SessionLocal)
+        self.db.execute(_CREATE)
+        self._commit()
+
+    def index(self, book: Book) -> None:
+        self.index_many([book])
+
+    def index_many(self, books: List[Book]) -> None:
+        rows = [_row(book) for book in books]
+        if not rows:
+            return
+        self.db.execute(_DELETE, [{"id": row["id"]} for row in rows])
+        self.db.execute(_INSERT, rows)
+        self._commit()
+
+    def remove(self, book_id: int) -> None:
+        self.db.execute(_DELETE, {"id": book_id})
+        self._commit()
+
+    def rebuild(self, books: List[Book]) -> None:
+        self.index_many(books)
+
+    def search(
+        self,
+        title: Optional[str] = None,
+        author: Optional[str] = None,
+        genre: Optional[str] = None,
+        status: Optional[BookStatus] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        match, where = [], []
+        params = {"offset": offset, "limit": -1 if limit is None else limit}
+
+        for column, query in (("title", _fold(title)), ("authors", _fold(author))):
+            if not query:
+                continue
+            if len(query) >= _MIN_MATCH:
+                match.append(_phrase(column, query))
+            else:
+                where.append(f"{column} LIKE :{column}_like")
+                params[f"{column}_like"] = f"%{query}%"
+
+        if match:
+            where.append("books_fts MATCH :match")
+            params["match"] = " AND ".join(match)
+        if genre:
+            where.append("genre = :genre")
+            params["genre"] = _fold(genre)
+        if status:
+            where.append("status = :status")
+            params["status"] = status.value
+
+        sql = "SELECT rowid FROM books_fts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if match:
+            sql += " ORDER BY bm25(books_fts, 10.0, 5.0, 1.0), length(title), rowid"
+        else:
+            sql += " ORDER BY length(title), rowid"
+        sql += " LIMIT :limit OFFSET :offset"
+
+        return [row[0] for row in self.db.execute(text(sql), params)]
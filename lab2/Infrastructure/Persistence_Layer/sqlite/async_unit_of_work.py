@@ -0,0 +1,76 @@
+# Infrastructure/persistence/sqlite/async_unit_of_work.py
+
+import asyncio
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.util import await_
+
+from Infrastructure.Persistence_Layer.sqlite.db import DATABASE_URL, create_async_sqlite_engine
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import use_session
+
+async_engine = create_async_sqlite_engine(DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+class AsyncSQLiteUnitOfWork:
+    """
+    Async-вариант SQLiteUnitOfWork поверх aiosqlite: одна AsyncSession на запрос,
+    commit/rollback на выходе из `async with`.
+
+    Сервисы и SQLite-репозитории остаются синхронными: run() выполняет их через
+    AsyncSession.run_sync, т.е. в greenlet на event loop. Каждый запрос к БД
+    внутри становится await, и пока он ждёт aiosqlite, loop обслуживает
+    другие запросы — поток threadpool не занимается.
+    """
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.session: Optional[AsyncSession] = None
+
+    async def __aenter__(self) -> "AsyncSQLiteUnitOfWork":
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+        finally:
+            await self.session.close()
+        return False
+
+    async def commit(self):
+        await self.session.commit()
+
+    async def rollback(self):
+        await self.session.rollback()
+
+    async def run(self, fn, *args, **kwargs):
+        def call(sync_session):
+            # greenlet не наследует contextvars вызывающей корутины — ставим сессию здесь
+            with use_session(sync_session):
+                return fn(*args, **kwargs)
+
+        return await self.session.run_sync(call)
+
+
+class GreenletLock:
+    """
+    Lock для кода, выполняемого через AsyncSQLiteUnitOfWork.run.
+    threading.Lock там нельзя: пока владелец ждёт БД, другой запрос в том же
+    потоке заблокировал бы весь event loop. Здесь ожидание уходит в loop.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    def acquire(self) -> bool:
+        await_(self._lock.acquire())
+        return True
+
+    def release(self):
+        self._lock.release()
@@ -1,12 +1,14 @@
 # Infrastructure/persistence/sqlite/book_repo.py
 
-from sqlalchemy import Column, Integer, String, Float
-from sqlalchemy.orm import Session
+from sqlalchemy import Column, Integer, String, Float, bindparam, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal, engine
+from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal, upgrade_table
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteRepository, current_session
+from Core_Domains.book_catalog.exceptions import BookVersionConflict
 from Core_Domains.book_catalog.models import Book
 from Core_Domains.book_catalog.repository_interface import BookRepository
-from Core_Domains.book_catalog.value_objects import Price
+from Core_Domains.book_catalog.value_objects import BookStatus, Price
 
 
 class BookRecord(Base):
@@ -15,74 +17,131 @@ class BookRecord(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     price = Column(Float)
-
-
-        
-class SQLiteBookRepository(BookRepository):
+    status = Column(String, nullable=False, default=BookStatus.AVAILABLE.value,
+                    server_default=BookStatus.AVAILABLE.value)
+    # у сохранённой строки версия >= 1: 0 в Book значит «ещё не читалась из БД»
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+
+_books = BookRecord.__table__
+
+# колонки, появившиеся после первой версии схемы: create_all их в старую БД не добавит
+_ADDED_COLUMNS = {
+    "status": f"VARCHAR NOT NULL DEFAULT '{BookStatus.AVAILABLE.value}'",
+    "version": "INTEGER NOT NULL DEFAULT 1",
+}
+
+_insert = sqlite_insert(_books).values(
+    id=bindparam("id"), title=bindparam("title"),
+    price=bindparam("price"), status=bindparam("status"),
+)
+# импорт фидов: один executemany на чанк вместо SELECT + INSERT на книгу;
+# запись без сверки версии, но версию двигает — чужой CAS после неё не пройдёт
+_BOOK_UPSERT = _insert.on_conflict_do_update(
+    index_elements=["id"],
+    set_={
+        "title": _insert.excluded.title,
+        "price": _insert.excluded.price,
+        "status": _insert.excluded.status,
+        "version": _books.c.version + 1,
+    },
+)
+
+# compare-and-set: строка меняется, только если версия та, что была прочитана
+_BOOK_CAS = (
+    update(_books)
+    .where(_books.c.id == bindparam("book_id"), _books.c.version == bindparam("expected"))
+    .values(title=bindparam("title"), price=bindparam("price"),
+            status=bindparam("status"), version=_books.c.version + 1)
+)
+
+
+def _row(book: Book) -> dict:
+    return {"id": book.id, "title": book.title, "price": book.price.amount,
+            "status": book.status.value}
+
+
+def _to_book(rec) -> Book:
+    # минимальная конвертация обратно в доменную модель
+    return Book(
+        id=rec.id,
+        title=rec.title,
+        authors=[],
+        genre=None,
+        publisher=None,
+        edition=None,
+        price=Price(rec.price),
+        status=BookStatus(rec.status),
+        version=rec.version,
+    )
+
+
+class SQLiteBookRepository(SQLiteRepository, BookRepository):
 
     def __init__(self):
-        self.db: Session = SessionLocal()
-        Base.metadata.create_all(bind=self.db.bind)
+        super().__init__(SessionLocal)
+        upgrade_table(self.db.bind, _books, _ADDED_COLUMNS)
 
     def get(self, book_id: int) -> Book:
         rec = self.db.query(BookRecord).filter(BookRecord.id == book_id).first()
         if not rec:
             raise KeyError(book_id)
-
-        # минимальная конвертация обратно в доменную модель
-        return Book(
-            id=rec.id,
-            title=rec.title,
-            authors=[],
-            genre=None,
-            publisher=None,
-            edition=None,
-            price=Price(rec.price),
-        )
+        return _to_book(rec)
 
     def save(self, book: Book):
-        rec = self.db.query(BookRecord).filter(BookRecord.id == book.id).first()
-
-        if not rec:
-            rec = BookRecord(id=book.id)
-
-        rec.title = book.title
-        rec.price = book.price.amount
-
-        self.db.add(rec)
-        self.db.commit()
+        """
+        version > 0 — UPDATE ... WHERE version = прочитанной: атомарно в самой БД,
+        без блокировок на время между get и save. 0 — upsert без сверки.
+        """
+        db = self.db
+        db.flush()
+        if book.version:
+            done = db.execute(_BOOK_CAS, {**_row(book), "book_id": book.id, "expected": book.version})
+            if done.rowcount == 0:
+                if current_session() is None:
+                    db.rollback()  # UPDATE уже открыл транзакцию — не держим write-lock
+                raise BookVersionConflict(book.id, book.version)
+            version = book.version + 1
+        else:
+            version = db.execute(
+                _BOOK_UPSERT.returning(_books.c.version), _row(book)
+            ).scalar_one()
+        self._expire({book.id})
+        self._commit()
+        book.version = version
+
+    def save_many(self, books):
+        rows = [_row(b) for b in books]
+        if not rows:
+            return
+        db = self.db
+        db.flush()  # несохранённые ORM-правки — до bulk-записи, а не поверх неё
+        db.execute(_BOOK_UPSERT, rows)
+        self._expire({row["id"] for row in rows})
+        self._commit()
+
+    def _expire(self, ids):
+        # загруженные в сессию BookRecord не знают о записи мимо ORM
+        db = self.db
+        for obj in list(db.identity_map.values()):
+            if isinstance(obj, BookRecord) and obj.id in ids:
+                db.expire(obj)
 
     def delete(self, book_id: int):
         rec = self.db.query(BookRecord).filter(BookRecord.id == book_id).first()
         if rec:
             self.db.delete(rec)
-            self.db.commit()
+            self._commit()
 
     def list(self):
         return [
-            Book(
-                id=r.id,
-                title=r.title,
-                authors=[],
-                genre=None,
-                publisher=None,
-                edition=None,
-                price=Price(r.price),
-            )
+            _to_book(r)
             for r in self.db.query(BookRecord).all()
         ]
 
     def find_by_title(self, title: str):
         return [
-            Book(
-                id=r.id,
-                title=r.title,
-                authors=[],
-                genre=None,
-                publisher=None,
-                edition=None,
-                price=Price(r.price),
-            )
+            _to_book(r)
             for r in self.db.query(BookRecord)
             .filter(BookRecord.title.ilike(f"%{title}%"))
             .all()
@@ -1,14 +1,132 @@
 # Infrastructure/persistence/sqlite/db.py
 
-from sqlalchemy import create_engine
+import os
+from typing import Mapping, Optional, Sequence
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from Infrastructure.Config.settings import Settings, get_settings
+
+
+def _is_memory(url) -> bool:
+    return url.database in (None, "", ":memory:")
+
+
+def sibling_sqlite_url(database_url: str, filename: str) -> str:
+    """
+    URL вспомогательной БД filename в каталоге файла database_url — служебные
+    файлы живут рядом с основной БД, а не в текущем каталоге процесса.
+    Для :memory: — тоже in-memory.
+    """
+    url = make_url(database_url)
+    if _is_memory(url):
+        return "sqlite://"
+    return url.set(database=os.path.join(os.path.dirname(url.database) or ".", filename)) \
+        .render_as_string(hide_password=False)
+
+
+def _connect_args(settings: Settings) -> dict:
+    return {
+        "check_same_thread": False,  # только для SQLite
+        "cached_statements": settings.SQLITE_STATEMENT_CACHE,
+        "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+    }
+
+
+def _pool_args(url, settings: Settings, queue_pool) -> dict:
+    if _is_memory(url):
+        return {"poolclass": StaticPool}
+    return {
+        "poolclass": queue_pool,
+        "pool_size": settings.SQLITE_POOL_SIZE,
+        "max_overflow": settings.SQLITE_MAX_OVERFLOW,
+    }
+
+
+def _install_pragmas(engine, url, settings: Settings):
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        if settings.SQLITE_WAL and not _is_memory(url):
+            cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cur.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        # отрицательное значение — размер в KiB, а не в страницах
+        cur.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.close()
+
+
+def create_sqlite_engine(database_url: str, settings: Settings = None):
+    """
+    SQLite engine с профилем из Settings: WAL, synchronous, mmap, cache,
+    busy timeout и кеш prepared statements на соединение.
+    Для файла — QueuePool под потоки FastAPI, для :memory: — одно общее соединение.
+    """
+    settings = settings or get_settings()
+    url = make_url(database_url)
+
+    engine = create_engine(
+        url, connect_args=_connect_args(settings), **_pool_args(url, settings, QueuePool)
+    )
+    _install_pragmas(engine, url, settings)
+    return engine
+
+
+def create_async_sqlite_engine(database_url: str, settings: Settings = None):
+    """
+    Тот же профиль, но через драйвер aiosqlite: ожидание БД — await,
+    а не занятый поток threadpool. Требует пакеты aiosqlite и greenlet.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    settings = settings or get_settings()
+    url = make_url(database_url).set(drivername="sqlite+aiosqlite")
+
+    engine = create_async_engine(
+        url, connect_args=_connect_args(settings),
+        **_pool_args(url, settings, AsyncAdaptedQueuePool)
+    )
+    _install_pragmas(engine.sync_engine, url, settings)
+    return engine
+
+
+def upgrade_table(bind, table, columns: Mapping[str, str],
+                  backfill: Optional[Mapping[str, str]] = None,
+                  drop: Sequence[str] = ()) -> list:
+    """
+    Догоняет таблицу из старой БД до модели: create_all в существующую
+    таблицу колонки и индексы не добавляет. columns — имя → DDL для
+    ALTER TABLE ADD COLUMN; backfill — имя → UPDATE, заполняющий колонку
+    из прежних данных (только если её пришлось добавить); drop — прежние
+    колонки, которые после переноса данных удаляются.
+    Возвращает добавленные колонки.
+    """
+    existing = {c["name"] for c in inspect(bind).get_columns(table.name)}
+    missing = [name for name in columns if name not in existing]
+    obsolete = [name for name in drop if name in existing]
+    if missing or obsolete:
+        with bind.begin() as conn:
+            for name in missing:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {columns[name]}"))
+            for name in missing:
+                if backfill and name in backfill:
+                    conn.execute(text(backfill[name]))
+            for name in obsolete:
+                conn.execute(text(f"ALTER TABLE {table.name} DROP COLUMN {name}"))
+    for index in table.indexes:
+        index.create(bind, checkfirst=True)
+    return missing
+
 
-DATABASE_URL = "sqlite:///./warehouse.db"
+DATABASE_URL = get_settings().DATABASE_URL
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # только для SQLite
-)
+engine = create_sqlite_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,91 @@
+# Infrastructure/persistence/sqlite/id_block_repo.py
+
+import threading
+
+from sqlalchemy import Column, Integer, String, column, func, inspect, select, table
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from Infrastructure.Config.settings import get_settings
+from Infrastructure.Persistence_Layer.sqlite.db import (
+    Base, DATABASE_URL, create_sqlite_engine, engine, sibling_sqlite_url
+)
+from Core_Domains.Shared.id_allocator import IdBlockSource
+
+# Отдельный файл: unit of work держит write-lock основной БД до конца запроса,
+# и резерв блока в том же файле из того же потока ждал бы сам себя.
+ID_BLOCKS_URL = get_settings().ID_BLOCKS_URL or sibling_sqlite_url(DATABASE_URL, "id_blocks.db")
+
+SessionLocal = sessionmaker(bind=create_sqlite_engine(ID_BLOCKS_URL))
+
+# последовательность -> таблица основной БД, чьи id она выдаёт
+SEQUENCE_TABLES = {
+    "orders": "orders",
+    "transactions": "transactions",
+    "users": "users",
+    "stock_movements": "wh_stock_movements",
+    "inventory_sessions": "wh_inventory_sessions",
+}
+
+
+class IdBlockRecord(Base):
+    __tablename__ = "id_blocks"
+
+    sequence = Column(String, primary_key=True)
+    next_value = Column(Integer, nullable=False)
+
+
+class SQLiteIdBlockSource(IdBlockSource):
+    """Durable hi/lo block source: reserved blocks survive restarts."""
+
+    def __init__(self, start: int = 1, data_bind=None):
+        self.db: Session = SessionLocal()
+        IdBlockRecord.__table__.create(bind=self.db.bind, checkfirst=True)
+        self.start = start
+        self.data_bind = data_bind if data_bind is not None else engine
+        self._lock = threading.Lock()
+
+    def reserve(self, sequence: str, size: int) -> int:
+        with self._lock:
+            return self._reserve(sequence, size)
+
+    def _reserve(self, sequence: str, size: int) -> int:
+        first = self._advance(sequence, size)
+        if first is None:
+            # первый резерв последовательности; другой процесс мог завести строку
+            # раньше нас — тогда его строка остаётся, а блок берём следующий за его
+            self.db.execute(
+                sqlite_insert(IdBlockRecord)
+                .values(sequence=sequence, next_value=self._first_free(sequence))
+                .on_conflict_do_nothing(index_elements=["sequence"])
+            )
+            first = self._advance(sequence, size)
+
+        self.db.commit()
+        return first
+
+    def _advance(self, sequence: str, size: int):
+        # UPDATE первым — он берёт write-lock SQLite, поэтому два процесса
+        # не получат один и тот же блок
+        updated = (
+            self.db.query(IdBlockRecord)
+            .filter(IdBlockRecord.sequence == sequence)
+            .update({IdBlockRecord.next_value: IdBlockRecord.next_value + size})
+        )
+        if not updated:
+            return None
+        return (
+            self.db.query(IdBlockRecord.next_value)
+            .filter(IdBlockRecord.sequence == sequence)
+            .scalar()
+        ) - size
+
+    def _first_free(self, sequence: str) -> int:
+        # строки в таблице могли появиться до аллокатора (старая БД с autoincrement) —
+        # новая последовательность начинается после них, иначе первый insert упадёт
+        name = SEQUENCE_TABLES.get(sequence)
+        if name is None or not inspect(self.data_bind).has_table(name):
+            return self.start
+        with self.data_bind.connect() as conn:
+            max_id = conn.execute(select(func.max(column("id"))).select_from(table(name))).scalar()
+        return max(self.start, (max_id or 0) + 1)
@@ -0,0 +1,87 @@
+# Infrastructure/persistence/sqlite/isbn_cache_repo.py
+
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import Column, Float, String, Text, bindparam, delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from Infrastructure.Persistence_Layer.sqlite.db import Base, create_sqlite_engine
+
+# Отдельный файл: кеш внешнего API не относится к данным склада
+# и может быть удалён в любой момент без последствий.
+ISBN_CACHE_URL = "sqlite:///./isbn_cache.db"
+
+# SQLite ограничивает число параметров в одном запросе
+_CHUNK = 500
+
+
+class IsbnLookupRecord(Base):
+    __tablename__ = "isbn_lookup_cache"
+
+    isbn = Column(String, primary_key=True)
+    payload = Column(Text)              # NULL — книга не найдена (negative cache)
+    expires_at = Column(Float, nullable=False)
+
+
+_cache = IsbnLookupRecord.__table__
+
+_insert = sqlite_insert(_cache).values(
+    isbn=bindparam("isbn"), payload=bindparam("payload"), expires_at=bindparam("expires_at")
+)
+_UPSERT = _insert.on_conflict_do_update(
+    index_elements=["isbn"],
+    set_={"payload": _insert.excluded.payload, "expires_at": _insert.excluded.expires_at},
+)
+
+
+class SQLiteIsbnCache:
+    """
+    Кеш ответов ExternalBookApi по ISBN. Найденные книги живут ttl,
+    «не найдено» — negative_ttl (короче: книга может появиться в каталоге).
+    get_many возвращает только свежие записи; значение None — закешированный промах.
+    """
+
+    def __init__(self, url: str = ISBN_CACHE_URL, ttl: float = 7 * 24 * 3600,
+                 negative_ttl: float = 24 * 3600, clock: Callable[[], float] = time.time):
+        self.engine = create_sqlite_engine(url)
+        _cache.create(bind=self.engine, checkfirst=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def get_many(self, isbns: Iterable[str]) -> Dict[str, Optional[dict]]:
+        isbns = list(isbns)
+        now = self.clock()
+        found = {}
+        with self._lock, self.engine.connect() as conn:
+            for i in range(0, len(isbns), _CHUNK):
+                rows = conn.execute(
+                    select(_cache.c.isbn, _cache.c.payload)
+                    .where(_cache.c.isbn.in_(isbns[i:i + _CHUNK]), _cache.c.expires_at > now)
+                )
+                for isbn, payload in rows:
+                    found[isbn] = json.loads(payload) if payload is not None else None
+        return found
+
+    def put_many(self, results: Dict[str, Optional[dict]]) -> None:
+        if not results:
+            return
+        now = self.clock()
+        rows = [
+            {
+                "isbn": isbn,
+                "payload": json.dumps(book, ensure_ascii=False) if book is not None else None,
+                "expires_at": now + (self.ttl if book is not None else self.negative_ttl),
+            }
+            for isbn, book in results.items()
+        ]
+        with self._lock, self.engine.begin() as conn:
+            conn.execute(_UPSERT, rows)
+
+    def purge_expired(self) -> int:
+        with self._lock, self.engine.begin() as conn:
+            return conn.execute(delete(_cache).where(_cache.c.expires_at <= self.clock())).rowcount
@@ -1,30 +1,45 @@
 # Infrastructure/persistence/sqlite/order_repo.py
 
-from sqlalchemy import Column, Integer
-from sqlalchemy.orm import Session
-from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal
+from sqlalchemy import Column, Index, Integer, String
+from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal, upgrade_table
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteRepository
 from Core_Domains.Order_Processing.models import Order
 from Core_Domains.Order_Processing.repository_interface import OrderRepository
+from Core_Domains.Order_Processing.value_objects import OrderStatus, OPEN_ORDER_STATUSES
+
+_OPEN_VALUES = sorted(s.value for s in OPEN_ORDER_STATUSES)
 
 
 class OrderRecord(Base):
     __tablename__ = "orders"
+    # find_open_cart: поиск по покупателю и статусу без скана таблицы
+    __table_args__ = (Index("ix_orders_customer_status", "customer_id", "status"),)
 
     id = Column(Integer, primary_key=True)
     customer_id = Column(Integer)
+    status = Column(String, nullable=False, default=OrderStatus.CREATED.value)
+
+
+# статус заказов раньше не хранился: прежний репозиторий читал каждый заказ
+# как CREATED — этим значением и заполняются старые строки
+_ADDED_COLUMNS = {"status": f"VARCHAR NOT NULL DEFAULT '{OrderStatus.CREATED.value}'"}
+
 
+def _to_domain(rec: OrderRecord) -> Order:
+    # минимальная доменная модель
+    return Order(id=rec.id, customer_id=rec.customer_id, status=OrderStatus(rec.status))
 
-class SQLiteOrderRepository(OrderRepository):
+
+class SQLiteOrderRepository(SQLiteRepository, OrderRepository):
     def __init__(self):
-        self.db: Session = SessionLocal()
-        Base.metadata.create_all(bind=self.db.bind)
+        super().__init__(SessionLocal)
+        upgrade_table(self.db.bind, OrderRecord.__table__, _ADDED_COLUMNS)
+
     def get(self, order_id: int) -> Order:
         rec = self.db.query(OrderRecord).filter(OrderRecord.id == order_id).first()
         if not rec:
             raise KeyError(order_id)
-
-        # минимальная доменная модель
-        return Order(id=rec.id, customer_id=rec.customer_id)
+        return _to_domain(rec)
 
     def save(self, order: Order):
         rec = self.db.query(OrderRecord).filter(OrderRecord.id == order.id).first()
@@ -33,19 +48,29 @@ class SQLiteOrderRepository(OrderRepository):
             rec = OrderRecord(id=order.id)
 
         rec.customer_id = order.customer_id
+        rec.status = order.status.value
         self.db.add(rec)
-        self.db.commit()
+        self._commit()
 
     def list_by_customer(self, customer_id: int):
         return [
-            Order(id=r.id, customer_id=r.customer_id)
+            _to_domain(r)
             for r in self.db.query(OrderRecord)
             .filter(OrderRecord.customer_id == customer_id)
             .all()
         ]
 
+    def find_open_cart(self, customer_id: int):
+        rec = (
+            self.db.query(OrderRecord)
+            .filter(OrderRecord.customer_id == customer_id, OrderRecord.status.in_(_OPEN_VALUES))
+            .order_by(OrderRecord.id)
+            .first()
+        )
+        return _to_domain(rec) if rec else None
+
     def delete(self, order_id: int):
         rec = self.db.query(OrderRecord).filter(OrderRecord.id == order_id).first()
         if rec:
             self.db.delete(rec)
-            self.db.commit()
+            self._commit()
@@ -0,0 +1,140 @@
+# Infrastructure/persistence/sqlite/outbox_repo.py
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+from sqlalchemy import Column, Float, Index, Integer, String, Text, delete, func, insert, select, update
+
+from Infrastructure.Config.settings import get_settings
+from Infrastructure.Persistence_Layer.sqlite.db import (
+    Base, DATABASE_URL, create_sqlite_engine, sibling_sqlite_url
+)
+from Infrastructure.integrations.notifications.outbox import OutboxMessage
+
+# Отдельный файл, как у id_blocks: запись в outbox из обработчика не должна
+# ждать write-lock основной БД, а воркер — конкурировать с запросами за него.
+OUTBOX_URL = get_settings().OUTBOX_URL or sibling_sqlite_url(DATABASE_URL, "outbox.db")
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DEAD = "dead"
+
+
+class OutboxRecord(Base):
+    __tablename__ = "notification_outbox"
+    # claim: готовые сообщения в порядке available_at — один проход по индексу
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "status", "available_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    channel = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False, default="")
+    body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default=PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    # для pending — когда можно слать, для in_flight — конец аренды воркера
+    available_at = Column(Float, nullable=False)
+    created_at = Column(Float, nullable=False)
+    last_error = Column(String)
+
+
+_outbox = OutboxRecord.__table__
+
+
+class SQLiteOutbox:
+    """
+    Очередь уведомлений в SQLite. enqueue — один короткий INSERT в обработчике;
+    claim атомарно (UPDATE ... RETURNING) переводит пачку в in_flight с арендой,
+    так что два воркера не возьмут одно сообщение, а сообщения упавшего
+    воркера вернутся в работу после истечения аренды. attempts растёт при
+    каждом claim: сообщение, на котором воркер падает или зависает, тоже
+    исчерпает max_attempts, а не будет возвращаться вечно.
+    """
+
+    def __init__(self, url: str = OUTBOX_URL, clock: Callable[[], float] = time.time):
+        self.engine = create_sqlite_engine(url)
+        _outbox.create(bind=self.engine, checkfirst=True)
+        self.clock = clock
+        # для :memory: соединение одно на все потоки — транзакции не должны перемежаться
+        self._lock = threading.Lock()
+
+    def enqueue(self, message: OutboxMessage) -> int:
+        return self.enqueue_many([message])[0]
+
+    def enqueue_many(self, messages: Iterable[OutboxMessage]) -> List[int]:
+        now = self.clock()
+        ids = []
+        with self._lock, self.engine.begin() as conn:
+            for m in messages:
+                m.id = conn.execute(
+                    insert(_outbox).values(
+                        channel=m.channel, recipient=m.recipient, subject=m.subject,
+                        body=m.body, status=PENDING, attempts=0,
+                        available_at=now, created_at=now,
+                    )
+                ).inserted_primary_key[0]
+                ids.append(m.id)
+        return ids
+
+    def claim(self, limit: int, lease: float) -> List[OutboxMessage]:
+        now = self.clock()
+        due = (
+            select(_outbox.c.id)
+            .where(_outbox.c.status.in_((PENDING, IN_FLIGHT)), _outbox.c.available_at <= now)
+            .order_by(_outbox.c.available_at, _outbox.c.id)
+            .limit(limit)
+        )
+        stmt = (
+            update(_outbox)
+            .where(_outbox.c.id.in_(due.scalar_subquery()))
+            .values(status=IN_FLIGHT, available_at=now + lease, attempts=_outbox.c.attempts + 1)
+            .returning(_outbox.c.id, _outbox.c.channel, _outbox.c.recipient,
+                       _outbox.c.subject, _outbox.c.body, _outbox.c.attempts)
+        )
+        with self._lock, self.engine.begin() as conn:
+            rows = conn.execute(stmt).all()
+
+        # порядок RETURNING не гарантирован
+        return sorted(
+            (OutboxMessage(r.channel, r.recipient, r.body, subject=r.subject,
+                           id=r.id, attempts=r.attempts) for r in rows),
+            key=lambda m: m.id,
+        )
+
+    def complete(self, message_ids: List[int]) -> None:
+        """Доставленные сообщения удаляются — outbox не растёт."""
+        if not message_ids:
+            return
+        with self._lock, self.engine.begin() as conn:
+            conn.execute(delete(_outbox).where(_outbox.c.id.in_(message_ids)))
+
+    def retry(self, message_id: int, delay: float, error: str) -> None:
+        self._fail(message_id, PENDING, self.clock() + delay, error)
+
+    def bury(self, message_id: int, error: str) -> None:
+        self._fail(message_id, DEAD, self.clock(), error)
+
+    def _fail(self, message_id: int, status: str, available_at: float, error: str):
+        with self._lock, self.engine.begin() as conn:
+            conn.execute(
+                update(_outbox)
+                .where(_outbox.c.id == message_id)
+                .values(status=status, available_at=available_at, last_error=error[:500])
+            )
+
+    def dead(self) -> List[dict]:
+        with self._lock, self.engine.connect() as conn:
+            rows = conn.execute(
+                select(_outbox).where(_outbox.c.status == DEAD).order_by(_outbox.c.id)
+            ).all()
+        return [dict(r._mapping) for r in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock, self.engine.connect() as conn:
+            rows = conn.execute(
+                select(_outbox.c.status, func.count()).group_by(_outbox.c.status)
+            ).all()
+        return {status: n for status, n in rows}
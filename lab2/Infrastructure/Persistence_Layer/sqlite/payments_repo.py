@@ -1,14 +1,22 @@
 # Infrastructure/persistence/sqlite/payments_repo.py
 
-from sqlalchemy import Column, Integer, Float, String
-from sqlalchemy.orm import Session
+import heapq
+from datetime import datetime
+from itertools import islice
 
-from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal
+from sqlalchemy import Column, DateTime, Index, Integer, String, bindparam, func, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal, upgrade_table
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteRepository
 from Core_Domains.Payments.repository_interface import (
     AccountRepository, TransactionRepository
 )
-from Core_Domains.Payments.models import Account, Transaction
+from Core_Domains.Payments.models import (
+    Account, Transaction, BalanceCheckpoint, decode_cursor, due_checkpoint, posting_key
+)
 from Core_Domains.Payments.value_objects import Money, TransactionType, TransactionStatus
+from Core_Domains.Shared.money import group_sum
 
 
 class AccountRecord(Base):
@@ -16,99 +24,247 @@ class AccountRecord(Base):
 
     id = Column(Integer, primary_key=True)
     owner_id = Column(Integer)
-    balance = Column(Float)
+    # деньги храним в целых minor-единицах: без потерь на Float
+    balance_minor = Column(Integer)
+    currency = Column(String(3), default="USD")
+    postings_since_checkpoint = Column(Integer, nullable=False, default=0)
+
+
+class BalanceCheckpointRecord(Base):
+    __tablename__ = "balance_checkpoints"
+
+    # PK (account_id, created_at, trx_id) — поиск последней точки до момента = один seek
+    account_id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, primary_key=True)
+    trx_id = Column(Integer, primary_key=True)
+    balance_minor = Column(Integer, nullable=False)
+    currency = Column(String(3), nullable=False)
 
 
 class TransactionRecord(Base):
     __tablename__ = "transactions"
+    # выписка по счёту: диапазон (created_at, id) по каждой стороне перевода
+    __table_args__ = (
+        Index("ix_transactions_from_created", "from_account", "created_at", "id"),
+        Index("ix_transactions_to_created", "to_account", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     from_account = Column(Integer)
     to_account = Column(Integer)
-    amount = Column(Float)
+    amount_minor = Column(Integer)
+    currency = Column(String(3), default="USD")
     type = Column(String)
     status = Column(String)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
 
-class SQLiteAccountRepository(AccountRepository):
-    def __init__(self):
-        self.db: Session = SessionLocal()
-        Base.metadata.create_all(bind=self.db.bind)
+# старые БД: деньги во Float-колонках balance / amount, без валюты и времени проводки.
+# Переносим в minor-единицы (round(x*100)) и удаляем Float-колонки
+_ACCOUNT_COLUMNS = {
+    "balance_minor": "INTEGER",
+    "currency": "VARCHAR(3) DEFAULT 'USD'",
+    "postings_since_checkpoint": "INTEGER NOT NULL DEFAULT 0",
+}
+_ACCOUNT_BACKFILL = {
+    "balance_minor": "UPDATE accounts SET balance_minor = CAST(ROUND(balance * 100) AS INTEGER)",
+    # счета до контрольных точек: открывающая точка с текущим балансом на момент
+    # миграции, иначе balance_at отдавал бы 0 до первых checkpoint_every проводок
+    "postings_since_checkpoint": (
+        "INSERT INTO balance_checkpoints (account_id, created_at, trx_id, balance_minor, currency) "
+        "SELECT id, strftime('%Y-%m-%d %H:%M:%S', 'now') || '.000000', 0, balance_minor, "
+        "COALESCE(currency, 'USD') FROM accounts a WHERE NOT EXISTS "
+        "(SELECT 1 FROM balance_checkpoints c WHERE c.account_id = a.id)"
+    ),
+}
+
+_TRANSACTION_COLUMNS = {
+    "amount_minor": "INTEGER",
+    "currency": "VARCHAR(3) DEFAULT 'USD'",
+    # время старых проводок неизвестно — они раньше любых новых
+    "created_at": "DATETIME NOT NULL DEFAULT '1970-01-01 00:00:00.000000'",
+}
+_TRANSACTION_BACKFILL = {"amount_minor": "UPDATE transactions SET amount_minor = CAST(ROUND(amount * 100) AS INTEGER)"}
+
+
+def _upsert(table, keys=("id",)):
+    stmt = sqlite_insert(table).values({c.name: bindparam(c.name) for c in table.columns})
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name not in keys},
+    )
+
+
+_ACCOUNT_UPSERT = _upsert(AccountRecord.__table__)
+_TRANSACTION_UPSERT = _upsert(TransactionRecord.__table__)
+_CHECKPOINT_UPSERT = _upsert(BalanceCheckpointRecord.__table__, ("account_id", "created_at", "trx_id"))
+
+
+def _account(r) -> Account:
+    return Account(
+        id=r.id,
+        owner_id=r.owner_id,
+        balance=Money.from_minor(r.balance_minor, r.currency),
+        postings_since_checkpoint=r.postings_since_checkpoint or 0,
+    )
+
+
+def _transaction(r) -> Transaction:
+    return Transaction(
+        id=r.id,
+        from_account=r.from_account,
+        to_account=r.to_account,
+        amount=Money.from_minor(r.amount_minor, r.currency),
+        type=TransactionType(r.type),
+        status=TransactionStatus(r.status),
+        created_at=r.created_at,
+    )
+
+
+class SQLiteAccountRepository(SQLiteRepository, AccountRepository):
+    def __init__(self, checkpoint_every: int = 100):
+        super().__init__(SessionLocal)
+        upgrade_table(self.db.bind, AccountRecord.__table__, _ACCOUNT_COLUMNS,
+                      _ACCOUNT_BACKFILL, drop=("balance",))
+        self.checkpoint_every = checkpoint_every
 
     def get(self, account_id: int):
-        rec = self.db.query(AccountRecord).filter(AccountRecord.id == account_id).first()
+        rec = self.db.get(AccountRecord, account_id)
         if not rec:
             raise KeyError(account_id)
-        return Account(
-            id=rec.id,
-            owner_id=rec.owner_id,
-            balance=Money(rec.balance)
-        )
+        return _account(rec)
+
+    def get_many(self, account_ids):
+        ids = list(account_ids)
+        if not ids:
+            return {}
+        recs = self.db.query(AccountRecord).filter(AccountRecord.id.in_(ids))
+        return {r.id: _account(r) for r in recs}
 
     def save(self, account):
-        rec = self.db.query(AccountRecord).filter(AccountRecord.id == account.id).first()
-        if not rec:
-            rec = AccountRecord(id=account.id)
+        self.save_many([account])
 
-        rec.owner_id = account.owner_id
-        rec.balance = account.balance.amount
+    def save_many(self, accounts):
+        accounts = list(accounts)
+        if not accounts:
+            return
+        # «открыт» = уже есть контрольная точка, как в in-memory репозитории
+        opened = {
+            r[0] for r in self.db.query(BalanceCheckpointRecord.account_id)
+            .filter(BalanceCheckpointRecord.account_id.in_([a.id for a in accounts]))
+            .distinct()
+        }
+        checkpoints = []
+        for a in accounts:
+            cp = due_checkpoint(a, self.checkpoint_every, opened=a.id in opened)
+            if cp is not None:
+                checkpoints.append({
+                    "account_id": cp.account_id,
+                    "created_at": cp.created_at,
+                    "trx_id": cp.trx_id,
+                    "balance_minor": cp.balance.minor,
+                    "currency": cp.balance.currency,
+                })
+        rows = [
+            {
+                "id": a.id,
+                "owner_id": a.owner_id,
+                "balance_minor": a.balance.minor,
+                "currency": a.balance.currency,
+                "postings_since_checkpoint": a.postings_since_checkpoint,
+            }
+            for a in accounts
+        ]
+        # executemany одного подготовленного UPSERT
+        self.db.execute(_ACCOUNT_UPSERT, rows)
+        if checkpoints:
+            self.db.execute(_CHECKPOINT_UPSERT, checkpoints)
+        self._commit()
+        self.db.expire_all()
 
-        self.db.add(rec)
-        self.db.commit()
+    def latest_checkpoint(self, account_id: int, at: datetime):
+        r = (
+            self.db.query(BalanceCheckpointRecord)
+            .filter(BalanceCheckpointRecord.account_id == account_id,
+                    BalanceCheckpointRecord.created_at <= at)
+            .order_by(BalanceCheckpointRecord.created_at.desc(), BalanceCheckpointRecord.trx_id.desc())
+            .first()
+        )
+        if r is None:
+            return None
+        return BalanceCheckpoint(r.account_id, r.created_at, r.trx_id,
+                                 Money.from_minor(r.balance_minor, r.currency))
 
 
-class SQLiteTransactionRepository(TransactionRepository):
+class SQLiteTransactionRepository(SQLiteRepository, TransactionRepository):
     def __init__(self):
-        self.db: Session = SessionLocal()
-        Base.metadata.create_all(bind=self.db.bind)
+        super().__init__(SessionLocal)
+        upgrade_table(self.db.bind, TransactionRecord.__table__, _TRANSACTION_COLUMNS,
+                      _TRANSACTION_BACKFILL, drop=("amount",))
+
     def save(self, trx):
-        rec = TransactionRecord(
-            id=trx.id,
-            from_account=trx.from_account,
-            to_account=trx.to_account,
-            amount=trx.amount.amount,
-            type=trx.type.value,
-            status=trx.status.value,
-        )
-        self.db.add(rec)
-        self.db.commit()
+        self.save_many([trx])
+
+    def save_many(self, transactions):
+        rows = [
+            {
+                "id": t.id,
+                "from_account": t.from_account,
+                "to_account": t.to_account,
+                "amount_minor": t.amount.minor,
+                "currency": t.amount.currency,
+                "type": t.type.value,
+                "status": t.status.value,
+                "created_at": t.created_at,
+            }
+            for t in transactions
+        ]
+        if rows:
+            self.db.execute(_TRANSACTION_UPSERT, rows)
+            self._commit()
+        self.db.expire_all()
 
     def get(self, trx_id: int):
-        rec = self.db.query(TransactionRecord).filter(TransactionRecord.id == trx_id).first()
+        rec = self.db.get(TransactionRecord, trx_id)
         if not rec:
             raise KeyError(trx_id)
+        return _transaction(rec)
 
-        return Transaction(
-            id=rec.id,
-            from_account=rec.from_account,
-            to_account=rec.to_account,
-            amount=Money(rec.amount),
-            type=TransactionType(rec.type),
-            status=TransactionStatus(rec.status),
+    def list_by_account(self, account_id: int, since=None, limit=None, cursor=None):
+        # две индексные выборки (sender / receiver) вместо OR со сканом таблицы;
+        # каждая уже упорядочена по (created_at, id) — остаётся слить и обрезать
+        after = decode_cursor(cursor) if cursor is not None else None
+        sides = (
+            self._postings(TransactionRecord.from_account == account_id, since, after, limit),
+            self._postings(
+                (TransactionRecord.to_account == account_id)
+                & (TransactionRecord.from_account != account_id),  # перевод себе — один раз
+                since, after, limit,
+            ),
         )
-    def list_by_account(self, account_id: int):
-        # возвращаем все транзакции, где аккаунт участвует как sender или receiver
-        recs = (
-            self.db.query(TransactionRecord)
+        return list(islice(heapq.merge(*sides, key=posting_key), limit))
+
+    def _postings(self, side, since, after, limit):
+        q = self.db.query(TransactionRecord).filter(side)
+        if since is not None:
+            q = q.filter(TransactionRecord.created_at >= since)
+        if after is not None:
+            q = q.filter(tuple_(TransactionRecord.created_at, TransactionRecord.id) > tuple_(*after))
+        q = q.order_by(TransactionRecord.created_at, TransactionRecord.id)
+        if limit is not None:
+            q = q.limit(limit)
+        return [_transaction(r) for r in q]
+
+    def turnover_by_currency(self, account_id: int, status: TransactionStatus = TransactionStatus.SUCCESS):
+        # агрегация на стороне SQLite: одна строка на валюту вместо всех транзакций
+        rows = (
+            self.db.query(TransactionRecord.currency, func.sum(TransactionRecord.amount_minor))
             .filter(
                 (TransactionRecord.from_account == account_id)
                 | (TransactionRecord.to_account == account_id)
             )
+            .filter(TransactionRecord.status == status.value)
+            .group_by(TransactionRecord.currency)
             .all()
         )
-
-        from Core_Domains.Payments.models import Transaction
-        from Core_Domains.Payments.value_objects import Money, TransactionType, TransactionStatus
-
-        return [
-            Transaction(
-                id=r.id,
-                from_account=r.from_account,
-                to_account=r.to_account,
-                amount=Money(r.amount),
-                type=TransactionType(r.type),
-                status=TransactionStatus(r.status),
-            )
-            for r in recs
-        ]
-
+        return group_sum((r[0] for r in rows), (r[1] for r in rows))
@@ -0,0 +1,165 @@
+# Infrastructure/persistence/sqlite/unit_of_work.py
+
+import threading
+from contextlib import contextmanager
+from functools import partial
+from contextvars import ContextVar
+from typing import Optional
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal
+
+# сессия активного unit of work (на запрос / операцию сервиса)
+_current_session: ContextVar[Optional[Session]] = ContextVar("sqlite_uow_session", default=None)
+
+
+# колбэки «после транзакции» в session.info — см. SQLiteRepository.after_transaction
+_AFTER_TRANSACTION = "after_transaction_callbacks"
+# флаг в session.info: unit of work уже писал — см. SQLiteRepository.reads_uncommitted
+_UNCOMMITTED_WRITES = "uncommitted_writes"
+
+
+def current_session() -> Optional[Session]:
+    return _current_session.get()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _run_after_transaction(session: Session, transaction):
+    if transaction.parent is not None:
+        return  # вложенная (savepoint) — ждём внешнюю
+    session.info.pop(_UNCOMMITTED_WRITES, None)
+    for callback in session.info.pop(_AFTER_TRANSACTION, ()):
+        callback()
+
+
+@contextmanager
+def use_session(session: Session):
+    """Сделать session текущей для репозиториев в этом контексте."""
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+
+class SQLiteUnitOfWork:
+    """
+    Одна сессия на запрос: все репозитории внутри `with` пишут в неё,
+    а commit (и fsync) происходит один раз на выходе. При исключении — rollback.
+    Вложенный unit of work присоединяется к внешнему.
+
+    commit_nested=True (см. SQLiteRepository.atomic) — вложенный блок перечитывает
+    данные на входе и коммитит сессию внешнего на выходе без ошибки. Так сервис
+    фиксирует read-check-write до снятия своих блокировок: иначе следующий запрос
+    под той же блокировкой прочитал бы ещё не закоммиченную старую строку.
+    """
+
+    def __init__(self, session_factory=None, commit_nested: bool = False):
+        self.session_factory = session_factory or SessionLocal
+        self.commit_nested = commit_nested
+        self.session: Optional[Session] = None
+        self._token = None
+
+    def __enter__(self) -> "SQLiteUnitOfWork":
+        outer = _current_session.get()
+        if outer is not None:
+            self.session = outer
+            if self.commit_nested:
+                # identity map запроса могла запомнить строки до блокировки
+                self.session.expire_all()
+            return self
+
+        self.session = self.session_factory()
+        self._token = _current_session.set(self.session)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is None:
+            if self.commit_nested and exc_type is None:
+                self.session.commit()
+            return False  # ошибка во вложенном — откат решает внешний
+
+        _current_session.reset(self._token)
+        self._token = None
+        try:
+            if exc_type is None:
+                self.session.commit()
+            else:
+                self.session.rollback()
+        finally:
+            self.session.close()
+        return False
+
+    def commit(self):
+        self.session.commit()
+
+    def rollback(self):
+        self.session.rollback()
+
+    async def run(self, fn, *args, **kwargs):
+        """Вызов sync-сервиса из async-обработчика: в worker-потоке, с этой же сессией."""
+        # anyio копирует contextvars в поток, поэтому _current_session там виден
+        return await anyio.to_thread.run_sync(partial(fn, *args, **kwargs))
+
+
+class SQLiteRepository:
+    """
+    Base for SQLite repositories.
+    Inside a unit of work the repository uses its session and only flushes;
+    outside of one it falls back to a per-thread session and commits each write.
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self._local = threading.local()
+        self._local.session = session_factory()
+        Base.metadata.create_all(bind=self._local.session.bind)
+
+    @property
+    def db(self) -> Session:
+        session = _current_session.get()
+        if session is not None:
+            return session
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._session_factory()
+        return session
+
+    def _commit(self):
+        if _current_session.get() is None:
+            self.db.commit()
+        else:
+            self.db.flush()
+            self.db.info[_UNCOMMITTED_WRITES] = True
+
+    def reads_uncommitted(self) -> bool:
+        """
+        Текущий unit of work уже писал: чтения через его сессию видят ещё
+        не закоммиченные строки. До первой записи SQLite читает вне транзакции —
+        только закоммиченное.
+        """
+        session = _current_session.get()
+        return session is not None and session.info.get(_UNCOMMITTED_WRITES, False)
+
+    def after_transaction(self, callback) -> None:
+        """
+        callback — после commit/rollback текущего unit of work (до этого другие
+        сессии ещё видят старые данные); вне unit of work запись уже закоммичена —
+        вызывается сразу.
+        """
+        session = _current_session.get()
+        if session is None:
+            callback()
+        else:
+            session.info.setdefault(_AFTER_TRANSACTION, []).append(callback)
+
+    def atomic(self) -> SQLiteUnitOfWork:
+        """
+        Несколько записей (в т.ч. через разные репозитории) — одним коммитом.
+        Внутри unit of work запроса блок коммитит его сессию на выходе.
+        """
+        return SQLiteUnitOfWork(self._session_factory, commit_nested=True)
@@ -1,9 +1,10 @@
 from sqlalchemy import Column, Integer, String
-from sqlalchemy.orm import Session
 
-from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal
+from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal, upgrade_table
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteRepository
 from Core_Domains.User_Security.models import User
 from Core_Domains.User_Security.repository_interface import UserRepository
+from Core_Domains.User_Security.value_objects import UserStatus
 
 
 class UserRecord(Base):
@@ -12,25 +13,39 @@ class UserRecord(Base):
     id = Column(Integer, primary_key=True)
     email = Column(String, unique=True)
     password_hash = Column(String)
+    # блокировка и отзыв токенов должны переживать рестарт и быть видны всем процессам
+    status = Column(String, nullable=False, default=UserStatus.ACTIVE.value)
+    token_generation = Column(Integer, nullable=False, default=0)
 
 
-class SQLiteUserRepository(UserRepository):
+_ADDED_COLUMNS = {
+    "status": f"VARCHAR NOT NULL DEFAULT '{UserStatus.ACTIVE.value}'",
+    "token_generation": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+def _to_user(rec: UserRecord) -> User:
+    return User(id=rec.id, email=rec.email, password_hash=rec.password_hash,
+                status=UserStatus(rec.status), token_generation=rec.token_generation)
+
+
+class SQLiteUserRepository(SQLiteRepository, UserRepository):
 
     def __init__(self):
-        self.db: Session = SessionLocal()
-        Base.metadata.create_all(bind=self.db.bind)
+        super().__init__(SessionLocal)
+        upgrade_table(self.db.bind, UserRecord.__table__, _ADDED_COLUMNS)
 
     # === REQUIRED BY INTERFACE ===
     def get(self, user_id: int):
         rec = self.db.query(UserRecord).filter(UserRecord.id == user_id).first()
         if not rec:
             raise KeyError(user_id)
-        return User(id=rec.id, email=rec.email, password_hash=rec.password_hash)
+        return _to_user(rec)
 
     def get_by_email(self, email: str):
         rec = self.db.query(UserRecord).filter(UserRecord.email == email).first()
         if rec:
-            return User(id=rec.id, email=rec.email, password_hash=rec.password_hash)
+            return _to_user(rec)
         return None
 
     def save(self, user: User):
@@ -40,26 +55,25 @@ class SQLiteUserRepository(UserRepository):
 
         rec.email = user.email
         rec.password_hash = user.password_hash
+        rec.status = user.status.value
+        rec.token_generation = user.token_generation
 
         self.db.add(rec)
-        self.db.commit()
+        self._commit()
 
     # === EXTRA METHODS REQUIRED BY TESTS ===
     def delete(self, user_id: int):
         rec = self.db.query(UserRecord).filter(UserRecord.id == user_id).first()
         if rec:
             self.db.delete(rec)
-            self.db.commit()
+            self._commit()
         else:
             raise KeyError(user_id)
 
     def list(self):
         rows = self.db.query(UserRecord).all()
-        return [
-            User(id=r.id, email=r.email, password_hash=r.password_hash)
-            for r in rows
-        ]
+        return [_to_user(r) for r in rows]
 
     def clear(self):
         self.db.query(UserRecord).delete()
-        self.db.commit()
+        self._commit()
@@ -1,132 +1,316 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker, Session
-from datetime import datetime
+# Infrastructure/persistence/sqlite/warehouse_repo.py
 
-# ВАЖНО: Base общая для всех таблиц
-Base = declarative_base()
+from sqlalchemy import Column, Integer, String, DateTime, Index, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from Infrastructure.Persistence_Layer.sqlite.db import Base, SessionLocal
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteRepository
+from Core_Domains.Warehouse.repository_interface import (
+    CellRepository, StockRepository, StockMovementRepository, InventorySessionRepository
+)
+from Core_Domains.Warehouse.models import (
+    Cell, StockItem, StockMovement, InventoryCheckSession, InventoryCheckItem
+)
+from Core_Domains.Warehouse.value_objects import Quantity, MovementType, InventoryStatus
 
-# SessionLocal будет заменён monkeypatch в тестах
-SessionLocal = sessionmaker()
 
 # =====================================================================
 #  MODELS (SQLAlchemy)
 # =====================================================================
 
 class CellRecord(Base):
-    __tablename__ = "warehouse_cells"
+    __tablename__ = "wh_cells"
 
     id = Column(Integer, primary_key=True)
-    shelf_id = Column(Integer, nullable=False)
-    code = Column(String, nullable=False)
+    shelf_id = Column(Integer, index=True)
+    code = Column(String)
+    name = Column(String)
     capacity = Column(Integer, nullable=False)
-    description = Column(String)
+    used = Column(Integer, nullable=False, default=0)
+    description = Column(String, default="")
 
 
-class StockRecord(Base):
-    __tablename__ = "warehouse_stock"
+class StockItemRecord(Base):
+    __tablename__ = "wh_stock_items"
 
-    id = Column(Integer, primary_key=True)
-    cell_id = Column(Integer, ForeignKey("warehouse_cells.id"), nullable=False)
-    book_id = Column(Integer, nullable=False)
+    # составной PK (book_id, cell_id) — это и есть индекс для get/list_by_book
+    book_id = Column(Integer, primary_key=True)
+    cell_id = Column(Integer, primary_key=True)
     quantity = Column(Integer, nullable=False)
 
-    cell = relationship("CellRecord")
+    __table_args__ = (Index("ix_wh_stock_items_cell_id", "cell_id"),)
 
 
 class StockMovementRecord(Base):
-    __tablename__ = "warehouse_stock_movements"
+    __tablename__ = "wh_stock_movements"
 
     id = Column(Integer, primary_key=True)
-    stock_id = Column(Integer, ForeignKey("warehouse_stock.id"), nullable=False)
-    delta = Column(Integer, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-
-    stock = relationship("StockRecord")
+    book_id = Column(Integer, nullable=False, index=True)
+    from_cell_id = Column(Integer)
+    to_cell_id = Column(Integer)
+    quantity = Column(Integer, nullable=False)
+    movement_type = Column(String, nullable=False)
+    created_at = Column(DateTime)
+    comment = Column(String, default="")
 
 
 class InventorySessionRecord(Base):
-    __tablename__ = "warehouse_inventory_sessions"
+    __tablename__ = "wh_inventory_sessions"
 
     id = Column(Integer, primary_key=True)
-    started_at = Column(DateTime, default=datetime.utcnow)
-    finished_at = Column(DateTime)
+    status = Column(String, nullable=False)
+    started_at = Column(DateTime)
+    ended_at = Column(DateTime)
+
+
+class InventoryItemRecord(Base):
+    __tablename__ = "wh_inventory_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(Integer, nullable=False, index=True)
+    book_id = Column(Integer, nullable=False)
+    cell_id = Column(Integer, nullable=False)
+    expected = Column(Integer, nullable=False)
+    actual = Column(Integer, nullable=False)
 
 
 # =====================================================================
-#  Таблицы создаются корректно для каждого engine
+#  Prepared upserts (собираются один раз, SQLAlchemy кеширует компиляцию)
 # =====================================================================
 
-_prev_engine = None
+def _upsert(table, keys):
+    stmt = sqlite_insert(table).values({c.name: bindparam(c.name) for c in table.columns})
+    return stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name not in keys},
+    )
+
 
-def _ensure_tables():
-    """
-    Тесты создают новый engine через фикстуру sqlite_session.
-    Monkeypatch подменяет SessionLocal на новый sessionmaker(bind=new_engine).
+_CELL_UPSERT = _upsert(CellRecord.__table__, ["id"])
+_STOCK_UPSERT = _upsert(StockItemRecord.__table__, ["book_id", "cell_id"])
+_SESSION_UPSERT = _upsert(InventorySessionRecord.__table__, ["id"])
 
-    SQLAlchemy Base.metadata.create_all уже была вызвана для другого engine,
-    поэтому для нового — нужно пересоздать таблицы вручную.
-    """
-    global _prev_engine
 
-    # достаём текущий engine
-    session = SessionLocal()
-    engine = session.bind
+# =====================================================================
+#  Конвертация record → доменная модель
+# =====================================================================
+
+def _cell(r) -> Cell:
+    return Cell(
+        id=r.id,
+        capacity=r.capacity,
+        shelf_id=r.shelf_id,
+        code=r.code,
+        name=r.name,
+        description=r.description or "",
+        used=r.used,
+    )
 
-    # engine мог быть None: тесты иногда создают "чистую" sessionmaker
-    if engine is None:
-        return
 
-    # если engine новый → пересоздаём все таблицы
-    if engine is not _prev_engine:
-        Base.metadata.drop_all(bind=engine)
-        Base.metadata.create_all(bind=engine)
-        _prev_engine = engine
+def _cell_row(cell: Cell) -> dict:
+    return {
+        "id": cell.id,
+        "shelf_id": getattr(cell, "shelf_id", None),
+        "code": getattr(cell, "code", None),
+        "name": getattr(cell, "name", None),
+        "capacity": cell.capacity,
+        "used": getattr(cell, "used", 0),
+        "description": getattr(cell, "description", ""),
+    }
+
+
+def _stock(r) -> StockItem:
+    return StockItem(book_id=r.book_id, cell_id=r.cell_id, quantity=Quantity(r.quantity))
+
+
+def _stock_row(item: StockItem) -> dict:
+    return {"book_id": item.book_id, "cell_id": item.cell_id, "quantity": item.quantity.amount}
+
+
+def _movement(r) -> StockMovement:
+    return StockMovement(
+        id=r.id,
+        book_id=r.book_id,
+        from_cell_id=r.from_cell_id,
+        to_cell_id=r.to_cell_id,
+        quantity=Quantity(r.quantity),
+        movement_type=MovementType(r.movement_type),
+        created_at=r.created_at,
+        comment=r.comment or "",
+    )
 
 
 # =====================================================================
 #  REPOSITORIES
 # =====================================================================
 
-class SQLiteStockRepository:
+class SQLiteCellRepository(SQLiteRepository, CellRepository):
     def __init__(self):
-        _ensure_tables()
-        self.db: Session = SessionLocal()
+        super().__init__(SessionLocal)
 
-    def get(self, stock_id: int):
-        return self.db.query(StockRecord).filter_by(id=stock_id).first()
+    def get(self, cell_id: int) -> Cell:
+        rec = self.db.get(CellRecord, cell_id)
+        if rec is None:
+            raise KeyError(cell_id)
+        return _cell(rec)
 
-    def save(self, stock: StockRecord):
-        self.db.add(stock)
-        self.db.commit()
-        self.db.refresh(stock)
-        return stock
+    def list_by_shelf(self, shelf_id: int):
+        return [_cell(r) for r in self.db.query(CellRecord).filter(CellRecord.shelf_id == shelf_id)]
 
+    def list(self):
+        return [_cell(r) for r in self.db.query(CellRecord)]
 
-class SQLiteStockMovementRepository:
-    def __init__(self):
-        _ensure_tables()
-        self.db: Session = SessionLocal()
-
-    def save(self, movement: StockMovementRecord):
-        self.db.add(movement)
-        self.db.commit()
-        self.db.refresh(movement)
-        return movement
+    def save(self, cell: Cell):
+        self.save_many([cell])
 
-    def list_for_stock(self, stock_id: int):
-        return self.db.query(StockMovementRecord).filter_by(stock_id=stock_id).all()
+    def save_many(self, cells):
+        rows = [_cell_row(c) for c in cells]
+        if rows:
+            self.db.execute(_CELL_UPSERT, rows)
+            self._commit()
+        self.db.expire_all()
 
 
-class SQLiteInventorySessionRepository:
+class SQLiteStockRepository(SQLiteRepository, StockRepository):
     def __init__(self):
-        _ensure_tables()
-        self.db: Session = SessionLocal()
-
-    def save(self, inv: InventorySessionRecord):
-        self.db.add(inv)
-        self.db.commit()
-        self.db.refresh(inv)
-        return inv
-
-    def get(self, session_id: int):
-        return self.db.query(InventorySessionRecord).filter_by(id=session_id).first()
+        super().__init__(SessionLocal)
+
+    def get(self, book_id: int, cell_id: int) -> StockItem:
+        rec = self.db.get(StockItemRecord, (book_id, cell_id))
+        if rec is None:
+            raise KeyError((book_id, cell_id))
+        return _stock(rec)
+
+    def list_by_book(self, book_id: int):
+        q = self.db.query(StockItemRecord).filter(StockItemRecord.book_id == book_id)
+        return [_stock(r) for r in q]
+
+    def list_by_cell(self, cell_id: int):
+        q = self.db.query(StockItemRecord).filter(StockItemRecord.cell_id == cell_id)
+        return [_stock(r) for r in q]
+
+    def list_all(self):
+        return [_stock(r) for r in self.db.query(StockItemRecord)]
+
+    def save(self, stock_item: StockItem):
+        self.save_many([stock_item])
+
+    def save_many(self, items):
+        rows = [_stock_row(i) for i in items]
+        if rows:
+            # executemany одного подготовленного UPSERT
+            self.db.execute(_STOCK_UPSERT, rows)
+            self._commit()
+        self.db.expire_all()
+
+    def delete(self, book_id: int, cell_id: int):
+        deleted = (
+            self.db.query(StockItemRecord)
+            .filter(StockItemRecord.book_id == book_id, StockItemRecord.cell_id == cell_id)
+            .delete()
+        )
+        self._commit()
+        if not deleted:
+            raise KeyError((book_id, cell_id))
+
+
+class SQLiteStockMovementRepository(SQLiteRepository, StockMovementRepository):
+    def __init__(self):
+        super().__init__(SessionLocal)
+
+    def save(self, movement: StockMovement):
+        self.save_many([movement])
+
+    def save_many(self, movements):
+        rows = [
+            {
+                "id": m.id,
+                "book_id": m.book_id,
+                "from_cell_id": m.from_cell_id,
+                "to_cell_id": m.to_cell_id,
+                "quantity": m.quantity.amount,
+                "movement_type": m.movement_type.value,
+                "created_at": m.created_at,
+                "comment": m.comment,
+            }
+            for m in movements
+        ]
+        if rows:
+            self.db.execute(StockMovementRecord.__table__.insert(), rows)
+            self._commit()
+
+    def list_for_book(self, book_id: int):
+        q = (
+            self.db.query(StockMovementRecord)
+            .filter(StockMovementRecord.book_id == book_id)
+            .order_by(StockMovementRecord.id)
+        )
+        return [_movement(r) for r in q]
+
+
+class SQLiteInventorySessionRepository(SQLiteRepository, InventorySessionRepository):
+    def __init__(self):
+        super().__init__(SessionLocal)
+
+    def get(self, session_id: int) -> InventoryCheckSession:
+        rec = self.db.get(InventorySessionRecord, session_id)
+        if rec is None:
+            raise KeyError(session_id)
+        items = (
+            self.db.query(InventoryItemRecord)
+            .filter(InventoryItemRecord.session_id == session_id)
+            .order_by(InventoryItemRecord.id)
+        )
+        return self._to_domain(rec, list(items))
+
+    def save(self, session: InventoryCheckSession):
+        self.db.execute(_SESSION_UPSERT, {
+            "id": session.id,
+            "status": session.status.value,
+            "started_at": session.started_at,
+            "ended_at": session.ended_at,
+        })
+        # позиции сессии перезаписываются целиком
+        self.db.query(InventoryItemRecord).filter(
+            InventoryItemRecord.session_id == session.id
+        ).delete()
+        if session.items:
+            self.db.execute(InventoryItemRecord.__table__.insert(), [
+                {
+                    "session_id": session.id,
+                    "book_id": i.book_id,
+                    "cell_id": i.cell_id,
+                    "expected": i.expected,
+                    "actual": i.actual,
+                }
+                for i in session.items
+            ])
+        self._commit()
+        self.db.expire_all()
+
+    def list(self):
+        items = {}
+        for r in self.db.query(InventoryItemRecord).order_by(InventoryItemRecord.id):
+            items.setdefault(r.session_id, []).append(r)
+        return [
+            self._to_domain(rec, items.get(rec.id, []))
+            for rec in self.db.query(InventorySessionRecord)
+        ]
+
+    def list_all(self):
+        return self.list()
+
+    @staticmethod
+    def _to_domain(rec, items) -> InventoryCheckSession:
+        return InventoryCheckSession(
+            id=rec.id,
+            status=InventoryStatus(rec.status),
+            started_at=rec.started_at,
+            ended_at=rec.ended_at,
+            items=[
+                InventoryCheckItem(
+                    book_id=i.book_id, cell_id=i.cell_id, expected=i.expected, actual=i.actual
+                )
+                for i in items
+            ],
+        )
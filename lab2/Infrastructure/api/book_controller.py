@@ -1,9 +1,10 @@
 # infrastructure/api/book_controller.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from .dependencies import get_book_service
+from .dependencies import get_book_service, get_runner
 from Core_Domains.book_catalog.services import BookCatalogService
+from Core_Domains.book_catalog.exceptions import InvalidSearchFilter
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
@@ -12,9 +13,39 @@ class BookSearchDTO(BaseModel):
     title: str | None = None
     author: str | None = None
     genre: str | None = None
+    offset: int = 0
+    limit: int | None = None
+
+
+@router.get("/cache-stats")
+async def cache_stats(svc: BookCatalogService = Depends(get_book_service)):
+    # счётчики hit/miss/eviction, если репозиторий обёрнут кешем
+    stats = getattr(svc.repo, "stats", None)
+    return stats() if stats else {}
+
+
+@router.get("/facets")
+async def book_facets(
+    top: int | None = Query(default=None),
+    svc: BookCatalogService = Depends(get_book_service),
+    run=Depends(get_runner),
+):
+    # счётчики поддерживаются на save/delete — каталог целиком не читается
+    try:
+        facets = await run(svc.facets, top=top)
+    except InvalidSearchFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return facets.as_dict()
 
 
 @router.post("/search")
-def search_books(dto: BookSearchDTO, svc: BookCatalogService = Depends(get_book_service)):
-    results = svc.search(title=dto.title, author=dto.author, genre=dto.genre)
+async def search_books(
+    dto: BookSearchDTO,
+    svc: BookCatalogService = Depends(get_book_service),
+    run=Depends(get_runner),
+):
+    results = await run(
+        svc.search, title=dto.title, author=dto.author, genre=dto.genre,
+        offset=dto.offset, limit=dto.limit,
+    )
     return [b.title for b in results]
@@ -1,6 +1,9 @@
 # infrastructure/api/dependencies.py
 
-from fastapi import Depends
+from functools import partial
+
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy.util import greenlet_spawn
 from Core_Domains.book_catalog.services import BookCatalogService
 from Core_Domains.book_catalog.repository_interface import BookRepository
 from Core_Domains.Order_Processing.services import OrderService
@@ -9,16 +12,35 @@ from Core_Domains.Payments.services import PaymentService
 from Core_Domains.Payments.repository_interface import AccountRepository, TransactionRepository
 from Core_Domains.User_Security.services import UserService
 from Core_Domains.User_Security.auth_service import AuthService
+from Core_Domains.User_Security.exceptions import InvalidToken
+from Core_Domains.User_Security.token_service import TokenService
 from Core_Domains.User_Security.repository_interface import UserRepository, RoleRepository
 from Core_Domains.Warehouse.services import WarehouseService
+from Core_Domains.Shared.id_allocator import LocalIdBlockSource
+from Infrastructure.Config.settings import get_settings
 from Infrastructure.integrations.email.smtp_service import SmtpEmailService
 from Infrastructure.integrations.payments.bank_gateway import BankGateway
+from Infrastructure.integrations.payments.gateway_client import (
+    HttpBankTransport, InProcessBankTransport, ResilientPaymentGateway
+)
+from Infrastructure.integrations.resilience import CircuitBreaker, RateLimiter, RetryPolicy
+from Infrastructure.integrations.books.external_book_api import ExternalBookApi, HttpBookTransport
 from Infrastructure.integrations.logging.audit_logger import AuditLogger
+from Infrastructure.integrations.security.pooled_hasher import PooledPasswordHasher
 from Infrastructure.integrations.notifications.telegram_notifier import TelegramNotifier
+from Infrastructure.integrations.notifications.outbox import (
+    NotificationWorker, OutboxEmailService, OutboxTelegramNotifier
+)
+from Infrastructure.Persistence_Layer.sqlite.outbox_repo import OUTBOX_URL, SQLiteOutbox
+from Infrastructure.Persistence_Layer.sqlite.isbn_cache_repo import ISBN_CACHE_URL, SQLiteIsbnCache
 from Core_Domains.Warehouse.repository_interface import (
     CellRepository, StockRepository, StockMovementRepository, InventorySessionRepository
 )
 from Infrastructure.Persistence_Layer.in_memory.book_repo import InMemoryBookRepository
+from Infrastructure.Persistence_Layer.search.in_memory_index import InMemoryBookSearchIndex
+from Infrastructure.Persistence_Layer.search.indexed_book_repo import IndexedBookRepository
+from Infrastructure.Persistence_Layer.search.faceted_book_repo import FacetCountingBookRepository
+from Infrastructure.Persistence_Layer.search.in_memory_facets import InMemoryBookFacetCounter
 from Infrastructure.Persistence_Layer.in_memory.order_repo import InMemoryOrderRepository
 from Infrastructure.Persistence_Layer.in_memory.payments_repo import (
     InMemoryAccountRepository, InMemoryTransactionRepository
@@ -30,17 +52,78 @@ from Infrastructure.Persistence_Layer.in_memory.warehouse_repo import (
     InMemoryCellRepository, InMemoryStockRepository,
     InMemoryStockMovementRepository, InMemoryInventorySessionRepository
 )
-book_repo = InMemoryBookRepository()
-order_repo = InMemoryOrderRepository()
-account_repo = InMemoryAccountRepository()
-trx_repo = InMemoryTransactionRepository()
-user_repo = InMemoryUserRepository()
+settings = get_settings()
+
+if settings.STORAGE_BACKEND in ("sqlite", "sqlite_async"):
+    from Infrastructure.Persistence_Layer.sqlite.book_repo import SQLiteBookRepository
+    from Infrastructure.Persistence_Layer.sqlite.order_repo import SQLiteOrderRepository
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import (
+        SQLiteAccountRepository, SQLiteTransactionRepository
+    )
+    from Infrastructure.Persistence_Layer.sqlite.user_repo import SQLiteUserRepository
+    from Infrastructure.Persistence_Layer.sqlite.warehouse_repo import (
+        SQLiteCellRepository, SQLiteStockRepository,
+        SQLiteStockMovementRepository, SQLiteInventorySessionRepository
+    )
+    from Infrastructure.Persistence_Layer.sqlite.id_block_repo import SQLiteIdBlockSource
+    from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteUnitOfWork
+    from Infrastructure.Persistence_Layer.cached.book_repo import CachedBookRepository
+    from Infrastructure.Persistence_Layer.search.sqlite_fts_index import SQLiteFtsBookSearchIndex
+    from Infrastructure.Persistence_Layer.search.sqlite_facets import SQLiteBookFacetCounter
+
+    book_index = SQLiteFtsBookSearchIndex()
+    book_facets = SQLiteBookFacetCounter()
+    book_repo = IndexedBookRepository(
+        FacetCountingBookRepository(
+            CachedBookRepository(
+                SQLiteBookRepository(),
+                max_size=settings.BOOK_CACHE_SIZE,
+                ttl_seconds=settings.BOOK_CACHE_TTL_SECONDS,
+            ),
+            book_facets,
+        ),
+        book_index,
+    )
+    order_repo = SQLiteOrderRepository()
+    account_repo = SQLiteAccountRepository()
+    trx_repo = SQLiteTransactionRepository()
+    user_repo = SQLiteUserRepository()
+    cell_repo = SQLiteCellRepository()
+    stock_repo = SQLiteStockRepository()
+    movement_repo = SQLiteStockMovementRepository()
+    inventory_repo = SQLiteInventorySessionRepository()
+    id_source = SQLiteIdBlockSource()
+    if settings.STORAGE_BACKEND == "sqlite_async":
+        from Infrastructure.Persistence_Layer.sqlite.async_unit_of_work import (
+            AsyncSQLiteUnitOfWork, GreenletLock
+        )
+        uow_factory = AsyncSQLiteUnitOfWork
+        lock_factory = GreenletLock
+    else:
+        uow_factory = SQLiteUnitOfWork
+        lock_factory = None
+else:
+    book_index = InMemoryBookSearchIndex()
+    book_facets = InMemoryBookFacetCounter()
+    book_repo = IndexedBookRepository(
+        FacetCountingBookRepository(InMemoryBookRepository(), book_facets), book_index
+    )
+    order_repo = InMemoryOrderRepository()
+    account_repo = InMemoryAccountRepository()
+    trx_repo = InMemoryTransactionRepository()
+    user_repo = InMemoryUserRepository()
+    cell_repo = InMemoryCellRepository()
+    stock_repo = InMemoryStockRepository()
+    movement_repo = InMemoryStockMovementRepository()
+    inventory_repo = InMemoryInventorySessionRepository()
+    # общий источник блоков id для всех сервисов
+    id_source = LocalIdBlockSource()
+    uow_factory = None
+    lock_factory = None
+
+# ролей/прав в SQLite пока нет
 role_repo = InMemoryRoleRepository()
 perm_repo = InMemoryPermissionRepository()
-cell_repo = InMemoryCellRepository()
-stock_repo = InMemoryStockRepository()
-movement_repo = InMemoryStockMovementRepository()
-inventory_repo = InMemoryInventorySessionRepository()
 
 # ================================
 # Здесь должны быть твои реальные
@@ -52,33 +135,150 @@ inventory_repo = InMemoryInventorySessionRepository()
 # ================================
 # Сервисы
 # ================================
-book_service = BookCatalogService(book_repo)
-order_service = OrderService(order_repo, book_repo)
-payment_service = PaymentService(account_repo, trx_repo, gateway=None)
-user_service = UserService(user_repo, role_repo)
-auth_service = AuthService(user_repo)
+password_hasher = PooledPasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+token_service = TokenService(
+    settings.SECRET_KEY,
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    max_cached=settings.TOKEN_CACHE_SIZE,
+    users=user_repo,
+    recheck_seconds=settings.TOKEN_RECHECK_SECONDS,
+)
+
+if settings.BANK_GATEWAY_URL:
+    bank_transport = HttpBankTransport(
+        settings.BANK_GATEWAY_URL, read_timeout=settings.BANK_TIMEOUT_SECONDS
+    )
+else:
+    bank_transport = InProcessBankTransport(BankGateway())
+
+payment_gateway = ResilientPaymentGateway(
+    bank_transport,
+    retry=RetryPolicy(attempts=settings.BANK_RETRY_ATTEMPTS),
+    breaker=CircuitBreaker(
+        failure_threshold=settings.BANK_BREAKER_THRESHOLD,
+        reset_timeout=settings.BANK_BREAKER_RESET_SECONDS,
+    ),
+    deadline=settings.BANK_DEADLINE_SECONDS,
+)
+
+# внешний каталог ISBN: кеш на диске, общий лимит запросов
+external_book_api = ExternalBookApi(
+    HttpBookTransport(read_timeout=settings.BOOK_API_TIMEOUT_SECONDS,
+                      pool_size=settings.BOOK_API_WORKERS),
+    cache=SQLiteIsbnCache(
+        settings.ISBN_CACHE_URL
+        or ("sqlite://" if settings.STORAGE_BACKEND == "memory" else ISBN_CACHE_URL),
+        ttl=settings.ISBN_CACHE_TTL_SECONDS,
+        negative_ttl=settings.ISBN_CACHE_NEGATIVE_TTL_SECONDS,
+    ),
+    base_url=settings.BOOK_API_URL,
+    workers=settings.BOOK_API_WORKERS,
+    retry=RetryPolicy(attempts=settings.BOOK_API_RETRY_ATTEMPTS, base_delay=0.2, max_delay=5.0),
+    rate_limiter=RateLimiter(settings.BOOK_API_RATE_PER_SECOND,
+                             burst=max(1, int(settings.BOOK_API_RATE_PER_SECOND))),
+)
+
+# уведомления: обработчик только пишет в outbox, доставляет фоновый воркер
+outbox = SQLiteOutbox(
+    settings.OUTBOX_URL or ("sqlite://" if settings.STORAGE_BACKEND == "memory" else OUTBOX_URL)
+)
+notification_worker = NotificationWorker(
+    outbox,
+    {"email": SmtpEmailService(), "telegram": TelegramNotifier()},
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_SECONDS,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+)
+email_service = OutboxEmailService(outbox, notify=notification_worker.wake)
+telegram_notifier = OutboxTelegramNotifier(
+    outbox, chat_id=settings.TELEGRAM_CHAT_ID, notify=notification_worker.wake
+)
+
+book_service = BookCatalogService(book_repo, search_index=book_index, facets=book_facets)
+order_service = OrderService(order_repo, book_repo, id_source=id_source)
+payment_service = PaymentService(
+    account_repo, trx_repo, gateway=payment_gateway,
+    id_source=id_source, lock_factory=lock_factory,
+)
+user_service = UserService(
+    user_repo, role_repo, id_source=id_source, hasher=password_hasher, tokens=token_service
+)
+auth_service = AuthService(user_repo, hasher=password_hasher, tokens=token_service)
 warehouse_service = WarehouseService(
-    cell_repo, stock_repo, movement_repo, inventory_repo
+    cell_repo, stock_repo, movement_repo, inventory_repo,
+    id_source=id_source, lock_factory=lock_factory,
 )
 
 # ================================
 # FastAPI зависимость для DI
 # ================================
 
-def get_book_service():
+async def get_unit_of_work():
+    """
+    Session-per-request: все записи сервисов за запрос уходят одним commit;
+    исключение — atomic()-блоки под блокировками сервисов, они коммитят сессию
+    до снятия блокировки.
+    async-зависимость выполняется в контексте запроса, поэтому сессия
+    видна и sync-обработчикам в threadpool (contextvars копируются).
+    """
+    if uow_factory is None:
+        yield None
+        return
+
+    uow = uow_factory()
+    if hasattr(uow, "__aenter__"):
+        async with uow:
+            yield uow
+    else:
+        with uow:
+            yield uow
+
+
+async def _run_on_loop(fn, *args, **kwargs):
+    # in-memory: поток не нужен; greenlet — чтобы ожидание пула хеширования
+    # (и прочие await_ внутри sync-кода) отдавало управление event loop
+    return await greenlet_spawn(partial(fn, *args, **kwargs))
+
+
+async def get_runner(uow=Depends(get_unit_of_work)):
+    """
+    Как async-обработчику вызвать sync-сервис:
+    memory — прямо на event loop (в greenlet), sqlite — в worker-потоке,
+    sqlite_async — в greenlet поверх aiosqlite (поток не занимается).
+    Сетевые вызовы из greenlet (шлюз банка) сами уходят в поток — см. gateway_client.
+    """
+    return _run_on_loop if uow is None else uow.run
+
+
+def get_book_service(uow=Depends(get_unit_of_work)):
     return book_service
 
-def get_order_service():
+def get_order_service(uow=Depends(get_unit_of_work)):
     return order_service
 
-def get_payment_service():
+def get_payment_service(uow=Depends(get_unit_of_work)):
     return payment_service
 
-def get_user_service():
+def get_user_service(uow=Depends(get_unit_of_work)):
     return user_service
 
-def get_auth_service():
+def get_auth_service(uow=Depends(get_unit_of_work)):
     return auth_service
 
-def get_warehouse_service():
+def get_warehouse_service(uow=Depends(get_unit_of_work)):
     return warehouse_service
+
+
+def get_current_user_id(authorization: str = Header(default="")) -> int:
+    """Bearer-токен → id пользователя; проверка по кешу без обращения к БД."""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    try:
+        return auth_service.verify_token(token)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
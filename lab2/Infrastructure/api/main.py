@@ -1,21 +1,38 @@
 # infrastructure/api/main.py
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from .book_controller import router as book_router
+from .dependencies import notification_worker
 from .order_controller import router as order_router
 from .payments_controller import router as payments_router
 from .user_controller import router as user_router
 from .warehouse_controller import router as warehouse_router
 from fastapi import FastAPI
 from Infrastructure.Config.settings import get_settings
-from Infrastructure.Config.logging_config import setup_logging
+from Infrastructure.Config.logging_config import setup_audit_logging, setup_logging
 
 settings = get_settings()
 setup_logging(settings.LOG_LEVEL)
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
-app = FastAPI(title="Book Warehouse API")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # доставка уведомлений и запись аудита живут столько же, сколько приложение
+    audit = setup_audit_logging(settings)
+    notification_worker.start()
+    try:
+        yield
+    finally:
+        notification_worker.stop()
+        if audit is not None:
+            audit.stop()
+
+
+app = FastAPI(title="Book Warehouse API", lifespan=lifespan)
 
 app.include_router(book_router)
 app.include_router(order_router)
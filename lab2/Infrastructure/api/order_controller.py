@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from .dependencies import get_order_service
+from .dependencies import get_order_service, get_runner
 from Core_Domains.Order_Processing.services import OrderService
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
@@ -18,21 +18,27 @@ class AddBookDTO(BaseModel):
 
 
 @router.post("/create")
-def create_order(
+async def create_order(
     dto: OrderCreateDTO,
-    svc: OrderService = Depends(get_order_service)
+    svc: OrderService = Depends(get_order_service),
+    run=Depends(get_runner),
 ):
-    order = svc.create_order(dto.customer_id)
+    order = await run(svc.create_order, dto.customer_id)
     return {"order_id": order.id}
 
 
 @router.post("/{order_id}/add-book")
-def add_book(order_id: int, dto: AddBookDTO, svc: OrderService = Depends(get_order_service)):
-    svc.add_book(order_id, dto.book_id, dto.qty)
+async def add_book(
+    order_id: int,
+    dto: AddBookDTO,
+    svc: OrderService = Depends(get_order_service),
+    run=Depends(get_runner),
+):
+    await run(svc.add_book, order_id, dto.book_id, dto.qty)
     return {"status": "ok"}
 
 
 @router.post("/{order_id}/pay")
-def pay(order_id: int, svc: OrderService = Depends(get_order_service)):
-    svc.pay(order_id)
+async def pay(order_id: int, svc: OrderService = Depends(get_order_service), run=Depends(get_runner)):
+    await run(svc.pay, order_id)
     return {"status": "paid"}
@@ -1,8 +1,13 @@
 # infrastructure/api/payments_controller.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Optional
+
 from pydantic import BaseModel
-from .dependencies import get_payment_service
+from .dependencies import get_payment_service, get_runner
+from Core_Domains.Payments.exceptions import AccountNotFound, GatewayUnavailable, PaymentError
+from Core_Domains.Payments.models import TransferRequest
 from Core_Domains.Payments.services import PaymentService
 from Core_Domains.Payments.value_objects import Money
 
@@ -16,6 +21,77 @@ class TransferDTO(BaseModel):
 
 
 @router.post("/transfer")
-def transfer(dto: TransferDTO, svc: PaymentService = Depends(get_payment_service)):
-    trx = svc.transfer(dto.from_account, dto.to_account, Money(dto.amount))
+async def transfer(
+    dto: TransferDTO,
+    svc: PaymentService = Depends(get_payment_service),
+    run=Depends(get_runner),
+):
+    try:
+        trx = await run(svc.transfer, dto.from_account, dto.to_account, Money(dto.amount))
+    except GatewayUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return {"transaction_id": trx.id, "status": trx.status.value}
+
+
+@router.post("/transfer/batch")
+async def transfer_batch(
+    dtos: List[TransferDTO],
+    svc: PaymentService = Depends(get_payment_service),
+    run=Depends(get_runner),
+):
+    requests = [TransferRequest(d.from_account, d.to_account, Money(d.amount)) for d in dtos]
+    result = await run(svc.transfer_batch, requests)
+    return {
+        "transactions": [
+            None if t is None else {"transaction_id": t.id, "status": t.status.value}
+            for t in result.transactions
+        ],
+        "failures": result.failures,
+        "gateway_legs": result.gateway_legs,
+    }
+
+
+@router.get("/accounts/{account_id}/transactions")
+async def account_statement(
+    account_id: int,
+    since: Optional[datetime] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    svc: PaymentService = Depends(get_payment_service),
+    run=Depends(get_runner),
+):
+    try:
+        page = await run(svc.statement, account_id, since, min(limit, 500), cursor)
+    except PaymentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "items": [
+            {
+                "transaction_id": t.id,
+                "from_account": t.from_account,
+                "to_account": t.to_account,
+                "amount": str(t.amount.amount),
+                "currency": t.amount.currency,
+                "type": t.type.value,
+                "status": t.status.value,
+                "created_at": t.created_at.isoformat(),
+            }
+            for t in page.items
+        ],
+        "next_cursor": page.next_cursor,
+    }
+
+
+@router.get("/accounts/{account_id}/balance")
+async def account_balance(
+    account_id: int,
+    at: datetime,
+    svc: PaymentService = Depends(get_payment_service),
+    run=Depends(get_runner),
+):
+    try:
+        balance = await run(svc.balance_at, account_id, at)
+    except AccountNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"account_id": account_id, "at": at.isoformat(),
+            "amount": str(balance.amount), "currency": balance.currency}
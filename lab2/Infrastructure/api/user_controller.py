@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from Infrastructure.api.dependencies import get_user_service, get_auth_service
+from Infrastructure.api.dependencies import (
+    get_user_service, get_auth_service, get_runner, get_current_user_id
+)
+from Core_Domains.User_Security.exceptions import PasswordHashingBusy
 from Core_Domains.User_Security.services import UserService
 from Core_Domains.User_Security.auth_service import AuthService
 
@@ -19,12 +22,41 @@ class LoginDTO(BaseModel):
 
 
 @router.post("/register")
-def register(dto: RegisterDTO, svc: UserService = Depends(get_user_service)):
-    u = svc.register(dto.email, dto.password)
+async def register(dto: RegisterDTO, svc: UserService = Depends(get_user_service), run=Depends(get_runner)):
+    try:
+        u = await run(svc.register, dto.email, dto.password)
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return {"user_id": u.id}
 
 
+def _login(auth: AuthService, email: str, password: str):
+    # issue() читает поколение из записи пользователя — тоже через раннер, не на loop
+    user = auth.authenticate(email, password)
+    return user, auth.tokens.issue(user.id)
+
+
 @router.post("/login")
-def login(dto: LoginDTO, auth: AuthService = Depends(get_auth_service)):
-    user = auth.authenticate(dto.email, dto.password)
-    return {"user_id": user.id, "status": "ok"}
+async def login(dto: LoginDTO, auth: AuthService = Depends(get_auth_service), run=Depends(get_runner)):
+    try:
+        user, token = await run(_login, auth, dto.email, dto.password)
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {
+        "user_id": user.id,
+        "status": "ok",
+        "access_token": token,
+        "token_type": "bearer",
+    }
+
+
+@router.get("/me")
+async def me(user_id: int = Depends(get_current_user_id)):
+    return {"user_id": user_id}
+
+
+@router.get("/hashing-stats")
+async def hashing_stats(auth: AuthService = Depends(get_auth_service)):
+    # нагрузка на пул PBKDF2 и число прозрачных перехешей при логине
+    stats = getattr(auth.hasher, "stats", None)
+    return {**(stats.as_dict() if stats else {}), "rehashed_on_login": auth.rehashed}
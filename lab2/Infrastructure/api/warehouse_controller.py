@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from .dependencies import get_warehouse_service
+from .dependencies import get_warehouse_service, get_runner
 from Core_Domains.Warehouse.services import WarehouseService
 
 router = APIRouter(prefix="/warehouse", tags=["Warehouse"])
@@ -15,8 +15,12 @@ class InboundDTO(BaseModel):
 
 
 @router.post("/inbound")
-def inbound(dto: InboundDTO, svc: WarehouseService = Depends(get_warehouse_service)):
-    svc.inbound(dto.book_id, dto.cell_id, dto.qty)
+async def inbound(
+    dto: InboundDTO,
+    svc: WarehouseService = Depends(get_warehouse_service),
+    run=Depends(get_runner),
+):
+    await run(svc.inbound, dto.book_id, dto.cell_id, dto.qty)
     return {"status": "ok"}
 
 
@@ -28,6 +32,10 @@ class RelocateDTO(BaseModel):
 
 
 @router.post("/relocate")
-def relocate(dto: RelocateDTO, svc: WarehouseService = Depends(get_warehouse_service)):
-    svc.relocate(dto.book_id, dto.from_cell, dto.to_cell, dto.qty)
+async def relocate(
+    dto: RelocateDTO,
+    svc: WarehouseService = Depends(get_warehouse_service),
+    run=Depends(get_runner),
+):
+    await run(svc.relocate, dto.book_id, dto.from_cell, dto.to_cell, dto.qty)
     return {"status": "ok"}
@@ -0,0 +1,54 @@
+# Infrastructure/integrations/books/catalog_feed.py
+
+import csv
+import json
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterator, TextIO, Union
+
+from Core_Domains.book_catalog.importing import ROW_ERROR
+
+Source = Union[str, Path, TextIO]
+
+# поставщики кладут в описание целые аннотации — стандартные 128 KiB малы
+csv.field_size_limit(16 * 1024 * 1024)
+
+
+def read_csv(source: Source, delimiter: str = ",") -> Iterator[dict]:
+    """Строки CSV с заголовком — по одной, файл целиком в память не читается."""
+    with _open(source) as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            yield row
+
+
+def read_jsonl(source: Source) -> Iterator[dict]:
+    """JSON Lines: объект на строку. Битая строка не рвёт импорт — помечается ROW_ERROR."""
+    with _open(source) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield {ROW_ERROR: f"invalid JSON: {e}"}
+                continue
+            yield row if isinstance(row, dict) else {ROW_ERROR: "row is not an object"}
+
+
+def read_feed(path: Union[str, Path]) -> Iterator[dict]:
+    """Формат по расширению: .csv / .tsv / .jsonl / .ndjson."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return read_csv(path)
+    if suffix == ".tsv":
+        return read_csv(path, delimiter="\t")
+    if suffix in (".jsonl", ".ndjson"):
+        return read_jsonl(path)
+    raise ValueError(f"Unsupported feed format: {suffix or path}")
+
+
+def _open(source: Source):
+    if isinstance(source, (str, Path)):
+        # utf-8-sig: выгрузки из Excel начинаются с BOM
+        return open(source, encoding="utf-8-sig", newline="")
+    return nullcontext(source)  # открыт снаружи — не закрываем
@@ -1,27 +1,141 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from Infrastructure.integrations.resilience import RateLimiter, RetryPolicy
+
+
+class HttpBookTransport:
+    """
+    GET через один requests.Session с пулом соединений и таймаутом.
+    Транспорт — любой callable(url, params) → ответ со status_code и json();
+    в тестах его подменяют заглушкой или направляют на StubBooksServer.
+    """
+
+    def __init__(self, connect_timeout: float = 2.0, read_timeout: float = 5.0,
+                 pool_size: int = 16, session: Optional[requests.Session] = None):
+        self.timeout = (connect_timeout, read_timeout)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def __call__(self, url: str, params: dict):
+        return self.session.get(url, params=params, timeout=self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+@dataclass
+class LookupStats:
+    cache_hits: int = 0
+    fetched: int = 0
+    retries: int = 0
+    failed: int = 0     # не удалось получить ответ — не кешируется
+
+    def as_dict(self) -> dict:
+        return asdict(self)
 
 
 class ExternalBookApi:
+    """
+    Поиск книг по ISBN во внешнем каталоге. find_many: дедупликация,
+    один запрос в кеш на всю пачку, промахи — параллельно (workers потоков)
+    под общим rate limiter; временные ошибки (сеть, 5xx, 429) повторяются
+    с backoff и в кеш не попадают, «не найдено» кешируется как None.
+    """
 
     BASE = "https://www.googleapis.com/books/v1/volumes"
 
+    def __init__(self, transport: Optional[Callable] = None, cache=None,
+                 base_url: Optional[str] = None, workers: int = 8,
+                 retry: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.transport = transport or HttpBookTransport(pool_size=workers)
+        self.cache = cache
+        self.base_url = base_url or self.BASE
+        self.workers = workers
+        self.retry = retry or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.stats = LookupStats()
+        self._stats_lock = threading.Lock()   # _lookup считает из потоков find_many
+        self._sleep = sleep
+
     def find_by_isbn(self, isbn: str) -> dict | None:
+        return self.find_many([isbn])[isbn]
+
+    def find_many(self, isbns: Iterable[str]) -> Dict[str, Optional[dict]]:
+        unique = list(dict.fromkeys(isbns))
+        results = self.cache.get_many(unique) if self.cache is not None else {}
+        self._count("cache_hits", len(results))
+
+        missing = [isbn for isbn in unique if isbn not in results]
+        if len(missing) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(min(self.workers, len(missing))) as pool:
+                fetched = list(pool.map(self._lookup, missing))
+        else:
+            fetched = [self._lookup(isbn) for isbn in missing]
+
+        cacheable = {}
+        for isbn, (book, ok) in zip(missing, fetched):
+            results[isbn] = book
+            if ok:
+                cacheable[isbn] = book
+        if self.cache is not None:
+            self.cache.put_many(cacheable)
+        return results
+
+    def _lookup(self, isbn: str) -> Tuple[Optional[dict], bool]:
+        """(книга или None, можно ли кешировать ответ)."""
         params = {"q": f"isbn:{isbn}"}
-        r = requests.get(self.BASE, params=params)
+        for attempt in range(self.retry.attempts):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                r = self.transport(self.base_url, params)
+            except (requests.Timeout, requests.ConnectionError):
+                pass
+            else:
+                if r.status_code == 200:
+                    self._count("fetched")
+                    return _parse(r.json()), True
+                if r.status_code == 404:
+                    self._count("fetched")
+                    return None, True
+                if r.status_code < 500 and r.status_code != 429:
+                    break  # 4xx (ключ, квота) — повтор не поможет, но и книга не «не найдена»
+
+            if attempt + 1 < self.retry.attempts:
+                self._count("retries")
+                self._sleep(self.retry.delay(attempt))
+
+        self._count("failed")
+        return None, False
+
+    def _count(self, name: str, n: int = 1):
+        with self._stats_lock:
+            setattr(self.stats, name, getattr(self.stats, name) + n)
 
-        if r.status_code != 200:
-            return None
 
-        data = r.json()
-        if data["totalItems"] == 0:
-            return None
+def _parse(data: dict) -> Optional[dict]:
+    if not data.get("totalItems") or not data.get("items"):
+        return None
 
-        info = data["items"][0]["volumeInfo"]
+    info = data["items"][0]["volumeInfo"]
 
-        return {
-            "title": info.get("title"),
-            "authors": info.get("authors", []),
-            "publisher": info.get("publisher"),
-            "publishedDate": info.get("publishedDate"),
-            "description": info.get("description")
-        }
+    return {
+        "title": info.get("title"),
+        "authors": info.get("authors", []),
+        "publisher": info.get("publisher"),
+        "publishedDate": info.get("publishedDate"),
+        "description": info.get("description")
+    }
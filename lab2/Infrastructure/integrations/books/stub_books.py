@@ -0,0 +1,95 @@
+# Infrastructure/integrations/books/stub_books.py
+
+import json
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class StubBooksServer:
+    """
+    Локальный каталог в формате Google Books для тестов ExternalBookApi.
+    GET /volumes?q=isbn:<isbn> → {"totalItems", "items": [{"volumeInfo"}]}.
+    requests — число запросов по ISBN, peak_concurrency — пик параллельных
+    запросов; деградация — latency и fail_next().
+    """
+
+    def __init__(self, books: Optional[Dict[str, dict]] = None, latency: float = 0.0):
+        self.books = dict(books or {})
+        self.latency = latency
+        self.requests = Counter()
+        self.peak_concurrency = 0
+        self._in_flight = 0
+        self._forced = deque()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/volumes"
+
+    def fail_next(self, count: int = 1, status: int = 503):
+        with self._lock:
+            self._forced.extend([status] * count)
+
+    def start(self) -> "StubBooksServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def lookup(self, query: str) -> Tuple[int, dict]:
+        isbn = query.partition("isbn:")[2]
+        with self._lock:
+            self.requests[isbn] += 1
+            if self._forced:
+                return self._forced.popleft(), {"error": "forced failure"}
+            self._in_flight += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            book = self.books.get(isbn)
+            if book is None:
+                return 200, {"totalItems": 0}
+            return 200, {"totalItems": 1, "items": [{"volumeInfo": book}]}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive для Session
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+                status, reply = stub.lookup(query)
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -1,23 +1,113 @@
 import smtplib
+import threading
 from email.mime.text import MIMEText
+from typing import List, Optional
+
 from Infrastructure.Config.settings import get_settings
+from Infrastructure.integrations.notifications.outbox import (
+    DeliveryError, OutboxMessage, PermanentDeliveryError
+)
 
 
 class SmtpEmailService:
-    def __init__(self):
+    """
+    Одно долгоживущее SMTP-соединение: connect/STARTTLS/login — один раз,
+    дальше только MAIL/RCPT/DATA. Если сервер закрыл соединение по простою,
+    переподключаемся и повторяем письмо один раз.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 login: Optional[str] = None, password: Optional[str] = None,
+                 starttls: Optional[bool] = None, timeout: Optional[float] = None,
+                 sender: Optional[str] = None):
         settings = get_settings()
-        self.host = settings.SMTP_HOST
-        self.port = settings.SMTP_PORT
-        self.login = settings.SMTP_LOGIN
-        self.password = settings.SMTP_PASSWORD
+        self.host = host if host is not None else settings.SMTP_HOST
+        self.port = port if port is not None else settings.SMTP_PORT
+        self.login = login if login is not None else settings.SMTP_LOGIN
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+        self.starttls = starttls if starttls is not None else settings.SMTP_STARTTLS
+        self.timeout = timeout if timeout is not None else settings.SMTP_TIMEOUT_SECONDS
+        self.sender = sender or self.login
+        self.connects = 0
+        self._server: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
 
     def send_email(self, to: str, subject: str, body: str):
+        with self._lock:
+            self._deliver(self._message(to, subject, body))
+
+    def send_batch(self, messages: List[OutboxMessage]) -> List[Optional[Exception]]:
+        """Пачка по одному соединению; на каждое письмо — ошибка или None."""
+        results = []
+        with self._lock:
+            for m in messages:
+                try:
+                    self._deliver(self._message(m.recipient, m.subject, m.body))
+                except (smtplib.SMTPException, OSError) as e:
+                    if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                        self._disconnect()  # состояние сессии неизвестно
+                    results.append(_classify(e))
+                else:
+                    results.append(None)
+        return results
+
+    def close(self):
+        with self._lock:
+            self._disconnect(quit=True)
+
+    def _message(self, to: str, subject: str, body: str) -> MIMEText:
         msg = MIMEText(body)
         msg["Subject"] = subject
-        msg["From"] = self.login
+        msg["From"] = self.sender
         msg["To"] = to
+        return msg
+
+    def _deliver(self, msg: MIMEText):
+        reused = self._server is not None
+        try:
+            self._connection().send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self._disconnect()
+            if not reused:
+                raise
+            self._connection().send_message(msg)
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._server is None:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.starttls:
+                    server.starttls()
+                if self.login:
+                    server.login(self.login, self.password)
+            except BaseException:
+                server.close()
+                raise
+            self._server = server
+            self.connects += 1
+        return self._server
+
+    def _disconnect(self, quit: bool = False):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            if quit:
+                server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        finally:
+            server.close()
+
 
-        with smtplib.SMTP(self.host, self.port) as server:
-            server.starttls()
-            server.login(self.login, self.password)
-            server.send_message(msg)
+def _classify(error: Exception) -> DeliveryError:
+    # 5xx от сервера — адрес/письмо отвергнуты навсегда; 4xx и сеть — можно повторить
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        permanent = bool(codes) and all(code >= 500 for code in codes)
+    elif isinstance(error, smtplib.SMTPResponseException):
+        permanent = error.smtp_code >= 500
+    else:
+        permanent = False
+    cls = PermanentDeliveryError if permanent else DeliveryError
+    return cls(f"{error.__class__.__name__}: {error}")
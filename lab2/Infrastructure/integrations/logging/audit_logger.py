@@ -4,14 +4,26 @@ audit_logger = logging.getLogger("audit")
 
 
 class AuditLogger:
+    """
+    События аудита. Сообщение форматируется лениво (msg % args в потоке
+    AuditPipeline), а поля события уходят отдельно — в JSON-строку как есть.
+    """
 
     def log_user_login(self, user_id: int):
-        audit_logger.info(f"User login: {user_id}")
+        self._log("user_login", "User login: %s", user_id, user_id=user_id)
 
     def log_order_created(self, order_id: int):
-        audit_logger.info(f"Order created: {order_id}")
+        self._log("order_created", "Order created: %s", order_id, order_id=order_id)
 
     def log_stock_movement(self, book_id: int, from_cell: int, to_cell: int, qty: int):
-        audit_logger.info(
-            f"Stock movement: book={book_id}, from={from_cell}, to={to_cell}, qty={qty}"
+        self._log(
+            "stock_movement",
+            "Stock movement: book=%s, from=%s, to=%s, qty=%s", book_id, from_cell, to_cell, qty,
+            book_id=book_id, from_cell=from_cell, to_cell=to_cell, qty=qty,
         )
+
+    @staticmethod
+    def _log(event: str, msg: str, *args, **fields):
+        # уровень выключен — не собираем даже extra
+        if audit_logger.isEnabledFor(logging.INFO):
+            audit_logger.info(msg, *args, extra={"audit_event": event, "audit_fields": fields})
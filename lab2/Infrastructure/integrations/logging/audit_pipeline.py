@@ -0,0 +1,184 @@
+# Infrastructure/integrations/logging/audit_pipeline.py
+
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+
+DROP = "drop"
+BLOCK = "block"
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Одна запись — одна JSON-строка: ts, level, logger, event, message и поля события."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "audit_event", None),
+            "message": record.getMessage(),
+        }
+        line.update(getattr(record, "audit_fields", None) or {})
+        if record.exc_text:
+            line["exc"] = record.exc_text
+        return json.dumps(line, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler с ограниченной очередью: запрос только кладёт запись,
+    форматирование — в потоке слушателя. При переполнении policy=drop
+    теряет запись сразу, policy=block ждёт до block_timeout и тогда теряет;
+    потери считаются в dropped.
+    """
+
+    def __init__(self, maxsize: int = 10_000, policy: str = DROP, block_timeout: float = 0.05):
+        if policy not in (DROP, BLOCK):
+            raise ValueError(f"Unknown audit queue policy: {policy}")
+        super().__init__(queue.Queue(maxsize))
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # в отличие от базового — без format(): msg % args считает слушатель.
+        # Трассировку рендерим сразу: traceback не переживёт выход из except.
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self.policy == BLOCK:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler, который пишет пачку записей и делает один flush на пачку."""
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        self.acquire()
+        try:
+            for record in records:
+                try:
+                    if self.shouldRollover(record):
+                        self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                    self.stream.write(self.format(record) + self.terminator)
+                except Exception:
+                    self.handleError(record)
+            if self.stream is not None:
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class BatchQueueListener(QueueListener):
+    """Забирает из очереди всё накопившееся (до batch_size) и отдаёт обработчикам пачкой."""
+
+    def __init__(self, q, *handlers, batch_size: int = 256):
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def enqueue_sentinel(self):
+        # очередь ограничена: ждём место, а не теряем сигнал остановки
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        q = self.queue
+        stop = False
+        while not stop:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for _ in batch:
+                q.task_done()
+            stop = any(r is self._sentinel for r in batch)
+            self.handle_batch([r for r in batch if r is not self._sentinel])
+
+    def handle_batch(self, records: List[logging.LogRecord]):
+        if not records:
+            return
+        for handler in self.handlers:
+            accepted = [r for r in records if r.levelno >= handler.level]
+            if not accepted:
+                continue
+            if hasattr(handler, "emit_batch"):
+                handler.emit_batch(accepted)
+            else:
+                for record in accepted:
+                    handler.handle(record)
+
+
+class AuditPipeline:
+    """
+    Логгер "audit" → BoundedQueueHandler → BatchQueueListener → JSON-строки
+    в ротируемый файл. На время работы аудит не уходит в корневой (консольный)
+    обработчик: propagate выключается и восстанавливается в stop().
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                 queue_size: int = 10_000, policy: str = DROP, batch_size: int = 256,
+                 logger_name: str = "audit"):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.logger = logging.getLogger(logger_name)
+        self.file_handler = BatchingRotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+        self.file_handler.setFormatter(JsonLineFormatter())
+        self.queue_handler = BoundedQueueHandler(queue_size, policy)
+        self.listener = BatchQueueListener(
+            self.queue_handler.queue, self.file_handler, batch_size=batch_size
+        )
+        self._propagate: Optional[bool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def dropped(self) -> int:
+        return self.queue_handler.dropped
+
+    def start(self) -> "AuditPipeline":
+        with self._lock:
+            if self._propagate is None:
+                self.listener.start()
+                self._propagate = self.logger.propagate
+                self.logger.addHandler(self.queue_handler)
+                self.logger.propagate = False
+        return self
+
+    def stop(self):
+        """Отцепляет обработчик и дописывает всё, что уже в очереди."""
+        with self._lock:
+            if self._propagate is None:
+                return
+            self.logger.removeHandler(self.queue_handler)
+            self.logger.propagate = self._propagate
+            self._propagate = None
+            self.listener.stop()
+            self.file_handler.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
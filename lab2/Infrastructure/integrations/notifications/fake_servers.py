@@ -0,0 +1,191 @@
+# Infrastructure/integrations/notifications/fake_servers.py
+
+import json
+import socketserver
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs
+
+
+class _LocalServer:
+    """Общий жизненный цикл: порт 0 на 127.0.0.1, поток serve_forever, контекстный менеджер."""
+
+    def __init__(self):
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def _make_server(self):
+        raise NotImplementedError
+
+    def start(self):
+        self._server = self._make_server()
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _connected(self):
+        with self._lock:
+            self.connections += 1
+
+
+class FakeSmtpServer(_LocalServer):
+    """
+    Минимальный ESMTP для тестов: EHLO, AUTH (любой пароль), MAIL/RCPT/DATA,
+    RSET, NOOP, QUIT. STARTTLS не объявляется. Адреса из reject получают 550;
+    drop_after(n) рвёт соединение после n-го письма — проверка переподключения.
+    """
+
+    def __init__(self, reject=()):
+        super().__init__()
+        self.reject = set(reject)
+        self.messages: List[dict] = []
+        self._drop_after: Optional[int] = None
+
+    def drop_after(self, messages: int):
+        self._drop_after = messages
+
+    def _make_server(self):
+        smtp = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def reply(self, *lines: str):
+                *head, last = lines
+                data = "".join(f"{line[:3]}-{line[4:]}\r\n" for line in head) + f"{last}\r\n"
+                self.wfile.write(data.encode())
+
+            def handle(self):
+                smtp._connected()
+                self.reply("220 fake ESMTP")
+                mail_from, rcpts, sent = None, [], 0
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    cmd = line.decode().rstrip("\r\n")
+                    verb = cmd.split(" ", 1)[0].upper()
+                    if verb == "EHLO":
+                        self.reply("250 fake", "250 AUTH PLAIN LOGIN", "250 8BITMIME")
+                    elif verb == "HELO":
+                        self.reply("250 fake")
+                    elif verb == "AUTH":
+                        self.reply("235 2.7.0 Authentication successful")
+                    elif verb == "MAIL":
+                        mail_from, rcpts = _address(cmd), []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        rcpt = _address(cmd)
+                        if rcpt in smtp.reject:
+                            self.reply("550 5.1.1 No such user")
+                        else:
+                            rcpts.append(rcpt)
+                            self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = []
+                        while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                            data.append(chunk)
+                        with smtp._lock:
+                            smtp.messages.append(
+                                {"from": mail_from, "to": rcpts, "data": b"".join(data).decode()}
+                            )
+                        self.reply("250 OK queued")
+                        sent += 1
+                        if smtp._drop_after is not None and sent >= smtp._drop_after:
+                            smtp._drop_after = None
+                            return
+                    elif verb in ("RSET", "NOOP"):
+                        mail_from, rcpts = None, []
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        return socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+
+
+def _address(cmd: str) -> str:
+    value = cmd.split(":", 1)[1].strip()
+    return value.split(" ", 1)[0].strip("<>")
+
+
+class FakeTelegramServer(_LocalServer):
+    """
+    POST /bot<token>/sendMessage (form chat_id, text) → {"ok": true}.
+    fail_next(count, status, retry_after) — ответы-ошибки по очереди;
+    connections — число TCP-соединений (keep-alive: одно на сессию).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages: List[dict] = []
+        self._forced = deque()
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def fail_next(self, count: int = 1, status: int = 502, retry_after: Optional[int] = None):
+        with self._lock:
+            self._forced.extend([(status, retry_after)] * count)
+
+    def _respond(self, path: str, form: dict) -> Tuple[int, dict]:
+        with self._lock:
+            if self._forced:
+                status, retry_after = self._forced.popleft()
+                reply = {"ok": False, "error_code": status, "description": "forced failure"}
+                if retry_after is not None:
+                    reply["parameters"] = {"retry_after": retry_after}
+                return status, reply
+            if not path.endswith("/sendMessage"):
+                return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+            message = {"chat_id": form.get("chat_id", [""])[0], "text": form.get("text", [""])[0]}
+            self.messages.append(message)
+            return 200, {"ok": True, "result": message}
+
+    def _make_server(self):
+        telegram = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive для Session
+
+            def setup(self):
+                super().setup()
+                telegram._connected()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, reply = telegram._respond(self.path, parse_qs(body.decode()))
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return ThreadingHTTPServer(("127.0.0.1", 0), Handler)
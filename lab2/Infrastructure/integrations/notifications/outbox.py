@@ -0,0 +1,187 @@
+# Infrastructure/integrations/notifications/outbox.py
+
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from Infrastructure.integrations.resilience import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryError(Exception):
+    """Временная ошибка доставки: сообщение вернётся в очередь с backoff."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PermanentDeliveryError(DeliveryError):
+    """Получатель отвергнут окончательно (5xx SMTP, 4xx Telegram) — повтор бесполезен."""
+
+
+@dataclass
+class OutboxMessage:
+    channel: str                 # "email" / "telegram"
+    recipient: str               # адрес или chat_id
+    body: str
+    subject: str = ""
+    id: Optional[int] = None
+    attempts: int = 0            # попыток доставки, включая текущую (их считает claim)
+
+
+# ==========================
+# Постановка в очередь
+# ==========================
+
+class OutboxEmailService:
+    """Тот же интерфейс, что у SmtpEmailService, но send_email только пишет в outbox."""
+
+    def __init__(self, outbox, notify: Optional[Callable[[], None]] = None):
+        self.outbox = outbox
+        self._notify = notify
+
+    def send_email(self, to: str, subject: str, body: str) -> int:
+        message_id = self.outbox.enqueue(OutboxMessage("email", to, body, subject=subject))
+        if self._notify:
+            self._notify()
+        return message_id
+
+
+class OutboxTelegramNotifier:
+    """Тот же интерфейс, что у TelegramNotifier, но send только пишет в outbox."""
+
+    def __init__(self, outbox, chat_id: str = "", notify: Optional[Callable[[], None]] = None):
+        self.outbox = outbox
+        self.chat_id = chat_id
+        self._notify = notify
+
+    def send(self, message: str, chat_id: Optional[str] = None) -> int:
+        message_id = self.outbox.enqueue(
+            OutboxMessage("telegram", chat_id or self.chat_id, message)
+        )
+        if self._notify:
+            self._notify()
+        return message_id
+
+
+# ==========================
+# Доставка
+# ==========================
+
+class NotificationWorker:
+    """
+    Фоновая доставка из outbox: забирает пачку (claim с арендой), группирует
+    по каналу и отдаёт отправителю целиком — send_batch(messages) возвращает
+    по ошибке (или None) на сообщение. Успешные удаляются из outbox, временные
+    ошибки откладываются по RetryPolicy, постоянные и исчерпавшие
+    max_attempts получают статус dead. Доставка at-least-once: если процесс
+    упал до отметки, сообщение уйдёт повторно после истечения аренды.
+    """
+
+    def __init__(self, outbox, senders: Dict[str, object], batch_size: int = 50,
+                 poll_interval: float = 1.0, max_attempts: int = 8,
+                 retry: Optional[RetryPolicy] = None, lease: float = 60.0):
+        if batch_size <= 0 or max_attempts <= 0:
+            raise ValueError("batch_size and max_attempts must be positive")
+        self.outbox = outbox
+        self.senders = senders
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry = retry or RetryPolicy(base_delay=1.0, max_delay=300.0)
+        self.lease = lease
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Одна пачка; возвращает число забранных сообщений."""
+        batch = self.outbox.claim(self.batch_size, self.lease)
+        by_channel: Dict[str, List[OutboxMessage]] = defaultdict(list)
+        for message in batch:
+            if message.attempts > self.max_attempts:
+                # прошлые аренды истекли без отметки — воркер падал или зависал на нём
+                logger.warning("Notification %s dropped after %d expired leases",
+                               message.id, message.attempts - 1)
+                self.outbox.bury(message.id, "Delivery lease expired")
+                continue
+            by_channel[message.channel].append(message)
+
+        delivered = []
+        for channel, messages in by_channel.items():
+            for message, error in zip(messages, self._send(channel, messages)):
+                if error is None:
+                    delivered.append(message.id)
+                else:
+                    self._failed(message, error)
+
+        self.outbox.complete(delivered)
+        return len(batch)
+
+    def drain(self) -> None:
+        """Доставить всё, что уже доступно (тесты, остановка приложения)."""
+        while self.run_once():
+            pass
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self) -> "NotificationWorker":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="notification-worker", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for sender in self.senders.values():
+            close = getattr(sender, "close", None)
+            if close:
+                close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            # сброс до claim: wake() во время прохода не потеряется
+            self._wake.clear()
+            try:
+                claimed = self.run_once()
+            except Exception:
+                logger.exception("Notification outbox pass failed")
+                claimed = 0
+            # полная пачка — вероятно, есть ещё: без паузы
+            if claimed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+
+    def _send(self, channel: str, messages: List[OutboxMessage]) -> List[Optional[Exception]]:
+        sender = self.senders.get(channel)
+        if sender is None:
+            return [PermanentDeliveryError(f"No sender for channel {channel!r}")] * len(messages)
+        try:
+            return sender.send_batch(messages)
+        except Exception as e:
+            return [e] * len(messages)
+
+    def _failed(self, message: OutboxMessage, error: Exception):
+        reason = f"{error.__class__.__name__}: {error}"
+        if isinstance(error, PermanentDeliveryError) or message.attempts >= self.max_attempts:
+            logger.warning("Notification %s dropped after %d attempts: %s",
+                           message.id, message.attempts, reason)
+            self.outbox.bury(message.id, reason)
+            return
+
+        delay = self.retry.delay(message.attempts - 1)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, retry_after)
+        self.outbox.retry(message.id, delay, reason)
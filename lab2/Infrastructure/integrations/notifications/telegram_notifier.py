@@ -1,15 +1,71 @@
+from typing import List, Optional
+
 import requests
 from Infrastructure.Config.settings import get_settings
+from Infrastructure.integrations.notifications.outbox import (
+    DeliveryError, OutboxMessage, PermanentDeliveryError
+)
 
 
 class TelegramNotifier:
+    """
+    Bot API через один requests.Session (keep-alive) и с таймаутом на запрос.
+    429 несёт retry_after — его уважает NotificationWorker; остальные 4xx
+    (чат не найден, бот заблокирован) повторять бессмысленно.
+    """
 
-    def __init__(self):
+    def __init__(self, token: Optional[str] = None, chat_id: Optional[str] = None,
+                 base_url: Optional[str] = None, timeout: Optional[float] = None,
+                 session: Optional[requests.Session] = None):
         settings = get_settings()
-        self.token = settings.TELEGRAM_BOT_TOKEN
-        self.chat_id = settings.TELEGRAM_CHAT_ID
+        self.token = token if token is not None else settings.TELEGRAM_BOT_TOKEN
+        self.chat_id = chat_id if chat_id is not None else settings.TELEGRAM_CHAT_ID
+        self.base_url = (base_url or settings.TELEGRAM_API_URL).rstrip("/")
+        self.timeout = timeout if timeout is not None else settings.TELEGRAM_TIMEOUT_SECONDS
+        self.session = session or requests.Session()
 
     def send(self, message: str):
-        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-        data = {"chat_id": self.chat_id, "text": message}
-        requests.post(url, data=data)
+        self._post(self.chat_id, message)
+
+    def send_batch(self, messages: List[OutboxMessage]) -> List[Optional[Exception]]:
+        results: List[Optional[Exception]] = []
+        for i, m in enumerate(messages):
+            try:
+                self._post(m.recipient or self.chat_id, m.body)
+            except DeliveryError as e:
+                results.append(e)
+                if e.retry_after:
+                    # лимит на бота: остаток пачки получит тот же ответ
+                    results.extend([e] * (len(messages) - i - 1))
+                    break
+            else:
+                results.append(None)
+        return results
+
+    def close(self):
+        self.session.close()
+
+    def _post(self, chat_id: str, text: str):
+        url = f"{self.base_url}/bot{self.token}/sendMessage"
+        try:
+            r = self.session.post(url, data={"chat_id": chat_id, "text": text}, timeout=self.timeout)
+        except (requests.Timeout, requests.ConnectionError) as e:
+            raise DeliveryError(f"Telegram: {e.__class__.__name__}") from e
+
+        if r.status_code == 200:
+            return
+        if r.status_code == 429:
+            retry_after = _json(r).get("parameters", {}).get("retry_after", 1)
+            raise DeliveryError("Telegram: HTTP 429", retry_after=float(retry_after))
+        if r.status_code >= 500:
+            raise DeliveryError(f"Telegram: HTTP {r.status_code}")
+        raise PermanentDeliveryError(
+            f"Telegram: HTTP {r.status_code} {_json(r).get('description', '')}".rstrip()
+        )
+
+
+def _json(response) -> dict:
+    try:
+        return response.json()
+    except ValueError:
+        return {}
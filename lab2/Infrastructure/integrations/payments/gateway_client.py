@@ -0,0 +1,201 @@
+# Infrastructure/integrations/payments/gateway_client.py
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+import anyio.to_thread
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy.util import await_
+from sqlalchemy.util.concurrency import in_greenlet
+
+from Core_Domains.Payments.exceptions import GatewayUnavailable
+from Core_Domains.Payments.gateway_interface import PaymentGateway, current_idempotency_key
+from Core_Domains.Payments.value_objects import Money
+from Infrastructure.integrations.resilience import CircuitBreaker, RetryPolicy
+
+
+class TransientGatewayError(Exception):
+    """Таймаут, обрыв соединения, 5xx/429 — такой вызов можно повторить."""
+
+
+# ==========================
+# Транспорты
+# ==========================
+
+class HttpBankTransport:
+    """
+    JSON поверх HTTP: POST {base_url}/{operation}, заголовок Idempotency-Key.
+    Один requests.Session на процесс — keep-alive вместо TCP/TLS на каждый вызов.
+    """
+
+    def __init__(self, base_url: str, connect_timeout: float = 1.0, read_timeout: float = 3.0,
+                 pool_size: int = 16, session: Optional[requests.Session] = None):
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def send(self, operation: str, payload: dict, idempotency_key: str, timeout: float) -> dict:
+        try:
+            r = self.session.post(
+                f"{self.base_url}/{operation}",
+                json=payload,
+                headers={"Idempotency-Key": idempotency_key},
+                timeout=(min(self.connect_timeout, timeout), min(self.read_timeout, timeout)),
+            )
+        except (requests.Timeout, requests.ConnectionError) as e:
+            raise TransientGatewayError(f"{operation}: {e.__class__.__name__}") from e
+
+        if r.status_code >= 500 or r.status_code == 429:
+            raise TransientGatewayError(f"{operation}: HTTP {r.status_code}")
+        if r.status_code != 200:
+            return {"approved": False}  # 4xx — окончательный отказ банка, не повторяем
+        return r.json()
+
+    def close(self):
+        self.session.close()
+
+
+class InProcessBankTransport:
+    """
+    Транспорт поверх эмулятора BankGateway — когда внешний банк не настроен.
+    Ответы по ключам идемпотентности помнит для повторов, но не больше
+    max_replies последних — повторы приходят в пределах одного вызова.
+    """
+
+    def __init__(self, bank, max_replies: int = 10_000):
+        if max_replies <= 0:
+            raise ValueError("max_replies must be positive")
+        self.bank = bank
+        self.max_replies = max_replies
+        self._replies: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def send(self, operation: str, payload: dict, idempotency_key: str, timeout: float) -> dict:
+        with self._lock:
+            reply = self._replies.get(idempotency_key)
+            if reply is not None:
+                self._replies.move_to_end(idempotency_key)
+                return reply
+            approved = True
+            if operation == "authorize":
+                amount = Money.from_minor(payload["amount_minor"], payload["currency"])
+                approved = bool(self.bank.authorize_payment(float(amount.amount)))
+            reply = self._replies[idempotency_key] = {"approved": approved}
+            if len(self._replies) > self.max_replies:
+                self._replies.popitem(last=False)
+            return reply
+
+
+def _off_loop(fn, *args):
+    """
+    Блокирующий вызов из sync-сервиса. Под async-обработчиком (memory и
+    sqlite_async выполняют сервисы в greenlet на event loop) — в worker-потоке,
+    а loop тем временем обслуживает другие запросы; иначе — на месте.
+    """
+    if in_greenlet():
+        return await_(anyio.to_thread.run_sync(lambda: fn(*args)))
+    return fn(*args)
+
+
+# ==========================
+# Адаптер
+# ==========================
+
+@dataclass
+class GatewayStats:
+    calls: int = 0
+    retries: int = 0
+    transient_errors: int = 0
+    short_circuited: int = 0   # отказ без вызова: цепь разомкнута
+    unavailable: int = 0       # вызов не удался после всех попыток
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class ResilientPaymentGateway(PaymentGateway):
+    """
+    PaymentGateway поверх транспорта банка.
+    Каждый вызов: ключ идемпотентности (из idempotency_key() или новый),
+    таймаут на попытку и общий deadline, повторы с backoff только для
+    временных ошибок, circuit breaker — при деградации банка вызовы
+    сразу получают GatewayUnavailable вместо ожидания таймаутов.
+    """
+
+    def __init__(self, transport, retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None, deadline: float = 5.0,
+                 sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.monotonic):
+        if deadline <= 0:
+            raise ValueError("deadline must be positive")
+        self.transport = transport
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.deadline = deadline
+        self.stats = GatewayStats()
+        self._sleep = sleep
+        self._clock = clock
+
+    def authorize(self, amount: Money) -> bool:
+        return self._call("authorize", amount)
+
+    def capture(self, amount: Money) -> bool:
+        return self._call("capture", amount)
+
+    def refund(self, amount: Money) -> bool:
+        return self._call("refund", amount)
+
+    def _call(self, operation: str, amount: Money) -> bool:
+        self.stats.calls += 1
+        key = f"{current_idempotency_key() or uuid.uuid4().hex}:{operation}"
+        payload = {"amount_minor": amount.minor, "currency": amount.currency}
+        expires = self._clock() + self.deadline
+        error = None
+
+        for attempt in range(self.retry.attempts):
+            if not self.breaker.allow():
+                if error is None:
+                    self.stats.short_circuited += 1
+                    raise GatewayUnavailable("Payment gateway circuit is open")
+                break
+            try:
+                reply = _off_loop(self.transport.send, operation, payload, key, expires - self._clock())
+            except TransientGatewayError as e:
+                self.breaker.record_failure()
+                self.stats.transient_errors += 1
+                error = e
+            except Exception:
+                # битый ответ банка и т.п. — сбой без повтора; иначе пробный вызов
+                # half_open так и остался бы «в полёте», а цепь — открытой навсегда
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                self.breaker.release()  # отмена запроса: банк тут ни при чём
+                raise
+            else:
+                self.breaker.record_success()
+                return bool(reply.get("approved"))
+
+            delay = self.retry.delay(attempt)
+            if attempt + 1 >= self.retry.attempts or self._clock() + delay >= expires:
+                break
+            self.stats.retries += 1
+            if self._sleep is time.sleep and in_greenlet():
+                await_(asyncio.sleep(delay))  # backoff не держит event loop
+            else:
+                self._sleep(delay)
+
+        self.stats.unavailable += 1
+        raise GatewayUnavailable(f"Payment gateway unavailable: {error}")
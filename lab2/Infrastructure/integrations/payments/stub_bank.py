@@ -0,0 +1,118 @@
+# Infrastructure/integrations/payments/stub_bank.py
+
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+
+class StubBankServer:
+    """
+    Локальный HTTP-банк для тестов HttpBankTransport / ResilientPaymentGateway.
+
+    POST /authorize|/capture|/refund, тело {"amount_minor", "currency"},
+    ответ {"approved": bool}. Ответ запоминается по Idempotency-Key: повтор
+    с тем же ключом не исполняет операцию второй раз. 5xx не запоминаются.
+    Деградация задаётся latency, failure_rate и fail_next().
+    """
+
+    OPERATIONS = ("authorize", "capture", "refund")
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0,
+                 limit_minor: Optional[int] = None, seed: Optional[int] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.limit_minor = limit_minor
+        self.received = Counter()    # запросы по операциям, включая повторы
+        self.executed = Counter()    # реально исполненные операции
+        self._replies: Dict[str, Tuple[int, dict]] = {}
+        self._forced = deque()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail_next(self, count: int = 1, status: int = 503):
+        with self._lock:
+            self._forced.extend([status] * count)
+
+    def start(self) -> "StubBankServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, operation: str, payload: dict, key: Optional[str]) -> Tuple[int, dict]:
+        with self._lock:
+            self.received[operation] += 1
+            if key and key in self._replies:
+                return self._replies[key]
+            if self._forced:
+                return self._forced.popleft(), {"error": "forced failure"}
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                return 503, {"error": "bank unavailable"}
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        approved = True
+        if operation == "authorize" and self.limit_minor is not None:
+            approved = payload.get("amount_minor", 0) <= self.limit_minor
+        reply = (200, {"approved": approved})
+
+        with self._lock:
+            if key:
+                # параллельный повтор мог успеть первым — отдаём его ответ
+                if key in self._replies:
+                    return self._replies[key]
+                self._replies[key] = reply
+            self.executed[operation] += 1
+        return reply
+
+    def _handler(self):
+        bank = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive для Session
+
+            def do_POST(self):
+                operation = self.path.strip("/")
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if operation not in bank.OPERATIONS:
+                    status, reply = 404, {"error": "unknown operation"}
+                else:
+                    status, reply = bank.handle(
+                        operation, json.loads(body or b"{}"), self.headers.get("Idempotency-Key")
+                    )
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,119 @@
+# Infrastructure/integrations/resilience.py
+# Общие для всех интеграций (банк, каталог книг, уведомления): повторы, circuit breaker, rate limit.
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Экспоненциальный backoff с полным jitter: delay ∈ [0, min(max_delay, base * 2^n)]."""
+
+    attempts: int = 3
+    base_delay: float = 0.05
+    max_delay: float = 1.0
+    jitter: bool = True
+
+    def delay(self, attempt: int) -> float:
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, cap) if self.jitter else cap
+
+
+class CircuitBreaker:
+    """
+    closed → (failure_threshold ошибок подряд) → open → (reset_timeout) → half_open.
+    В half_open пропускается один пробный вызов: успех закрывает цепь, ошибка — снова open.
+    Пока цепь открыта, allow() сразу отвечает False — вызовы не ждут мёртвый шлюз.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if failure_threshold <= 0 or reset_timeout <= 0:
+            raise ValueError("failure_threshold and reset_timeout must be positive")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """Вызов прерван без ответа (отмена) — исход неизвестен, освобождаем пробный слот."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class RateLimiter:
+    """
+    Token bucket: в среднем rate вызовов в секунду, всплеск до burst.
+    acquire() резервирует токен под lock, а ждёт вне его — параллельные
+    вызовы выстраиваются в очередь без busy-wait.
+    """
+
+    def __init__(self, rate: float, burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Возвращает, сколько пришлось ждать."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
@@ -0,0 +1,101 @@
+# Infrastructure/integrations/security/pooled_hasher.py
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from sqlalchemy.util import await_
+from sqlalchemy.util.concurrency import in_greenlet
+
+from Core_Domains.User_Security.exceptions import PasswordHashingBusy
+from Core_Domains.User_Security.password_hasher import PasswordHasher
+
+
+@dataclass
+class HashingStats:
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0          # отказ по backpressure
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    total_ms: float = 0.0      # от постановки в очередь до результата
+    max_ms: float = 0.0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["avg_ms"] = self.total_ms / self.completed if self.completed else 0.0
+        return data
+
+
+class PooledPasswordHasher:
+    """
+    API PasswordHasher, но PBKDF2 считается в пуле процессов: не держит GIL,
+    event loop и слоты threadpool. Не больше max_pending задач одновременно —
+    сверх этого PasswordHashingBusy сразу (backpressure вместо растущей очереди).
+    needs_rehash() дешёвый и выполняется на месте.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32,
+                 executor: Optional[Executor] = None):
+        if workers <= 0 or max_pending <= 0:
+            raise ValueError("workers and max_pending must be positive")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.stats = HashingStats()
+        self._executor = executor  # пул создаётся при первом хеше
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        return self._call(PasswordHasher.hash, password)
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        return self._call(PasswordHasher.verify, password, stored_hash)
+
+    @staticmethod
+    def needs_rehash(stored_hash: str) -> bool:
+        return PasswordHasher.needs_rehash(stored_hash)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: fork процесса с потоками uvicorn/anyio небезопасен
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _call(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats.rejected += 1
+            raise PasswordHashingBusy()
+
+        started = time.perf_counter()
+        with self._lock:
+            self.stats.submitted += 1
+            self.stats.in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+        try:
+            future = self._pool().submit(fn, *args)
+            if in_greenlet():
+                # async-обработчик: ждём в event loop, а не блокируем его поток
+                return await_(asyncio.wrap_future(future))
+            return future.result()
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._slots.release()
+            with self._lock:
+                self.stats.in_flight -= 1
+                self.stats.completed += 1
+                self.stats.total_ms += elapsed_ms
+                self.stats.max_ms = max(self.stats.max_ms, elapsed_ms)
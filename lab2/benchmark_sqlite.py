@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Бенчмарк записи в SQLite: дефолтный engine против профиля из Settings.
+# Запуск: python benchmark_sqlite.py [кол-во записей на поток]
+
+
+def run(engine, rows: int, threads: int) -> float:
+    from Infrastructure.Persistence_Layer.sqlite.db import Base
+    from Infrastructure.Persistence_Layer.sqlite import payments_repo
+    from Core_Domains.Payments.models import Account
+    from Core_Domains.Payments.value_objects import Money
+
+    Base.metadata.create_all(engine)
+    payments_repo.SessionLocal = sessionmaker(bind=engine)
+    repo = payments_repo.SQLiteAccountRepository()
+
+    def worker(offset):
+        # commit на каждую запись — худший случай для fsync
+        for i in range(rows):
+            repo.save(Account(id=offset + i, owner_id=1, balance=Money(100)))
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(t * rows,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    engine.dispose()
+    return rows * threads / elapsed
+
+
+def main():
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, project_root)
+
+    from Infrastructure.Persistence_Layer.sqlite.db import create_sqlite_engine
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in (1, 4):
+            before_url = f"sqlite:///{tmp}/before_{threads}.db"
+            after_url = f"sqlite:///{tmp}/after_{threads}.db"
+
+            before = run(create_engine(before_url, connect_args={"check_same_thread": False}), rows, threads)
+            after = run(create_sqlite_engine(after_url), rows, threads)
+
+            print(f"threads={threads}: default {before:8.0f} writes/s | tuned {after:8.0f} writes/s "
+                  f"| x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# Импорт фида поставщика в каталог через настроенное хранилище (STORAGE_BACKEND).
+# Запуск: python import_catalog.py feed.csv|feed.jsonl [размер чанка]
+
+
+def main():
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, project_root)
+
+    if len(sys.argv) < 2:
+        print("usage: python import_catalog.py <feed.csv|feed.jsonl> [chunk_size]")
+        return 2
+
+    from Infrastructure.api.dependencies import book_service
+    from Infrastructure.integrations.books.catalog_feed import read_feed
+
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    def report(progress):
+        print(f"\r{progress.rows:>10} rows | {progress.imported:>10} imported | "
+              f"{progress.rejected:>6} rejected | {progress.rows_per_second:8.0f} rows/s",
+              end="", flush=True)
+
+    progress = book_service.import_books(read_feed(sys.argv[1]), chunk_size, on_progress=report)
+    print()
+    for line, reason in progress.errors:
+        print(f"row {line}: {reason}")
+    return 0 if progress.rejected == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from Core_Domains.Shared.id_allocator import LocalIdBlockSource, HiLoIdAllocator
+
+
+def test_local_source_blocks_do_not_overlap():
+    src = LocalIdBlockSource()
+    assert src.reserve("orders", 10) == 1
+    assert src.reserve("orders", 10) == 11
+    # у каждой последовательности свой счётчик
+    assert src.reserve("users", 5) == 1
+
+
+def test_allocator_is_monotonic_and_reserves_per_block():
+    calls = []
+
+    class CountingSource(LocalIdBlockSource):
+        def reserve(self, sequence, size):
+            calls.append(size)
+            return super().reserve(sequence, size)
+
+    alloc = HiLoIdAllocator(CountingSource(), "orders", block_size=4)
+    ids = [alloc.next_id() for _ in range(10)]
+
+    assert ids == list(range(1, 11))
+    assert len(calls) == 3
+
+
+def test_allocator_rejects_bad_block_size():
+    with pytest.raises(ValueError):
+        HiLoIdAllocator(LocalIdBlockSource(), "x", block_size=0)
+
+
+def test_allocator_unique_across_threads():
+    alloc = HiLoIdAllocator(LocalIdBlockSource(), "movements", block_size=7)
+    results = []
+
+    def worker():
+        results.extend(alloc.next_id() for _ in range(500))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == len(set(results)) == 4000
+
+
+def test_services_use_collision_free_ids():
+    from Core_Domains.Order_Processing.services import OrderService
+    from Infrastructure.Persistence_Layer.in_memory.order_repo import InMemoryOrderRepository
+    from Infrastructure.Persistence_Layer.in_memory.book_repo import InMemoryBookRepository
+
+    svc = OrderService(InMemoryOrderRepository(), InMemoryBookRepository())
+    for _ in range(5000):
+        svc.create_order(customer_id=1)
+
+    assert len(svc.order_repo.list_all()) == 5000
@@ -253,3 +253,55 @@ def test_get_user_cart(service, book_repo, order_repo, sample_book):
     assert cart is not None
     assert cart.customer_id == 5
     assert cart.status == OrderStatus.CREATED
+
+
+def _priced_book(book_id, amount):
+    return Book(id=book_id, title=f"B{book_id}", authors=[], genre=None,
+                publisher=None, edition=None, price=Price(amount))
+
+
+def test_order_total_is_maintained_incrementally_and_exact():
+    from decimal import Decimal
+
+    order = Order(id=1, customer_id=1)
+    order.add_item(_priced_book(1, 0.1), 3)
+    order.add_item(_priced_book(2, 19.99), 1)
+    order.add_item(_priced_book(1, 0.1), 2)
+
+    assert len(order.items) == 2
+    assert order.total().amount == Decimal("20.49")   # float дал бы 20.490000000000002
+
+    order.set_quantity(2, 3)
+    assert order.total().amount == Decimal("60.47")
+
+    order.remove_item(1)
+    assert order.total().amount == Decimal("59.97")
+
+    order.set_quantity(2, 0)
+    assert order.items == []
+    assert order.total().amount == 0
+
+
+def test_order_line_keeps_price_at_add_time():
+    book = _priced_book(1, 10)
+    order = Order(id=1, customer_id=1)
+    order.add_item(book, 2)
+
+    book.price = Price(99)
+    assert order.total().amount == 20
+
+    with pytest.raises(ValueError):
+        order.add_item(Book(id=2, title="E", authors=[], genre=None, publisher=None,
+                            edition=None, price=Price(5, "EUR")), 1)
+
+
+def test_update_quantity_changes_total(service, book_repo, sample_book):
+    book_repo.save(sample_book)
+    order = service.create_order(1)
+    service.add_book(order.id, sample_book.id, 1)
+
+    service.update_quantity(order.id, sample_book.id, 5)
+    assert service.calculate_total(order.id).amount == 200
+
+    with pytest.raises(InvalidOrderOperation):
+        service.update_quantity(order.id, 999, 1)
@@ -205,3 +205,252 @@ def test_get_transaction_success(service, acc_repo, trx_repo):
 def test_get_transaction_not_found(service):
     with pytest.raises(TransactionNotFound):
         service.get_transaction(999999)
+
+
+# ---------- MONEY (minor units) ----------
+
+def test_money_is_exact_in_minor_units():
+    total = Money(0)
+    for _ in range(10):
+        total = total.add(Money(0.1))
+    assert total.minor == 100
+    assert total == Money(1)
+    assert Money("19.99").multiply(3).amount == Money("59.97").amount
+    assert Money(500, "JPY").minor == 500
+
+
+def test_money_currency_is_interned_and_checked():
+    import sys
+    a, b = Money(1, "eur"), Money(2, "".join(["E", "U", "R"]))
+    assert a.currency is b.currency is sys.intern("EUR")
+    with pytest.raises(ValueError):
+        a.add(Money(1, "USD"))
+    with pytest.raises(AttributeError):
+        a.minor = 5
+
+
+def test_money_pickles_and_hashes():
+    import pickle
+    m = Money("12.34", "USD")
+    assert pickle.loads(pickle.dumps(m)) == m
+    assert len({m, Money.from_minor(1234)}) == 1
+
+
+def test_money_aggregation_helpers():
+    from Core_Domains.Shared.money import sum_minor, sum_money, sum_by_currency, group_sum
+
+    assert sum_minor([199, 1, 300]) == Money(5)
+    assert sum_money([Money(1), Money("2.50")]) == Money("3.50")
+    assert sum_money([]) == Money(0)
+    with pytest.raises(ValueError):
+        sum_money([Money(1), Money(1, "EUR")])
+
+    by_cur = sum_by_currency([Money(1), Money(2, "EUR"), Money("0.5")])
+    assert by_cur == {"USD": Money("1.5"), "EUR": Money(2, "EUR")}
+    assert group_sum(["USD", "EUR", "USD"], [100, 5, 50]) == {
+        "USD": Money("1.5"), "EUR": Money.from_minor(5, "EUR")
+    }
+
+
+def test_turnover_by_currency(service, acc_repo, trx_repo):
+    acc_repo.save(Account(id=1, owner_id=1, balance=Money(100)))
+    acc_repo.save(Account(id=2, owner_id=2, balance=Money(0)))
+
+    service.transfer(1, 2, Money("10.25"))
+    service.transfer(1, 2, Money("0.75"))
+    with pytest.raises(InsufficientFunds):
+        service.transfer(1, 2, Money(500))
+
+    assert service.turnover_by_currency(2) == {"USD": Money(11)}
+
+
+# ---------- BATCH TRANSFER TESTS ----------
+
+class RecordingGateway(FakeGateway):
+    def __init__(self, fail_over=None):
+        super().__init__()
+        self.calls = []
+        self.fail_over = fail_over
+
+    def authorize(self, amount: Money) -> bool:
+        from Core_Domains.Payments.gateway_interface import current_idempotency_key
+        self.calls.append((amount, current_idempotency_key()))
+        return self.fail_over is None or amount.minor <= self.fail_over
+
+
+def test_transfer_batch_nets_flows_and_reports_failures(acc_repo, trx_repo):
+    from Core_Domains.Payments.models import TransferRequest
+
+    gateway = RecordingGateway()
+    service = PaymentService(acc_repo, trx_repo, gateway)
+    for acc_id, balance in ((1, 100), (2, 10), (3, 0)):
+        acc_repo.save(Account(id=acc_id, owner_id=acc_id, balance=Money(balance)))
+
+    result = service.transfer_batch([
+        TransferRequest(1, 2, Money(30)),
+        TransferRequest(2, 1, Money(10)),
+        TransferRequest(2, 3, Money(5)),
+        TransferRequest(3, 2, Money(5)),      # полностью зачитывается с предыдущим
+        TransferRequest(1, 99, Money(1)),
+        TransferRequest(1, 3, Money(-1)),
+        TransferRequest(3, 1, Money(50)),     # на счёте 3 нет денег
+    ])
+
+    assert result.failures == {
+        4: "Account 99 not found",
+        5: "Transfer amount must be positive",
+        6: "Insufficient funds",
+    }
+    assert [t.status for t in result.transactions[:4]] == [TransactionStatus.SUCCESS] * 4
+    assert result.transactions[4] is None and result.transactions[5] is None
+    assert result.transactions[6].status == TransactionStatus.FAILED
+
+    # ноги: 1↔2 нетто 20, 2↔3 — ноль, без шлюза; 3→1 отклонён до шлюза
+    assert [a.minor for a, _ in gateway.calls] == [20_00]
+    assert all(key and key.startswith("batch-") for _, key in gateway.calls)
+    assert result.gateway_legs == 1
+
+    assert [acc_repo.get(i).balance for i in (1, 2, 3)] == [Money(80), Money(30), Money(0)]
+    assert len(trx_repo.data) == 5
+
+
+def test_transfer_batch_gateway_failure_fails_only_its_leg(acc_repo, trx_repo):
+    from Core_Domains.Payments.models import TransferRequest
+
+    service = PaymentService(acc_repo, trx_repo, RecordingGateway(fail_over=50_00))
+    for acc_id in (1, 2, 3):
+        acc_repo.save(Account(id=acc_id, owner_id=acc_id, balance=Money(100)))
+
+    result = service.transfer_batch([
+        TransferRequest(1, 2, Money(60)),
+        TransferRequest(1, 3, Money(10)),
+        TransferRequest(1, 2, Money(5)),
+    ])
+
+    assert result.failures == {0: "Gateway authorization failed", 2: "Gateway authorization failed"}
+    assert [t.id for t in result.succeeded] == [result.transactions[1].id]
+    assert acc_repo.get(1).balance == Money(90)
+    assert acc_repo.get(2).balance == Money(100)
+
+
+def test_transfer_batch_nets_only_transfers_that_pass_balance_check(acc_repo, trx_repo):
+    from Core_Domains.Payments.models import TransferRequest
+
+    gateway = RecordingGateway()
+    service = PaymentService(acc_repo, trx_repo, gateway)
+    acc_repo.save(Account(id=1, owner_id=1, balance=Money(0)))
+    acc_repo.save(Account(id=2, owner_id=2, balance=Money(50)))
+
+    result = service.transfer_batch([
+        TransferRequest(1, 2, Money(100)),    # денег нет — в нетто не входит
+        TransferRequest(2, 1, Money(30)),
+    ])
+
+    assert result.failures == {0: "Insufficient funds"}
+    assert [a.minor for a, _ in gateway.calls] == [30_00]
+    assert [acc_repo.get(i).balance for i in (1, 2)] == [Money(30), Money(20)]
+
+
+def test_transfer_batch_refunds_leg_drained_while_gateway_answered(acc_repo, trx_repo):
+    from Core_Domains.Payments.models import TransferRequest
+
+    class DrainingGateway(RecordingGateway):
+        """Пока шлюз проводит ногу, со счёта 1 успевают списать всё."""
+        refunds = []
+
+        def capture(self, amount):
+            acc = acc_repo.get(1)
+            acc.withdraw(acc.balance)
+            acc_repo.save(acc)
+            return True
+
+        def refund(self, amount):
+            from Core_Domains.Payments.gateway_interface import current_idempotency_key
+            self.refunds.append((amount, current_idempotency_key()))
+            return True
+
+    gateway = DrainingGateway()
+    service = PaymentService(acc_repo, trx_repo, gateway)
+    for acc_id, balance in ((1, 100), (2, 0), (3, 0)):
+        acc_repo.save(Account(id=acc_id, owner_id=acc_id, balance=Money(balance)))
+
+    result = service.transfer_batch([
+        TransferRequest(1, 2, Money(60)),
+        TransferRequest(2, 1, Money(10)),
+        TransferRequest(2, 3, Money(5)),      # держится на деньгах ноги 1↔2
+    ])
+
+    assert result.failures == {
+        0: "Insufficient funds", 1: "Batch leg rolled back", 2: "Insufficient funds",
+    }
+    # обе ноги прошли через шлюз и обе возвращены под своими ключами
+    assert sorted(a.minor for a, _ in gateway.refunds) == [5_00, 50_00]
+    assert all(key.endswith("-refund") for _, key in gateway.refunds)
+    assert [acc_repo.get(i).balance for i in (1, 2, 3)] == [Money(0), Money(0), Money(0)]
+    assert not result.succeeded
+
+
+# ---------- STATEMENT TESTS ----------
+
+def test_statement_pages_through_history(acc_repo):
+    from Infrastructure.Persistence_Layer.in_memory.payments_repo import InMemoryTransactionRepository
+
+    service = PaymentService(acc_repo, InMemoryTransactionRepository(), FakeGateway())
+    acc_repo.save(Account(id=1, owner_id=1, balance=Money(100)))
+    acc_repo.save(Account(id=2, owner_id=2, balance=Money(0)))
+    made = [service.transfer(1, 2, Money(i)).id for i in range(1, 6)]
+
+    seen, cursor = [], None
+    while True:
+        page = service.statement(2, limit=2, cursor=cursor)
+        seen.append([t.id for t in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == [made[0:2], made[2:4], made[4:]]
+
+    with pytest.raises(PaymentError):
+        service.statement(2, cursor="not-a-cursor")
+    with pytest.raises(PaymentError):
+        service.statement(2, limit=0)
+
+
+# ---------- BALANCE CHECKPOINT TESTS ----------
+
+def _history_with_snapshots(service, acc_repo):
+    from datetime import datetime
+
+    acc_repo.save(Account(id=1, owner_id=1, balance=Money(100)))
+    acc_repo.save(Account(id=2, owner_id=2, balance=Money(100)))
+    snapshots = [(datetime.utcnow(), Money(100))]
+    for i in range(1, 9):
+        if i % 3 == 0:
+            service.transfer(2, 1, Money(i))
+        elif i % 4 == 0:
+            service.refund(1, Money("0.5"))
+        else:
+            service.transfer(1, 2, Money(i))
+        snapshots.append((datetime.utcnow(), acc_repo.get(1).balance))
+    return snapshots
+
+
+def test_balance_at_uses_checkpoint_and_bounded_replay():
+    from datetime import datetime, timedelta
+    from Infrastructure.Persistence_Layer.in_memory.payments_repo import (
+        InMemoryAccountRepository, InMemoryTransactionRepository
+    )
+
+    accounts = InMemoryAccountRepository(checkpoint_every=3)
+    service = PaymentService(accounts, InMemoryTransactionRepository(), FakeGateway())
+    before = datetime.utcnow() - timedelta(seconds=1)
+    snapshots = _history_with_snapshots(service, accounts)
+
+    for at, balance in snapshots:
+        assert service.balance_at(1, at) == balance
+    assert service.balance_at(1, before) == Money(0)
+
+    # открытие + точка каждые 3 проводки (8 проводок по счёту 1)
+    assert len(accounts._checkpoints[1]) == 1 + 8 // 3
+    cp = accounts.latest_checkpoint(1, snapshots[-1][0])
+    assert cp.trx_id > 0 and service.balance_at(1, cp.created_at) == cp.balance
+    assert accounts.get(1).postings_since_checkpoint == 8 % 3
@@ -0,0 +1,148 @@
+import copy
+import threading
+import time
+
+import pytest
+
+from Core_Domains.Payments.services import PaymentService
+from Core_Domains.Payments.models import Account
+from Core_Domains.Payments.value_objects import Money
+from Core_Domains.Payments.exceptions import InsufficientFunds
+from Infrastructure.Persistence_Layer.in_memory.payments_repo import (
+    InMemoryAccountRepository, InMemoryTransactionRepository
+)
+
+
+class SnapshotAccountRepository(InMemoryAccountRepository):
+    """Как БД: get отдаёт копию, save перезаписывает — окно для lost update."""
+
+    def get(self, account_id: int):
+        acc = copy.deepcopy(super().get(account_id))
+        time.sleep(0.0005)
+        return acc
+
+    def save(self, account):
+        super().save(copy.deepcopy(account))
+
+
+class OkGateway:
+    def authorize(self, amount): return True
+    def capture(self, amount): return True
+    def refund(self, amount): return True
+
+
+def _service():
+    repo = SnapshotAccountRepository()
+    for acc_id in (1, 2, 3):
+        repo.save(Account(id=acc_id, owner_id=acc_id, balance=Money(100)))
+    return PaymentService(repo, InMemoryTransactionRepository(), OkGateway())
+
+
+def _run(workers):
+    threads = [threading.Thread(target=w) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    assert not any(t.is_alive() for t in threads), "deadlock"
+
+
+def test_concurrent_transfers_never_overdraw():
+    svc = _service()
+    rejected = []
+
+    def worker():
+        for _ in range(5):
+            try:
+                svc.transfer(1, 2, Money(10))
+            except InsufficientFunds:
+                rejected.append(1)
+
+    _run([worker] * 6)
+
+    assert svc.acc_repo.get(1).balance == Money(0)
+    assert svc.acc_repo.get(2).balance == Money(200)
+    assert len(rejected) == 6 * 5 - 10
+
+
+def test_opposite_transfers_do_not_deadlock_or_lose_money():
+    svc = _service()
+
+    def mover(src, dst):
+        def run():
+            for _ in range(20):
+                svc.transfer(src, dst, Money(1))
+                svc.pay_order(src, Money("0.5"))
+                svc.refund(src, Money("0.5"))
+        return run
+
+    _run([mover(1, 2), mover(2, 1), mover(2, 3), mover(3, 1)])
+
+    balances = [svc.acc_repo.get(i).balance for i in (1, 2, 3)]
+    # 1→2, 2→1, 2→3, 3→1 по 20: итог +20 / -20 / 0
+    assert balances == [Money(120), Money(80), Money(100)]
+
+
+# ============================================================
+#          SQLite: unit of work на запрос, как в API
+# ============================================================
+
+@pytest.fixture
+def sqlite_payments(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from Infrastructure.Persistence_Layer.sqlite.db import Base
+    import Infrastructure.Persistence_Layer.sqlite.payments_repo as pr
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'payments.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(pr, "SessionLocal", session_factory)
+    acc_repo = pr.SQLiteAccountRepository()
+    for acc_id in (1, 2, 3):
+        acc_repo.save(Account(id=acc_id, owner_id=acc_id, balance=Money(100)))
+    return PaymentService(acc_repo, pr.SQLiteTransactionRepository(), OkGateway()), session_factory
+
+
+def _requests(session_factory, op, times, rejected=None):
+    from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteUnitOfWork
+
+    def run():
+        for _ in range(times):
+            try:
+                # сессия живёт весь «запрос», полосы счетов — только операцию
+                with SQLiteUnitOfWork(session_factory):
+                    op()
+            except InsufficientFunds:
+                rejected.append(1)
+    return run
+
+
+def test_sqlite_concurrent_transfers_under_request_uow_never_overdraw(sqlite_payments):
+    svc, session_factory = sqlite_payments
+    rejected = []
+
+    _run([_requests(session_factory, lambda: svc.transfer(1, 2, Money(1)), 20, rejected)] * 8)
+
+    assert svc.acc_repo.get(1).balance == Money(0)
+    assert svc.acc_repo.get(2).balance == Money(200)
+    assert len(rejected) == 8 * 20 - 100
+
+
+def test_sqlite_mixed_operations_under_request_uow_lose_no_money(sqlite_payments):
+    svc, session_factory = sqlite_payments
+
+    def mover(src, dst):
+        def op():
+            svc.transfer(src, dst, Money(1))
+            svc.pay_order(src, Money("0.5"))
+            svc.refund(src, Money("0.5"))
+        return _requests(session_factory, op, 15)
+
+    _run([mover(1, 2), mover(2, 1), mover(2, 3), mover(3, 1)])
+
+    balances = [svc.acc_repo.get(i).balance for i in (1, 2, 3)]
+    assert balances == [Money(115), Money(85), Money(100)]
@@ -196,3 +196,159 @@ def test_permission_check(service, auth):
 
     assert auth.check_permission(user, "books.read") is True
     assert auth.check_permission(user, "orders.manage") is False
+
+
+def test_password_hash_is_versioned_kdf():
+    h = PasswordHasher.hash("secret")
+
+    assert h.startswith("pbkdf2_sha256$100000$")
+    assert PasswordHasher.verify("secret", h)
+    assert not PasswordHasher.verify("other", h)
+    assert not PasswordHasher.needs_rehash(h)
+    assert not PasswordHasher.verify("secret", "garbage")
+
+
+def test_login_transparently_rehashes_legacy_hash(auth, user_repo):
+    import hashlib
+
+    salt = "ab" * 16
+    legacy = f"{salt}${hashlib.sha256((salt + 'pw').encode()).hexdigest()}"
+    user_repo.save(User(id=1, email="old@x.com", password_hash=legacy))
+
+    assert PasswordHasher.needs_rehash(legacy)
+    auth.authenticate("old@x.com", "pw")
+
+    upgraded = user_repo.get(1).password_hash
+    assert upgraded.startswith("pbkdf2_sha256$")
+    assert auth.rehashed == 1
+
+    # повторный логин — уже без перехеша
+    auth.authenticate("old@x.com", "pw")
+    assert auth.rehashed == 1
+
+
+# ============================================================
+#                 Access tokens
+# ============================================================
+
+def test_token_roundtrip_tamper_and_expiry():
+    from Core_Domains.User_Security.token_service import TokenService
+    from Core_Domains.User_Security.exceptions import InvalidToken
+
+    now = [1000.0]
+    tokens = TokenService("k", ttl_seconds=60, clock=lambda: now[0])
+    token = tokens.issue(7)
+
+    assert tokens.verify(token) == 7
+    assert tokens.verify(token) == 7          # из кеша
+    assert tokens.cached_count() == 1
+
+    with pytest.raises(InvalidToken):
+        tokens.verify(token[:-1] + ("A" if token[-1] != "A" else "B"))
+    with pytest.raises(InvalidToken):
+        TokenService("other").verify(token)
+
+    now[0] += 61
+    with pytest.raises(InvalidToken):
+        tokens.verify(token)
+
+
+def test_block_and_password_change_revoke_tokens(user_repo, role_repo):
+    from Core_Domains.User_Security.token_service import TokenService
+    from Core_Domains.User_Security.exceptions import InvalidToken
+
+    tokens = TokenService("k")
+    service = UserService(user_repo, role_repo, tokens=tokens)
+    auth = AuthService(user_repo, tokens=tokens)
+    user = service.register("t@x.com", "old")
+
+    token = auth.login("t@x.com", "old")
+    assert auth.verify_token(token) == user.id
+
+    service.change_password(user.id, "old", "new")
+    with pytest.raises(InvalidToken):
+        auth.verify_token(token)
+
+    token = auth.login("t@x.com", "new")
+    service.block_user(user.id)
+    with pytest.raises(InvalidToken):
+        auth.verify_token(token)
+
+
+def test_revocation_is_stored_on_user_and_seen_by_other_processes(user_repo, role_repo):
+    from Core_Domains.User_Security.token_service import TokenService
+    from Core_Domains.User_Security.exceptions import InvalidToken
+
+    now = [1000.0]
+    # два процесса с общим SECRET_KEY и общей БД пользователей
+    first = TokenService("k", clock=lambda: now[0], users=user_repo, recheck_seconds=5)
+    second = TokenService("k", clock=lambda: now[0], users=user_repo, recheck_seconds=5)
+    service = UserService(user_repo, role_repo, tokens=first)
+    user = service.register("r@x.com", "old")
+
+    token = AuthService(user_repo, tokens=first).login("r@x.com", "old")
+    assert second.verify(token) == user.id           # второй процесс кеширует токен
+
+    service.change_password(user.id, "old", "new")
+    assert user_repo.get(user.id).token_generation == 1
+    with pytest.raises(InvalidToken):
+        first.verify(token)                          # свой кеш сброшен сразу
+    with pytest.raises(InvalidToken):
+        TokenService("k", clock=lambda: now[0], users=user_repo).verify(token)   # «после рестарта»
+
+    assert second.verify(token) == user.id           # чужой кеш — до перепроверки
+    now[0] += 6
+    with pytest.raises(InvalidToken):
+        second.verify(token)
+
+    # блокировка: статус проверяется даже без смены поколения
+    token = first.issue(user.id)
+    user_repo.get(user.id).status = UserStatus.BLOCKED
+    with pytest.raises(InvalidToken):
+        second.verify(token)
+    with pytest.raises(InvalidToken):
+        first.issue(user.id)
+
+
+# ============================================================
+#                 Compiled permissions
+# ============================================================
+
+def test_wildcard_permissions_and_recompile_on_change():
+    reader = Role(id=1, name="reader", permissions=[Permission(1, "books.read")])
+    manager = Role(id=2, name="manager")
+    user = User(id=1, email="p@x.com", password_hash="h", roles=[reader])
+
+    assert user.has_permission("books.read")
+    assert not user.has_permission("orders.manage")
+
+    user.add_role(manager)
+    manager.add_permission(Permission(2, "orders.*"))
+    assert user.has_permission("orders.manage")
+    assert user.has_permission("orders.items.delete")
+    assert not user.has_permission("ordersx.read")
+
+    manager.remove_permission(Permission(2, "orders.*"))
+    assert not user.has_permission("orders.manage")
+
+    user.add_role(Role(id=3, name="admin", permissions=[Permission(3, "*")]))
+    assert user.has_permission("anything.at.all")
+    user.remove_role(Role(id=3, name="admin"))
+    assert not user.has_permission("anything.at.all")
+
+
+def test_permission_index_is_reused_until_roles_change():
+    role = Role(id=1, name="r", permissions=[Permission(1, "a.b")])
+    user = User(id=1, email="c@x.com", password_hash="h", roles=[role])
+
+    user.has_permission("a.b")
+    compiled = user._compiled
+    user.has_permission("x.y")
+    assert user._compiled is compiled
+
+    role.add_permission(Permission(1, "a.b"))   # дубликат — без пересборки
+    user.has_permission("a.b")
+    assert user._compiled is compiled
+
+    user.add_role(role)                         # та же роль — тоже
+    assert len(user.roles) == 1
@@ -0,0 +1,161 @@
+import threading
+
+import pytest
+
+from Core_Domains.Warehouse.services import WarehouseService
+from Core_Domains.Warehouse.models import Cell, StockItem
+from Core_Domains.Warehouse.value_objects import Quantity
+from Core_Domains.Warehouse.exceptions import WarehouseError
+from Core_Domains.Warehouse.locking import StripedLock
+from Infrastructure.Persistence_Layer.in_memory.warehouse_repo import (
+    InMemoryCellRepository, InMemoryStockRepository,
+    InMemoryStockMovementRepository, InMemoryInventorySessionRepository
+)
+
+
+@pytest.fixture
+def wh():
+    return WarehouseService(
+        InMemoryCellRepository(),
+        InMemoryStockRepository(),
+        InMemoryStockMovementRepository(),
+        InMemoryInventorySessionRepository(),
+    )
+
+
+def _run(workers):
+    threads = [threading.Thread(target=w) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    assert not any(t.is_alive() for t in threads), "deadlock"
+
+
+# ============================================================
+#                       StripedLock
+# ============================================================
+
+def test_striped_lock_rejects_zero_stripes():
+    with pytest.raises(ValueError):
+        StripedLock(0)
+
+
+def test_striped_lock_same_stripe_taken_once():
+    locks = StripedLock(stripes=1)
+    # оба ключа попадают в одну полосу — не должно быть самоблокировки
+    with locks.hold(1, 2):
+        pass
+
+
+# ============================================================
+#                 Concurrent warehouse operations
+# ============================================================
+
+def test_concurrent_inbound_never_exceeds_capacity(wh):
+    wh.cell_repo.save(Cell(id=1, capacity=50))
+    rejected = []
+
+    def worker():
+        for _ in range(20):
+            try:
+                wh.inbound(book_id=7, cell_id=1, qty=1)
+            except WarehouseError:
+                rejected.append(1)
+
+    _run([worker] * 8)
+
+    assert wh.cell_repo.get(1).used == 50
+    assert wh.stock_repo.get(7, 1).quantity.amount == 50
+    assert len(rejected) == 8 * 20 - 50
+
+
+def test_opposite_moves_do_not_deadlock_or_lose_stock(wh):
+    wh.cell_repo.save(Cell(id=1, capacity=1000, used=100))
+    wh.cell_repo.save(Cell(id=2, capacity=1000, used=100))
+    wh.stock_repo.save(StockItem(book_id=3, cell_id=1, quantity=Quantity(100)))
+    wh.stock_repo.save(StockItem(book_id=3, cell_id=2, quantity=Quantity(100)))
+
+    def mover(src, dst):
+        def run():
+            for _ in range(200):
+                try:
+                    wh.move(3, src, dst, 1)
+                except WarehouseError:
+                    pass  # источник временно опустел
+        return run
+
+    forward, backward = mover(1, 2), mover(2, 1)
+
+    _run([forward, backward, forward, backward])
+
+    total = wh.get_total_stock_for_book(3)
+    used = wh.cell_repo.get(1).used + wh.cell_repo.get(2).used
+    assert total == 200
+    assert used == 200
+
+
+# ============================================================
+#          SQLite: unit of work на запрос, как в API
+# ============================================================
+
+@pytest.fixture
+def sqlite_wh(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from Infrastructure.Persistence_Layer.sqlite.db import Base
+    import Infrastructure.Persistence_Layer.sqlite.warehouse_repo as wr
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'wh.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(wr, "SessionLocal", session_factory)
+    wh = WarehouseService(
+        wr.SQLiteCellRepository(), wr.SQLiteStockRepository(),
+        wr.SQLiteStockMovementRepository(), wr.SQLiteInventorySessionRepository(),
+    )
+    return wh, session_factory
+
+
+def _requests(session_factory, op, times):
+    from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteUnitOfWork
+
+    def run():
+        for _ in range(times):
+            # сессия живёт весь «запрос», полосы сервиса — только операцию
+            with SQLiteUnitOfWork(session_factory):
+                try:
+                    op()
+                except WarehouseError:
+                    pass
+    return run
+
+
+def test_sqlite_concurrent_inbound_under_request_uow_loses_no_updates(sqlite_wh):
+    wh, session_factory = sqlite_wh
+    wh.cell_repo.save(Cell(id=1, capacity=1000))
+
+    _run([_requests(session_factory, lambda: wh.inbound(7, 1, 1), 25)] * 8)
+
+    assert wh.stock_repo.get(7, 1).quantity.amount == 200
+    assert wh.cell_repo.get(1).used == 200
+    assert len(wh.movement_repo.list_for_book(7)) == 200
+
+
+def test_sqlite_opposite_moves_under_request_uow_keep_totals(sqlite_wh):
+    wh, session_factory = sqlite_wh
+    wh.cell_repo.save(Cell(id=1, capacity=1000, used=50))
+    wh.cell_repo.save(Cell(id=2, capacity=1000, used=50))
+    wh.stock_repo.save(StockItem(book_id=3, cell_id=1, quantity=Quantity(50)))
+    wh.stock_repo.save(StockItem(book_id=3, cell_id=2, quantity=Quantity(50)))
+
+    forward = _requests(session_factory, lambda: wh.move(3, 1, 2, 1), 30)
+    backward = _requests(session_factory, lambda: wh.move(3, 2, 1, 1), 30)
+    _run([forward, backward, forward, backward])
+
+    assert wh.get_total_stock_for_book(3) == 100
+    assert wh.cell_repo.get(1).used + wh.cell_repo.get(2).used == 100
+    assert wh.cell_repo.get(1).used == wh.stock_repo.get(3, 1).quantity.amount
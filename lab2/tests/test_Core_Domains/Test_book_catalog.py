@@ -182,3 +182,96 @@ def test_remove_book(service, repo, sample_book):
 def test_remove_nonexistent_book(service):
     with pytest.raises(BookNotFound):
         service.remove_book(42)
+
+
+def test_search_uses_index_when_configured():
+    from Infrastructure.Persistence_Layer.in_memory.book_repo import InMemoryBookRepository
+    from Infrastructure.Persistence_Layer.search.in_memory_index import InMemoryBookSearchIndex
+    from Infrastructure.Persistence_Layer.search.indexed_book_repo import IndexedBookRepository
+
+    index = InMemoryBookSearchIndex()
+    repo = IndexedBookRepository(InMemoryBookRepository(), index)
+    svc = BookCatalogService(repo, search_index=index)
+
+    for i, title in enumerate(["Python Tricks", "Fluent Python", "Python"], start=1):
+        svc.add_book(Book(id=i, title=title, authors=[], genre=None,
+                          publisher=None, edition=None, price=Price(10)))
+
+    assert [b.title for b in svc.search(title="python")] == ["Python", "Python Tricks", "Fluent Python"]
+    assert [b.id for b in svc.search(title="python", offset=1, limit=1)] == [1]
+
+
+def test_import_books_in_chunks_with_progress(service, repo):
+    rows = [
+        {"id": "1", "title": "Refactoring", "price": "45.5", "authors": "Martin Fowler; Kent Beck",
+         "genre": "Programming", "isbn": "9780201485677", "publish_date": "1999-07-08", "pages": "431"},
+        {"id": 2, "title": "DDD", "price": 60, "authors": ["Eric Evans"], "status": "reserved"},
+        {"id": "x", "title": "Bad id", "price": "1"},
+        {"id": "3", "title": "  ", "price": "1"},
+        {"id": "4", "title": "Bad price", "price": "-1"},
+        {"__error__": "invalid JSON"},
+        {"id": "5", "title": "Cheap", "price": "0", "currency": "eur"},
+    ]
+    seen = []
+    clock = iter(range(100)).__next__
+    progress = service.import_books(
+        iter(rows), chunk_size=3, on_progress=lambda p: seen.append(p.rows), clock=clock
+    )
+
+    assert (progress.rows, progress.imported, progress.rejected, progress.chunks) == (7, 3, 4, 3)
+    assert seen == [3, 6, 7]
+    assert [line for line, _ in progress.errors] == [3, 4, 5, 6]
+    assert progress.rows_per_second == pytest.approx(7 / 3)
+
+    refactoring = repo.get(1)
+    assert [a.name for a in refactoring.authors] == ["Martin Fowler", "Kent Beck"]
+    assert refactoring.edition.publish_date == date(1999, 7, 8)
+    assert repo.get(2).status == BookStatus.RESERVED
+    assert repo.get(5).price == Price(0.0, "EUR")
+
+
+def test_import_books_upserts_existing(service, repo, sample_book):
+    repo.save(sample_book)
+    service.import_books([{"id": 1, "title": "Clean Code, 2nd ed.", "price": 50}])
+
+    assert repo.get(1).title == "Clean Code, 2nd ed."
+    assert repo.get(1).price.amount == 50
+
+
+def test_facets_follow_status_changes_and_removal(sample_book):
+    from Infrastructure.Persistence_Layer.in_memory.book_repo import InMemoryBookRepository
+    from Infrastructure.Persistence_Layer.search.faceted_book_repo import FacetCountingBookRepository
+    from Infrastructure.Persistence_Layer.search.in_memory_facets import InMemoryBookFacetCounter
+
+    counter = InMemoryBookFacetCounter()
+    svc = BookCatalogService(FacetCountingBookRepository(InMemoryBookRepository(), counter),
+                             facets=counter)
+    svc.add_book(sample_book)
+    svc.add_book(Book(id=2, title="Clean Coder",
+                      authors=[Author(1, "Robert C. Martin"), Author(1, "Robert C. Martin")],
+                      genre=Genre(1, "Programming"), publisher=None, edition=None, price=Price(30)))
+    svc.add_book(Book(id=3, title="Dune", authors=[Author(2, "Frank Herbert")],
+                      genre=Genre(2, "Sci-Fi"), publisher=None, edition=None, price=Price(10)))
+
+    facets = svc.facets()
+    assert facets.total == 3
+    assert facets.genres == {"Programming": 2, "Sci-Fi": 1}
+    assert facets.authors == {"Robert C. Martin": 2, "Frank Herbert": 1}
+    assert facets.statuses == {"available": 3}
+
+    svc.reserve_book(1)
+    svc.discontinue_book(3)
+    assert svc.facets().statuses == {"available": 1, "discontinued": 1, "reserved": 1}
+    svc.release_reservation(1)
+    assert svc.facets().statuses == {"available": 2, "discontinued": 1}
+
+    svc.remove_book(3)
+    facets = svc.facets(top=1)
+    assert facets.total == 2
+    assert facets.genres == {"Programming": 2}
+    assert facets.statuses == {"available": 2}
+
+    # без счётчиков — тот же результат полным пересчётом
+    assert BookCatalogService(svc.repo).facets(top=1) == facets
+    with pytest.raises(InvalidSearchFilter):
+        svc.facets(top=0)
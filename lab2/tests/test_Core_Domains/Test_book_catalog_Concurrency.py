@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from Core_Domains.book_catalog.services import BookCatalogService
+from Core_Domains.book_catalog.models import Book
+from Core_Domains.book_catalog.value_objects import Price, BookStatus
+from Core_Domains.book_catalog.exceptions import BookVersionConflict, InvalidSearchFilter
+from Infrastructure.Persistence_Layer.in_memory.book_repo import InMemoryBookRepository
+
+
+class SlowReadBookRepository(InMemoryBookRepository):
+    """get с задержкой — расширяет окно между чтением и записью."""
+
+    def get(self, book_id: int):
+        book = super().get(book_id)
+        time.sleep(0.0005)
+        return book
+
+
+def _book(book_id, price=10):
+    return Book(id=book_id, title=f"Book {book_id}", authors=[], genre=None,
+                publisher=None, edition=None, price=Price(price))
+
+
+def _run(workers):
+    threads = [threading.Thread(target=w) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    assert not any(t.is_alive() for t in threads), "deadlock"
+
+
+@pytest.fixture
+def svc():
+    repo = SlowReadBookRepository()
+    for book_id in range(1, 4):
+        repo.save(_book(book_id))
+    return BookCatalogService(repo)
+
+
+def test_stale_version_is_rejected_and_not_written():
+    repo = InMemoryBookRepository()
+    repo.save(_book(1))
+    first, second = repo.get(1), repo.get(1)
+    assert first.version == second.version == 1
+
+    first.update_status(BookStatus.RESERVED)
+    repo.save(first)
+    assert first.version == 2
+
+    second.update_price(Price(99))
+    with pytest.raises(BookVersionConflict):
+        repo.save(second)
+    stored = repo.get(1)
+    assert (stored.status, stored.price, stored.version) == (BookStatus.RESERVED, Price(10), 2)
+
+
+def test_concurrent_reservations_have_exactly_one_winner(svc):
+    won, lost = [], []
+
+    def worker():
+        try:
+            svc.reserve_book(1)
+            won.append(1)
+        except InvalidSearchFilter:
+            lost.append(1)
+
+    _run([worker] * 8)
+
+    assert len(won) == 1
+    assert len(lost) == 7
+    assert svc.get_book(1).status == BookStatus.RESERVED
+
+
+def test_reserve_release_cycles_on_different_books_lose_no_updates(svc):
+    def cycle(book_id):
+        def run():
+            for _ in range(20):
+                svc.reserve_book(book_id)
+                svc.release_reservation(book_id)
+        return run
+
+    # по книге — свой поток: общей блокировки нет, конфликтов между ними тоже
+    _run([cycle(1), cycle(2), cycle(3)])
+
+    # каждый успешный save двигает версию на 1: создание + 20 резервов + 20 снятий
+    assert [svc.get_book(i).version for i in (1, 2, 3)] == [41, 41, 41]
+    assert all(svc.get_book(i).status == BookStatus.AVAILABLE for i in (1, 2, 3))
+
+
+def test_concurrent_price_updates_retry_instead_of_failing(svc):
+    # 4 потока на одну книгу с замедленным get — запас попыток, чтобы тест не мигал
+    svc.MAX_CONFLICT_RETRIES = 50
+
+    def repricer(amount):
+        def run():
+            for _ in range(5):
+                svc.update_price(1, Price(amount))
+        return run
+
+    _run([repricer(a) for a in (11, 12, 13, 14)])
+
+    book = svc.get_book(1)
+    assert book.version == 1 + 4 * 5
+    assert book.price.amount in (11, 12, 13, 14)
+
+
+def test_conflict_retries_are_bounded_and_never_sleep(monkeypatch):
+    class AlwaysStaleRepository(InMemoryBookRepository):
+        def save(self, book):
+            if book.version:
+                raise BookVersionConflict(book.id, book.version)
+            super().save(book)
+
+    repo = AlwaysStaleRepository()
+    repo.save(_book(1))
+    # сервис может выполняться на event loop — пауза заморозила бы все запросы
+    monkeypatch.setattr(time, "sleep", lambda s: pytest.fail("retry must not sleep"))
+    with pytest.raises(BookVersionConflict):
+        BookCatalogService(repo).reserve_book(1)
+    assert repo.get(1).status == BookStatus.AVAILABLE
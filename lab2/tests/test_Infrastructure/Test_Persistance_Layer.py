@@ -134,6 +134,31 @@ def test_order_repo_find_open_cart():
     assert cart.id == 2 or cart.id == 3
 
 
+def test_order_repo_open_cart_follows_status_transitions():
+    repo = InMemoryOrderRepository()
+    cart = Order(id=1, customer_id=7)
+    repo.save(cart)
+    repo.save(Order(id=2, customer_id=8))
+
+    assert repo.find_open_cart(7) is cart
+    assert [o.id for o in repo.list_by_customer(7)] == [1]
+
+    cart.set_status(OrderStatus.PAID)
+    repo.save(cart)
+    assert repo.find_open_cart(7) is None
+
+    nxt = Order(id=3, customer_id=7)
+    repo.save(nxt)
+    assert repo.find_open_cart(7) is nxt
+
+    # статус сменили без save — указатель не должен вернуть закрытый заказ
+    nxt.status = OrderStatus.CANCELLED
+    assert repo.find_open_cart(7) is None
+
+    repo.delete(3)
+    assert [o.id for o in repo.list_by_customer(7)] == [1]
+
+
 
 # ============================================================
 #                   PAYMENTS REPOSITORY TESTS
@@ -186,6 +211,47 @@ def test_transaction_repo_list_by_account():
     assert len(res) == 2
 
 
+def _history(repo):
+    from datetime import datetime, timedelta
+    t0 = datetime(2024, 1, 1)
+    # id 5 и 6 — в одну и ту же секунду; 7 — перевод самому себе; 8 — чужой
+    for trx_id, src, dst, minute in [(3, 1, 2, 3), (1, 1, 2, 0), (2, 4, 1, 1),
+                                     (5, 1, 9, 5), (6, 9, 1, 5), (7, 1, 1, 7), (8, 2, 3, 8)]:
+        repo.save(Transaction(id=trx_id, from_account=src, to_account=dst, amount=Money(trx_id),
+                              type=TransactionType.TRANSFER, status=TransactionStatus.SUCCESS,
+                              created_at=t0 + timedelta(minutes=minute)))
+    return t0
+
+
+def _pages(repo, account_id, limit, **kw):
+    from Core_Domains.Payments.models import encode_cursor
+    pages, cursor = [], None
+    while True:
+        page = repo.list_by_account(account_id, limit=limit, cursor=cursor, **kw)
+        if not page:
+            return pages
+        pages.append([t.id for t in page])
+        cursor = encode_cursor(page[-1])
+
+
+def test_transaction_repo_paginates_by_posting_list():
+    from datetime import timedelta
+    repo = InMemoryTransactionRepository()
+    t0 = _history(repo)
+
+    assert [t.id for t in repo.list_by_account(1)] == [1, 2, 3, 5, 6, 7]
+    assert _pages(repo, 1, limit=4) == [[1, 2, 3, 5], [6, 7]]
+    assert _pages(repo, 1, limit=2, since=t0 + timedelta(minutes=2)) == [[3, 5], [6, 7]]
+    assert repo.list_by_account(42) == []
+
+    # пересохранение со сменой счёта переносит запись между posting lists
+    moved = repo.get(3)
+    moved.from_account = 4
+    repo.save(moved)
+    assert [t.id for t in repo.list_by_account(1)] == [1, 2, 5, 6, 7]
+    assert [t.id for t in repo.list_by_account(4)] == [2, 3]
+
+
 
 # ============================================================
 #                   USER REPOSITORY TESTS
@@ -320,6 +386,88 @@ def test_sqlite_book_repo_delete(sqlite_session, monkeypatch):
         repo.get(1)
 
 
+def test_sqlite_book_repo_save_many_upserts_in_one_statement(sqlite_session, monkeypatch):
+    from sqlalchemy import event
+    from Infrastructure.Persistence_Layer.sqlite.book_repo import SQLiteBookRepository
+    from Core_Domains.book_catalog.models import Book
+    from Core_Domains.book_catalog.value_objects import Price
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.book_repo.SessionLocal", sqlite_session)
+    repo = SQLiteBookRepository()
+    repo.save(Book(id=1, title="Old", authors=[], genre=None,
+                   publisher=None, edition=None, price=Price(1)))
+    assert repo.get(1).title == "Old"      # BookRecord теперь в identity map
+
+    statements = []
+    event.listen(repo.db.bind, "before_cursor_execute",
+                 lambda conn, cur, stmt, params, ctx, many: statements.append(many))
+
+    repo.save_many([
+        Book(id=i, title=f"Book {i}", authors=[], genre=None,
+             publisher=None, edition=None, price=Price(i)) for i in range(1, 501)
+    ])
+
+    assert statements == [True]             # один executemany на 500 строк
+    assert repo.get(1).title == "Book 1"
+    assert len(repo.list()) == 500
+
+
+def test_sqlite_book_repo_save_is_compare_and_set(sqlite_session, monkeypatch):
+    from Infrastructure.Persistence_Layer.sqlite.book_repo import SQLiteBookRepository
+    from Core_Domains.book_catalog.models import Book
+    from Core_Domains.book_catalog.value_objects import Price, BookStatus
+    from Core_Domains.book_catalog.exceptions import BookVersionConflict
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.book_repo.SessionLocal", sqlite_session)
+    repo = SQLiteBookRepository()
+    book = Book(id=1, title="CAS", authors=[], genre=None,
+                publisher=None, edition=None, price=Price(10))
+    repo.save(book)
+    assert book.version == 1
+
+    first, second = repo.get(1), repo.get(1)
+    first.update_status(BookStatus.RESERVED)
+    repo.save(first)
+    assert first.version == 2
+
+    second.update_price(Price(99))
+    with pytest.raises(BookVersionConflict):
+        repo.save(second)
+
+    stored = repo.get(1)
+    assert (stored.status, stored.price.amount, stored.version) == (BookStatus.RESERVED, 10, 2)
+
+    # импорт пишет без сверки, но версию двигает — прочитанная до него устаревает
+    repo.save_many([Book(id=1, title="Feed", authors=[], genre=None,
+                         publisher=None, edition=None, price=Price(5))])
+    with pytest.raises(BookVersionConflict):
+        repo.save(stored)
+    assert repo.get(1).version == 3
+
+
+def test_sqlite_book_repo_upgrades_old_books_table(tmp_path, monkeypatch):
+    import sqlite3
+    from Infrastructure.Persistence_Layer.sqlite.book_repo import SQLiteBookRepository
+    from Core_Domains.book_catalog.value_objects import BookStatus
+
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE books (id INTEGER NOT NULL, title VARCHAR, price FLOAT, PRIMARY KEY (id))")
+        conn.execute("INSERT INTO books VALUES (1, 'Legacy', 7.5)")
+
+    engine = create_engine(f"sqlite:///{path}")
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.book_repo.SessionLocal",
+                        sessionmaker(bind=engine))
+    repo = SQLiteBookRepository()
+
+    book = repo.get(1)
+    assert (book.title, book.status, book.version) == ("Legacy", BookStatus.AVAILABLE, 1)
+    book.update_status(BookStatus.RESERVED)
+    repo.save(book)
+    assert repo.get(1).status == BookStatus.RESERVED
+    engine.dispose()
+
+
 # ============================================================
 #                   ORDER REPO (SQLite)
 # ============================================================
@@ -346,6 +494,62 @@ def test_sqlite_order_repo(sqlite_session, monkeypatch):
         repo.get(1)
 
 
+def test_sqlite_order_repo_open_cart_uses_index(sqlite_session, monkeypatch):
+    from sqlalchemy import text
+    from Infrastructure.Persistence_Layer.sqlite.order_repo import SQLiteOrderRepository
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.order_repo.SessionLocal", sqlite_session)
+    repo = SQLiteOrderRepository()
+
+    repo.save(Order(id=1, customer_id=5, status=OrderStatus.PAID))
+    repo.save(Order(id=2, customer_id=5, status=OrderStatus.PENDING))
+    repo.save(Order(id=3, customer_id=5))
+    assert repo.find_open_cart(5).id == 2
+    assert repo.get(2).status == OrderStatus.PENDING
+
+    repo.save(Order(id=2, customer_id=5, status=OrderStatus.PAID))
+    assert repo.find_open_cart(5).id == 3
+    assert repo.find_open_cart(6) is None
+
+    plan = repo.db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM orders WHERE customer_id = 5 AND status IN ('created', 'pending')"
+    )).fetchall()
+    assert "ix_orders_customer_status" in " ".join(str(row) for row in plan)
+
+
+def _legacy_db(tmp_path, *statements):
+    """Файл SQLite со схемой и данными из версии до миграций → session factory."""
+    import sqlite3
+
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        for stmt in statements:
+            conn.execute(stmt)
+    return sessionmaker(bind=create_engine(f"sqlite:///{path}"))
+
+
+def test_sqlite_order_repo_upgrades_old_orders_table(tmp_path, monkeypatch):
+    from sqlalchemy import inspect
+    from Infrastructure.Persistence_Layer.sqlite.order_repo import SQLiteOrderRepository
+
+    session = _legacy_db(
+        tmp_path,
+        "CREATE TABLE orders (id INTEGER NOT NULL, customer_id INTEGER, PRIMARY KEY (id))",
+        "INSERT INTO orders VALUES (1, 5), (2, 5)",
+    )
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.order_repo.SessionLocal", session)
+    repo = SQLiteOrderRepository()
+
+    assert [o.status for o in repo.list_by_customer(5)] == [OrderStatus.CREATED] * 2
+    assert repo.find_open_cart(5).id == 1
+    repo.save(Order(id=1, customer_id=5, status=OrderStatus.PAID))
+    assert repo.find_open_cart(5).id == 2
+
+    indexes = {i["name"] for i in inspect(repo.db.bind).get_indexes("orders")}
+    assert "ix_orders_customer_status" in indexes
+    SQLiteOrderRepository()   # повторный запуск ничего не меняет
+
+
 # ============================================================
 #                   PAYMENTS REPO (SQLite)
 # ============================================================
@@ -392,6 +596,206 @@ def test_sqlite_transaction_repo(sqlite_session, monkeypatch):
     assert loaded.status == TransactionStatus.SUCCESS
 
 
+def test_sqlite_transaction_repo_paginates_with_indexes(sqlite_session, monkeypatch):
+    from datetime import timedelta
+    from sqlalchemy import text
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import SQLiteTransactionRepository
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.payments_repo.SessionLocal", sqlite_session)
+    repo = SQLiteTransactionRepository()
+    t0 = _history(repo)
+
+    assert repo.get(5).created_at == t0 + timedelta(minutes=5)
+    assert [t.id for t in repo.list_by_account(1)] == [1, 2, 3, 5, 6, 7]
+    assert _pages(repo, 1, limit=4) == [[1, 2, 3, 5], [6, 7]]
+    assert _pages(repo, 1, limit=2, since=t0 + timedelta(minutes=2)) == [[3, 5], [6, 7]]
+
+    for column, index in (("from_account", "ix_transactions_from_created"),
+                          ("to_account", "ix_transactions_to_created")):
+        plan = repo.db.execute(text(
+            f"EXPLAIN QUERY PLAN SELECT id FROM transactions WHERE {column} = 1 "
+            "AND (created_at, id) > ('2024-01-01', 0) ORDER BY created_at, id LIMIT 10"
+        )).fetchall()
+        plan = " ".join(str(row) for row in plan)
+        assert index in plan and "TEMP B-TREE" not in plan
+
+
+def test_sqlite_transaction_repo_stores_minor_units(sqlite_session, monkeypatch):
+    from decimal import Decimal
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import SQLiteTransactionRepository
+    from Core_Domains.Payments.models import Transaction
+    from Core_Domains.Payments.value_objects import Money, TransactionType, TransactionStatus
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.payments_repo.SessionLocal", sqlite_session)
+
+    repo = SQLiteTransactionRepository()
+    amounts = [Money("0.10"), Money("0.20"), Money(5, "EUR"), Money(99)]
+    for i, amount in enumerate(amounts, start=1):
+        repo.save(Transaction(
+            id=i, from_account=10, to_account=20, amount=amount,
+            type=TransactionType.TRANSFER,
+            status=TransactionStatus.FAILED if i == 4 else TransactionStatus.SUCCESS,
+        ))
+
+    assert repo.get(1).amount.amount == Decimal("0.10")
+    assert repo.get(3).amount.currency == "EUR"
+    assert repo.turnover_by_currency(20) == {"USD": Money("0.30"), "EUR": Money(5, "EUR")}
+
+
+def test_sqlite_payments_repos_upgrade_float_money_columns(tmp_path, monkeypatch):
+    from datetime import datetime
+    from sqlalchemy import inspect
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import (
+        SQLiteAccountRepository, SQLiteTransactionRepository
+    )
+
+    session = _legacy_db(
+        tmp_path,
+        "CREATE TABLE accounts (id INTEGER NOT NULL, owner_id INTEGER, balance FLOAT, PRIMARY KEY (id))",
+        "CREATE TABLE transactions (id INTEGER NOT NULL, from_account INTEGER, to_account INTEGER,"
+        " amount FLOAT, type VARCHAR, status VARCHAR, PRIMARY KEY (id))",
+        "INSERT INTO accounts VALUES (1, 10, 100.1), (2, 20, 0.29)",
+        "INSERT INTO transactions VALUES (7, 1, 2, 0.29, 'transfer', 'success')",
+    )
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.payments_repo.SessionLocal", session)
+    accounts, transactions = SQLiteAccountRepository(), SQLiteTransactionRepository()
+
+    assert accounts.get(1).balance == Money("100.10")
+    assert accounts.get(2).balance.minor == 29          # 0.29 * 100 = 28.999… без round
+    trx = transactions.get(7)
+    assert trx.amount == Money("0.29")
+    assert trx.created_at == datetime(1970, 1, 1)
+    assert [t.id for t in transactions.list_by_account(2)] == [7]
+
+    columns = {t: {c["name"] for c in inspect(accounts.db.bind).get_columns(t)}
+               for t in ("accounts", "transactions")}
+    assert "balance" not in columns["accounts"] and "amount" not in columns["transactions"]
+
+    accounts.save(Account(id=3, owner_id=30, balance=Money(5)))
+    assert accounts.get(3).balance == Money(5)
+
+
+def test_sqlite_accounts_from_before_checkpoints_get_opening_checkpoint(tmp_path, monkeypatch):
+    from datetime import datetime, timedelta
+    from sqlalchemy import text
+    from Core_Domains.Payments.services import PaymentService
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import (
+        SQLiteAccountRepository, SQLiteTransactionRepository
+    )
+
+    session = _legacy_db(
+        tmp_path,
+        "CREATE TABLE accounts (id INTEGER NOT NULL, owner_id INTEGER, balance FLOAT, PRIMARY KEY (id))",
+        "INSERT INTO accounts VALUES (1, 10, 100.0), (2, 20, 5.0)",
+    )
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.payments_repo.SessionLocal", session)
+    accounts = SQLiteAccountRepository()
+    svc = PaymentService(accounts, SQLiteTransactionRepository(), gateway=None)
+
+    later = datetime.utcnow() + timedelta(seconds=5)
+    assert svc.balance_at(1, later) == Money(100)
+    assert svc.balance_at(2, later) == Money(5)
+
+    # точка уже есть — сохранение старого счёта не пишет вторую «открывающую»
+    accounts.save(accounts.get(1))
+    count = accounts.db.execute(
+        text("SELECT COUNT(*) FROM balance_checkpoints WHERE account_id = 1")
+    ).scalar()
+    assert count == 1
+
+
+def test_sqlite_account_without_checkpoint_is_opened_on_next_save(sqlite_session, monkeypatch):
+    from datetime import datetime, timedelta
+    from sqlalchemy import text
+    from Core_Domains.Payments.models import Account
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import SQLiteAccountRepository
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.payments_repo.SessionLocal", sqlite_session)
+    accounts = SQLiteAccountRepository()
+    db = sqlite_session()
+    # строка счёта есть, контрольной точки нет (её потеряли / вставили мимо репозитория)
+    db.execute(text("INSERT INTO accounts (id, owner_id, balance_minor, currency, "
+                    "postings_since_checkpoint) VALUES (1, 1, 700, 'USD', 0)"))
+    db.commit()
+
+    accounts.save(accounts.get(1))
+    cp = accounts.latest_checkpoint(1, datetime.utcnow() + timedelta(seconds=5))
+    assert cp is not None and cp.balance == Money(7)
+
+
+def test_sqlite_transfer_batch_commits_atomically(sqlite_session, monkeypatch):
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import (
+        SQLiteAccountRepository, SQLiteTransactionRepository
+    )
+    from Core_Domains.Payments.models import Account, TransferRequest
+    from Core_Domains.Payments.services import PaymentService
+    from Core_Domains.Payments.value_objects import Money
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.payments_repo.SessionLocal", sqlite_session)
+
+    class OkGateway:
+        refunded = []
+        def authorize(self, amount): return True
+        def capture(self, amount): return True
+        def refund(self, amount):
+            self.refunded.append(amount)
+            return True
+
+    accounts, transactions = SQLiteAccountRepository(), SQLiteTransactionRepository()
+    accounts.save_many([Account(id=i, owner_id=i, balance=Money(100)) for i in (1, 2)])
+    svc = PaymentService(accounts, transactions, OkGateway())
+
+    result = svc.transfer_batch([TransferRequest(1, 2, Money("12.5")), TransferRequest(2, 1, Money(2))])
+    assert not result.failures
+    assert accounts.get_many([1, 2, 3]) == {
+        1: Account(id=1, owner_id=1, balance=Money("89.5")),
+        2: Account(id=2, owner_id=2, balance=Money("110.5")),
+    }
+    assert len(transactions.list_by_account(1)) == 2
+
+    # сбой записи транзакций откатывает и балансы
+    def broken(_):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(transactions, "save_many", broken)
+    with pytest.raises(RuntimeError):
+        svc.transfer_batch([TransferRequest(1, 2, Money(1))])
+    assert accounts.get(1).balance == Money("89.5")
+    assert svc.gateway.refunded == [Money(1)]    # проведённое шлюзом возвращено
+
+
+def test_sqlite_balance_checkpoints(sqlite_session, monkeypatch):
+    from tests.test_Core_Domains.Test_Payments import FakeGateway, _history_with_snapshots
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import (
+        SQLiteAccountRepository, SQLiteTransactionRepository
+    )
+    from Core_Domains.Payments.services import PaymentService
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.payments_repo.SessionLocal", sqlite_session)
+    accounts, transactions = SQLiteAccountRepository(checkpoint_every=3), SQLiteTransactionRepository()
+    service = PaymentService(accounts, transactions, FakeGateway())
+    snapshots = _history_with_snapshots(service, accounts)
+
+    replayed = []
+    original = transactions.list_by_account
+
+    def counting(*args, **kwargs):
+        page = original(*args, **kwargs)
+        replayed.extend(page)
+        return page
+
+    monkeypatch.setattr(transactions, "list_by_account", counting)
+
+    for at, balance in snapshots:
+        replayed.clear()
+        assert service.balance_at(1, at) == balance
+        # после точки проигрываются не больше checkpoint_every проводок
+        assert len([t for t in replayed if t.created_at <= at]) <= 3
+
+    assert accounts.get(1).postings_since_checkpoint == 8 % 3
+    assert accounts.latest_checkpoint(1, snapshots[0][0]).trx_id == 0
+
+
 # ============================================================
 #                   USER REPO (SQLite)
 # ============================================================
@@ -415,6 +819,490 @@ def test_sqlite_user_repo(sqlite_session, monkeypatch):
     assert repo.get(1).email == "updated@mail.com"
 
 
+def test_sqlite_user_repo_keeps_status_and_token_generation(tmp_path, monkeypatch):
+    from Infrastructure.Persistence_Layer.sqlite.user_repo import SQLiteUserRepository
+    from Core_Domains.User_Security.models import User
+    from Core_Domains.User_Security.value_objects import UserStatus
+
+    session = _legacy_db(
+        tmp_path,
+        "CREATE TABLE users (id INTEGER NOT NULL, email VARCHAR, password_hash VARCHAR,"
+        " PRIMARY KEY (id), UNIQUE (email))",
+        "INSERT INTO users VALUES (1, 'old@x.com', 'h')",
+    )
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.user_repo.SessionLocal", session)
+    repo = SQLiteUserRepository()
+
+    user = repo.get(1)
+    assert (user.status, user.token_generation) == (UserStatus.ACTIVE, 0)
+    user.status, user.token_generation = UserStatus.BLOCKED, 3
+    repo.save(user)
+
+    restarted = SQLiteUserRepository()
+    restarted.db.expire_all()
+    loaded = restarted.get_by_email("old@x.com")
+    assert (loaded.status, loaded.token_generation) == (UserStatus.BLOCKED, 3)
+
+
+def test_block_user_evicts_tokens_again_after_unit_of_work(tmp_path, monkeypatch):
+    import threading
+    from Infrastructure.Persistence_Layer.sqlite.user_repo import SQLiteUserRepository
+    from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteUnitOfWork
+    from Core_Domains.User_Security.exceptions import InvalidToken
+    from Core_Domains.User_Security.models import User
+    from Core_Domains.User_Security.services import UserService
+    from Core_Domains.User_Security.token_service import TokenService
+
+    session = sessionmaker(bind=create_engine(
+        f"sqlite:///{tmp_path / 'users.db'}", connect_args={"check_same_thread": False}
+    ))
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.user_repo.SessionLocal", session)
+    repo = SQLiteUserRepository()
+    now = [1000.0]
+    tokens = TokenService("k", users=repo, recheck_seconds=30, clock=lambda: now[0])
+    svc = UserService(repo, InMemoryRoleRepository(), tokens=tokens)
+    repo.save(User(id=1, email="a@x.com", password_hash="h"))
+    token = tokens.issue(1)
+    tokens.verify(token)
+
+    now[0] += 31  # запись в кеше пора перепроверить
+    with SQLiteUnitOfWork(session):
+        svc.block_user(1)
+        # параллельный запрос перепроверяет своей сессией — видит ещё старое поколение
+        t = threading.Thread(target=tokens.verify, args=(token,))
+        t.start()
+        t.join()
+        assert tokens.cached_count() == 1
+
+    with pytest.raises(InvalidToken):
+        tokens.verify(token)
+
 
 
 
+
+
+
+# ============================================================
+#                   ID BLOCKS (SQLite)
+# ============================================================
+
+def test_sqlite_id_block_source_survives_restart(sqlite_session, monkeypatch):
+    from Infrastructure.Persistence_Layer.sqlite.id_block_repo import SQLiteIdBlockSource
+    from Core_Domains.Shared.id_allocator import HiLoIdAllocator
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.id_block_repo.SessionLocal", sqlite_session)
+
+    first = HiLoIdAllocator(SQLiteIdBlockSource(), "orders", block_size=10)
+    assert [first.next_id() for _ in range(3)] == [1, 2, 3]
+
+    # "перезапуск": новый аллокатор получает следующий блок, а не повтор
+    second = HiLoIdAllocator(SQLiteIdBlockSource(), "orders", block_size=10)
+    assert second.next_id() == 11
+
+
+def test_sqlite_id_block_source_starts_after_existing_rows(sqlite_session, monkeypatch):
+    from sqlalchemy import text
+    from Infrastructure.Persistence_Layer.sqlite.id_block_repo import SQLiteIdBlockSource
+    from Infrastructure.Persistence_Layer.sqlite.order_repo import SQLiteOrderRepository
+    from Core_Domains.Shared.id_allocator import HiLoIdAllocator
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.id_block_repo.SessionLocal", sqlite_session)
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.order_repo.SessionLocal", sqlite_session)
+    SQLiteOrderRepository()  # таблица orders
+    db = sqlite_session()
+    db.execute(text("INSERT INTO orders (id, customer_id, status) VALUES (1, 1, 'created'), (42, 2, 'created')"))
+    db.commit()
+
+    # заказы из БД до появления аллокатора: новая последовательность идёт после них
+    source = SQLiteIdBlockSource(data_bind=db.bind)
+    assert HiLoIdAllocator(source, "orders", block_size=10).next_id() == 43
+    # пустая таблица и последовательность без таблицы начинаются со start
+    assert HiLoIdAllocator(source, "users", block_size=10).next_id() == 1
+    assert HiLoIdAllocator(source, "misc", block_size=10).next_id() == 1
+
+
+def test_sqlite_id_block_source_tolerates_concurrent_first_reserve(sqlite_session, monkeypatch):
+    from Infrastructure.Persistence_Layer.sqlite.id_block_repo import SQLiteIdBlockSource
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.id_block_repo.SessionLocal", sqlite_session)
+    other = SQLiteIdBlockSource()
+
+    class RacingSource(SQLiteIdBlockSource):
+        def _first_free(self, sequence):
+            # «другой процесс» заводит ту же последовательность между UPDATE и INSERT
+            other.reserve(sequence, 10)
+            return super()._first_free(sequence)
+
+    assert RacingSource().reserve("misc", 10) == 11
+    assert other.reserve("misc", 10) == 21
+
+
+def test_id_blocks_url_follows_database_url():
+    from Infrastructure.Persistence_Layer.sqlite.db import sibling_sqlite_url
+
+    assert sibling_sqlite_url("sqlite:////data/app/warehouse.db", "id_blocks.db") == "sqlite:////data/app/id_blocks.db"
+    assert sibling_sqlite_url("sqlite:///./warehouse.db", "id_blocks.db") == "sqlite:///./id_blocks.db"
+    assert sibling_sqlite_url("sqlite://", "id_blocks.db") == "sqlite://"
+
+
+# ============================================================
+#                   WAREHOUSE REPOS (SQLite)
+# ============================================================
+
+@pytest.fixture
+def sqlite_warehouse(sqlite_session, monkeypatch):
+    import Infrastructure.Persistence_Layer.sqlite.warehouse_repo as wr
+    from Core_Domains.Warehouse.services import WarehouseService
+
+    monkeypatch.setattr(wr, "SessionLocal", sqlite_session)
+
+    return WarehouseService(
+        wr.SQLiteCellRepository(),
+        wr.SQLiteStockRepository(),
+        wr.SQLiteStockMovementRepository(),
+        wr.SQLiteInventorySessionRepository(),
+    )
+
+
+def test_sqlite_stock_repo_composite_key(sqlite_warehouse):
+    from Core_Domains.Warehouse.models import StockItem
+    from Core_Domains.Warehouse.value_objects import Quantity
+
+    repo = sqlite_warehouse.stock_repo
+    repo.save_many([
+        StockItem(book_id=1, cell_id=10, quantity=Quantity(3)),
+        StockItem(book_id=1, cell_id=11, quantity=Quantity(4)),
+        StockItem(book_id=2, cell_id=10, quantity=Quantity(5)),
+    ])
+    # повторный save — upsert, а не дубль
+    repo.save(StockItem(book_id=1, cell_id=10, quantity=Quantity(9)))
+
+    assert repo.get(1, 10).quantity.amount == 9
+    assert len(repo.list_by_book(1)) == 2
+    assert len(repo.list_by_cell(10)) == 2
+    assert len(repo.list_all()) == 3
+
+    repo.delete(1, 10)
+    with pytest.raises(KeyError):
+        repo.get(1, 10)
+
+
+def test_sqlite_warehouse_service_flow(sqlite_warehouse):
+    from Core_Domains.Warehouse.models import Cell
+    from Core_Domains.Warehouse.value_objects import MovementType
+
+    wh = sqlite_warehouse
+    wh.cell_repo.save(Cell(id=1, shelf_id=1, code="A-1", capacity=100))
+    wh.cell_repo.save(Cell(id=2, shelf_id=1, code="A-2", capacity=100))
+
+    wh.inbound(5, 1, 10)
+    wh.move(5, 1, 2, 4)
+    wh.outbound(5, 2, 4)
+
+    assert wh.get_stock(5, 1).quantity.amount == 6
+    assert wh.get_stock(5, 2) is None
+    assert wh.get_cell(1).used == 6
+    assert len(wh.cell_repo.list_by_shelf(1)) == 2
+
+    kinds = [m.movement_type for m in wh.movement_repo.list_for_book(5)]
+    assert kinds == [MovementType.INBOUND, MovementType.MOVE, MovementType.OUTBOUND]
+
+
+def test_sqlite_inventory_session_roundtrip(sqlite_warehouse):
+    from Core_Domains.Warehouse.models import Cell
+
+    wh = sqlite_warehouse
+    wh.cell_repo.save(Cell(id=1, capacity=100))
+    wh.inbound(7, 1, 5)
+
+    session = wh.start_inventory_session()
+    wh.add_inventory_result(session.id, 7, 1, actual_qty=3)
+    wh.close_inventory_and_apply(session.id)
+
+    loaded = wh.inventory_repo.get(session.id)
+    assert loaded.ended_at is not None
+    assert loaded.items[0].expected_qty == 5
+    assert wh.get_stock(7, 1).quantity.amount == 3
+    assert len(wh.inventory_repo.list()) == 1
+
+
+def test_sqlite_warehouse_tables_not_dropped_on_new_repo(sqlite_warehouse):
+    import Infrastructure.Persistence_Layer.sqlite.warehouse_repo as wr
+    from Core_Domains.Warehouse.models import Cell
+
+    sqlite_warehouse.cell_repo.save(Cell(id=3, capacity=10))
+    wr.SQLiteCellRepository()
+
+    assert sqlite_warehouse.cell_repo.get(3).capacity == 10
+
+
+# ============================================================
+#                   SQLITE PROFILE
+# ============================================================
+
+def test_sqlite_engine_applies_profile(tmp_path):
+    from sqlalchemy import text
+    from Infrastructure.Config.settings import Settings
+    from Infrastructure.Persistence_Layer.sqlite.db import create_sqlite_engine
+
+    settings = Settings(SQLITE_BUSY_TIMEOUT_MS=1234, SQLITE_CACHE_SIZE_KB=2048, SQLITE_POOL_SIZE=3)
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'tuned.db'}", settings)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -2048
+
+    assert engine.pool.size() == 3
+
+
+def test_sqlite_memory_engine_shares_one_connection():
+    from sqlalchemy import text
+    from Infrastructure.Persistence_Layer.sqlite.db import create_sqlite_engine
+
+    engine = create_sqlite_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    # StaticPool: таблица видна из другого соединения/потока
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+
+
+# ============================================================
+#                   CACHED BOOK REPO
+# ============================================================
+
+def _book(book_id, title="T"):
+    return Book(id=book_id, title=title, authors=[], genre=None, publisher=None,
+                edition=None, price=Price(10))
+
+
+def test_cached_book_repo_hits_and_invalidation():
+    from Infrastructure.Persistence_Layer.cached.book_repo import CachedBookRepository
+
+    inner = InMemoryBookRepository()
+    calls = []
+    original_get = inner.get
+    inner.get = lambda book_id: calls.append(book_id) or original_get(book_id)
+
+    repo = CachedBookRepository(inner)
+    repo.save(_book(1, "Old"))
+
+    assert repo.get(1).title == "Old"
+    assert repo.get(1).title == "Old"
+    assert calls == [1]
+
+    repo.save(_book(1, "New"))
+    assert repo.get(1).title == "New"
+    assert calls == [1, 1]
+
+    repo.delete(1)
+    with pytest.raises(KeyError):
+        repo.get(1)
+
+    stats = repo.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+
+
+def test_cached_book_repo_invalidates_again_after_unit_of_work(sqlite_session, monkeypatch):
+    from Infrastructure.Persistence_Layer.cached.book_repo import CachedBookRepository
+    from Infrastructure.Persistence_Layer.sqlite.book_repo import SQLiteBookRepository
+    from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteUnitOfWork
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.book_repo.SessionLocal", sqlite_session)
+    inner = SQLiteBookRepository()
+    repo = CachedBookRepository(inner)
+    repo.save(_book(1, "Old"))
+    stale = repo.get(1)
+
+    with SQLiteUnitOfWork(sqlite_session):
+        book = repo.get(1)
+        book.title = "New"
+        repo.save(book)
+        # параллельный get другой сессии ещё видит строку до коммита и кладёт её в кеш
+        repo.cache.put(1, stale)
+    assert repo.get(1).title == "New"
+
+    with pytest.raises(RuntimeError):
+        with SQLiteUnitOfWork(sqlite_session):
+            book = repo.get(1)
+            book.title = "Rolled back"
+            repo.save(book)
+            assert repo.get(1).title == "Rolled back"   # своя сессия видит незакоммиченное
+            raise RuntimeError("abort")
+    assert repo.get(1).title == "New"
+
+
+def test_cached_book_repo_never_caches_uncommitted_rows(sqlite_session, monkeypatch):
+    from Infrastructure.Persistence_Layer.cached.book_repo import CachedBookRepository
+    from Infrastructure.Persistence_Layer.sqlite.book_repo import SQLiteBookRepository
+    from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteUnitOfWork
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.book_repo.SessionLocal", sqlite_session)
+    repo = CachedBookRepository(SQLiteBookRepository())
+    repo.save(_book(1, "Old"))
+    repo.save(_book(2, "Other"))
+
+    with pytest.raises(RuntimeError):
+        with SQLiteUnitOfWork(sqlite_session):
+            # до первой записи чтения закоммиченные — обычный read-through
+            assert repo.get(1).title == "Old"
+            assert repo.cache.get(1) is not None
+
+            book = repo.get(1)
+            book.title = "Dirty"
+            repo.save(book)
+            assert repo.get(1).title == "Dirty"
+            assert repo.get(2).title == "Other"
+            # ни незакоммиченная книга, ни прочитанная той же сессией в кеш не попали
+            assert repo.cache.get(1) is None
+            assert repo.cache.get(2) is None
+            raise RuntimeError("abort")
+
+    assert repo.get(1).title == "Old"
+
+
+def test_lru_cache_evicts_and_expires():
+    from Infrastructure.Persistence_Layer.cached.lru_cache import LRUCache
+
+    now = [0.0]
+    cache = LRUCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")          # a — самый свежий
+    cache.put("c", 3)       # вытесняет b
+
+    assert cache.get("b") is None
+    assert cache.stats.evictions == 1
+
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+
+
+# ============================================================
+#                   BOOK SEARCH INDEX
+# ============================================================
+
+def _indexed_books():
+    from Core_Domains.book_catalog.models import Author, Genre
+
+    def make(book_id, title, author, genre):
+        book = _book(book_id, title)
+        book.authors = [Author(id=book_id, name=author)]
+        book.genre = Genre(id=1, name=genre)
+        return book
+
+    return [
+        make(1, "Refactoring Code", "Martin Fowler", "IT"),
+        make(2, "Clean Code", "Robert Martin", "IT"),
+        make(3, "Code", "Charles Petzold", "IT"),
+        make(4, "War and Peace", "Leo Tolstoy", "Novel"),
+    ]
+
+
+def test_in_memory_search_index_ranks_and_paginates():
+    from Infrastructure.Persistence_Layer.search.in_memory_index import InMemoryBookSearchIndex
+
+    index = InMemoryBookSearchIndex()
+    index.rebuild(_indexed_books())
+
+    # точное > префикс > начало слова
+    assert index.search(title="code") == [3, 2, 1]
+    assert index.search(title="ode") == [3, 2, 1]
+    assert index.search(title="code", offset=1, limit=1) == [2]
+    assert index.search(author="martin") == [1, 2]
+    assert index.search(title="code", author="fowler") == [1]
+    assert index.search(genre="novel") == [4]
+    assert index.search(title="xyz") == []
+
+
+def test_indexed_book_repo_keeps_index_in_sync():
+    from Core_Domains.book_catalog.value_objects import BookStatus
+    from Infrastructure.Persistence_Layer.search.in_memory_index import InMemoryBookSearchIndex
+    from Infrastructure.Persistence_Layer.search.indexed_book_repo import IndexedBookRepository
+
+    index = InMemoryBookSearchIndex()
+    repo = IndexedBookRepository(InMemoryBookRepository(), index)
+    for book in _indexed_books():
+        repo.save(book)
+
+    book = repo.get(2)
+    book.status = BookStatus.RESERVED
+    repo.save(book)
+    assert index.search(title="code", status=BookStatus.RESERVED) == [2]
+    assert index.search(title="code", status=BookStatus.AVAILABLE) == [3, 1]
+
+    repo.delete(3)
+    assert index.search(title="code") == [2, 1]
+    assert len(index) == 3
+
+
+def test_sqlite_fts_search_index(sqlite_session, monkeypatch):
+    from Core_Domains.book_catalog.value_objects import BookStatus
+    from Infrastructure.Persistence_Layer.search.sqlite_fts_index import SQLiteFtsBookSearchIndex
+
+    monkeypatch.setattr(
+        "Infrastructure.Persistence_Layer.search.sqlite_fts_index.SessionLocal", sqlite_session
+    )
+    index = SQLiteFtsBookSearchIndex()
+    books = _indexed_books()
+    index.rebuild(books)
+
+    assert set(index.search(title="code")) == {1, 2, 3}
+    assert index.search(title="code", limit=1) == [3]
+    assert index.search(author="fowler") == [1]
+    assert index.search(title="wa") == [4]          # короче триграммы — LIKE
+    assert index.search(genre="it", offset=2) == [1]
+
+    books[1].status = BookStatus.RESERVED
+    index.index(books[1])
+    assert index.search(status=BookStatus.RESERVED) == [2]
+
+    index.remove(3)
+    assert 3 not in index.search(title="code")
+
+    # пачка перезаписывает старые строки, а не дублирует их
+    books[0].title = "Patterns"
+    index.index_many(books[:2])
+    assert index.search(title="patterns") == [1]
+    assert index.search(title="code") == [2]
+
+
+def test_sqlite_facet_counter_applies_deltas(sqlite_session, monkeypatch):
+    from Core_Domains.book_catalog.models import Genre
+    from Core_Domains.book_catalog.value_objects import BookStatus
+    from Infrastructure.Persistence_Layer.search.sqlite_facets import SQLiteBookFacetCounter
+
+    monkeypatch.setattr(
+        "Infrastructure.Persistence_Layer.search.sqlite_facets.SessionLocal", sqlite_session
+    )
+    counter = SQLiteBookFacetCounter()
+    books = _indexed_books()
+    counter.rebuild(books)
+
+    facets = counter.counts()
+    assert facets.total == 4
+    assert facets.genres == {"IT": 3, "Novel": 1}
+    assert facets.authors["Martin Fowler"] == 1
+
+    books[0].status = BookStatus.RESERVED
+    books[1].genre = Genre(id=2, name="Novel")
+    counter.apply_many(books[:2])
+    counter.remove(4)
+    counter.remove(4)                  # повторное удаление не уводит счётчики в минус
+
+    facets = counter.counts(top=1)
+    assert facets.total == 3
+    assert facets.genres == {"IT": 2}
+    assert counter.counts().genres == {"IT": 2, "Novel": 1}
+    assert counter.counts().statuses == {"available": 2, "reserved": 1}
+    assert "Leo Tolstoy" not in counter.counts().authors
+
+    # после перезапуска счётчики читаются из таблиц, без пересчёта
+    assert SQLiteBookFacetCounter().counts() == counter.counts()
+
@@ -4,6 +4,8 @@ import pytest
 from fastapi.testclient import TestClient
 
 from Infrastructure.api.main import app
+from Core_Domains.book_catalog.models import Author, Book, Genre
+from Core_Domains.book_catalog.value_objects import Price
 
 
 client = TestClient(app)
@@ -52,6 +54,36 @@ def test_search_books_found(monkeypatch):
     assert resp.json() == ["Clean Code"]
 
 
+def test_book_facets_endpoint():
+    from Infrastructure.api.dependencies import get_book_service
+
+    service = get_book_service()
+    before = client.get("/books/facets").json()
+    reserved = before["statuses"].get("reserved", 0)
+
+    service.add_book(Book(id=901, title="Facets", authors=[Author(1, "Facet Author")],
+                          genre=Genre(1, "Facets"), publisher=None, edition=None, price=Price(5)))
+    service.reserve_book(901)
+
+    resp = client.get("/books/facets", params={"top": 50})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total"] == before["total"] + 1
+    assert body["genres"]["Facets"] == 1
+    assert body["authors"]["Facet Author"] == 1
+    assert body["statuses"]["reserved"] == reserved + 1
+
+    service.remove_book(901)
+    assert "Facets" not in client.get("/books/facets").json()["genres"]
+    assert client.get("/books/facets", params={"top": 0}).status_code == 400
+
+
+def test_book_cache_stats_endpoint():
+    resp = client.get("/books/cache-stats")
+    assert resp.status_code == 200
+    assert isinstance(resp.json(), dict)
+
+
 # ============================================================
 #                     USERS API TESTS
 # ============================================================
@@ -82,6 +114,25 @@ def test_user_login_success():
     assert resp.json()["status"] == "ok"
 
 
+def test_login_token_authorizes_me_endpoint():
+    client.post("/users/register", json={"email": "me@test.com", "password": "pw"})
+    data = client.post("/users/login", json={"email": "me@test.com", "password": "pw"}).json()
+
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert client.get("/users/me", headers=headers).json() == {"user_id": data["user_id"]}
+    assert client.get("/users/me").status_code == 401
+    assert client.get("/users/me", headers={"Authorization": "Bearer junk"}).status_code == 401
+
+
+def test_hashing_stats_endpoint():
+    client.post("/users/register", json={"email": "stats@test.com", "password": "pw"})
+
+    data = client.get("/users/hashing-stats").json()
+    assert data["completed"] >= 1
+    assert data["in_flight"] == 0
+    assert "rehashed_on_login" in data
+
+
 
 
 # ============================================================
@@ -161,6 +212,72 @@ def test_order_pay_success():
 
 
 
+# ============================================================
+#                     PAYMENTS API TESTS
+# ============================================================
+
+def test_transfer_batch_endpoint(monkeypatch):
+    from Infrastructure.api.dependencies import account_repo
+    from Core_Domains.Payments.models import Account
+    from Core_Domains.Payments.value_objects import Money
+
+    monkeypatch.setattr("Infrastructure.integrations.payments.bank_gateway.random.random", lambda: 0.99)
+    account_repo.save(Account(id=501, owner_id=1, balance=Money(100)))
+    account_repo.save(Account(id=502, owner_id=2, balance=Money(0)))
+
+    resp = client.post("/payments/transfer/batch", json=[
+        {"from_account": 501, "to_account": 502, "amount": 40},
+        {"from_account": 502, "to_account": 501, "amount": 15},
+        {"from_account": 501, "to_account": 999, "amount": 1},
+    ])
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [t and t["status"] for t in data["transactions"]] == ["success", "success", None]
+    assert data["failures"] == {"2": "Account 999 not found"}
+    assert data["gateway_legs"] == 1
+    assert account_repo.get(502).balance == Money(25)
+
+
+def test_account_statement_endpoint():
+    from Infrastructure.api.dependencies import account_repo, trx_repo
+    from Core_Domains.Payments.models import Account, Transaction
+    from Core_Domains.Payments.value_objects import Money, TransactionType, TransactionStatus
+
+    account_repo.save(Account(id=601, owner_id=1, balance=Money(10)))
+    for trx_id in (90_001, 90_002, 90_003):
+        trx_repo.save(Transaction(id=trx_id, from_account=601, to_account=602, amount=Money("1.5"),
+                                  type=TransactionType.TRANSFER, status=TransactionStatus.SUCCESS))
+
+    first = client.get("/payments/accounts/601/transactions", params={"limit": 2}).json()
+    assert [t["transaction_id"] for t in first["items"]] == [90_001, 90_002]
+    assert first["items"][0]["amount"] == "1.50"
+
+    rest = client.get("/payments/accounts/601/transactions",
+                      params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert [t["transaction_id"] for t in rest["items"]] == [90_003]
+    assert rest["next_cursor"] is None
+
+    resp = client.get("/payments/accounts/601/transactions", params={"cursor": "???"})
+    assert resp.status_code == 400
+
+
+def test_account_balance_at_endpoint():
+    from datetime import datetime, timedelta
+    from Infrastructure.api.dependencies import account_repo
+    from Core_Domains.Payments.models import Account
+    from Core_Domains.Payments.value_objects import Money
+
+    before = datetime.utcnow() - timedelta(seconds=1)
+    account_repo.save(Account(id=701, owner_id=1, balance=Money("12.30")))
+
+    resp = client.get("/payments/accounts/701/balance", params={"at": datetime.utcnow().isoformat()})
+    assert resp.json()["amount"] == "12.30"
+    resp = client.get("/payments/accounts/701/balance", params={"at": before.isoformat()})
+    assert resp.json()["amount"] == "0.00"
+    resp = client.get("/payments/accounts/7777/balance", params={"at": before.isoformat()})
+    assert resp.status_code == 404
+
+
 # ============================================================
 #                     WAREHOUSE API TESTS
 # ============================================================
@@ -8,7 +8,7 @@ import logging
 #                         TEST ExternalBookApi
 # ======================================================================
 
-def test_external_book_api_success(monkeypatch):
+def test_external_book_api_success():
     """
     Проверяем успешное получение данных по ISBN.
     """
@@ -38,16 +38,15 @@ def test_external_book_api_success(monkeypatch):
     def fake_get(url, params):
         return FakeResponse()
 
-    monkeypatch.setattr("Infrastructure.integrations.books.external_book_api.requests.get", fake_get)
-
-    api = ExternalBookApi()
+    # транспорт подключаемый: вместо HTTP — заглушка с тем же контрактом
+    api = ExternalBookApi(transport=fake_get)
     result = api.find_by_isbn("12345")
 
     assert result["title"] == "Test Book"
     assert result["authors"] == ["Author A"]
 
 
-def test_external_book_api_not_found(monkeypatch):
+def test_external_book_api_not_found():
     from Infrastructure.integrations.books.external_book_api import ExternalBookApi
 
     class FakeResponse:
@@ -56,27 +55,130 @@ def test_external_book_api_not_found(monkeypatch):
         def json(self):
             return {"totalItems": 0}
 
-    monkeypatch.setattr("Infrastructure.integrations.books.external_book_api.requests.get", lambda *a, **k: FakeResponse())
-
-    api = ExternalBookApi()
+    api = ExternalBookApi(transport=lambda *a, **k: FakeResponse())
     assert api.find_by_isbn("nope") is None
 
 
-def test_external_book_api_bad_status(monkeypatch):
+def test_external_book_api_bad_status():
     from Infrastructure.integrations.books.external_book_api import ExternalBookApi
 
     class FakeResponse:
         status_code = 500
 
-    monkeypatch.setattr("Infrastructure.integrations.books.external_book_api.requests.get", lambda *a, **k: FakeResponse())
-
-    api = ExternalBookApi()
+    api = ExternalBookApi(transport=lambda *a, **k: FakeResponse())
     assert api.find_by_isbn("xxx") is None
 
 
+@pytest.fixture
+def stub_books():
+    from Infrastructure.integrations.books.stub_books import StubBooksServer
+
+    books = {f"978{i:010d}": {"title": f"Book {i}", "authors": ["A"]} for i in range(40)}
+    with StubBooksServer(books, latency=0.02) as server:
+        yield server
+
+
+def _isbn_cache(now):
+    from Infrastructure.Persistence_Layer.sqlite.isbn_cache_repo import SQLiteIsbnCache
+
+    return SQLiteIsbnCache("sqlite://", ttl=100, negative_ttl=10, clock=lambda: now[0])
+
+
+def test_external_book_api_bulk_lookup_is_concurrent_and_cached(stub_books):
+    from Infrastructure.integrations.books.external_book_api import ExternalBookApi, HttpBookTransport
+
+    now = [0.0]
+    api = ExternalBookApi(HttpBookTransport(), cache=_isbn_cache(now),
+                          base_url=stub_books.url, workers=8)
+    isbns = [f"978{i:010d}" for i in range(40)] + ["missing", "978" + "0" * 10]
+
+    found = api.find_many(isbns)
+
+    assert len(found) == 41                      # дубликат схлопнут
+    assert found["9780000000007"]["title"] == "Book 7"
+    assert found["missing"] is None
+    assert stub_books.peak_concurrency > 1       # запросы шли параллельно
+    assert sum(stub_books.requests.values()) == 41
+    assert api.stats.as_dict() == {"cache_hits": 0, "fetched": 41, "retries": 0, "failed": 0}
+
+    # второй проход — только кеш, включая negative
+    assert api.find_many(isbns) == found
+    assert max(stub_books.requests.values()) == 1
+    assert api.stats.cache_hits == 41
+
+    # промах живёт negative_ttl, книга — ttl
+    now[0] = 11
+    api.find_many(["missing", "9780000000001"])
+    assert stub_books.requests["missing"] == 2
+    assert stub_books.requests["9780000000001"] == 1
+
+
+def test_external_book_api_retries_and_does_not_cache_failures(stub_books):
+    from Infrastructure.integrations.books.external_book_api import ExternalBookApi, HttpBookTransport
+    from Infrastructure.integrations.resilience import RetryPolicy
+
+    api = ExternalBookApi(HttpBookTransport(), cache=_isbn_cache([0.0]), base_url=stub_books.url,
+                          retry=RetryPolicy(attempts=3, base_delay=0.001, max_delay=0.002))
+
+    stub_books.fail_next(2, status=503)
+    assert api.find_by_isbn("9780000000003")["title"] == "Book 3"
+    assert api.stats.retries == 2
+
+    stub_books.fail_next(3, status=429)
+    assert api.find_by_isbn("9780000000004") is None
+    assert api.stats.failed == 1
+    # неудача не закеширована: следующий вызов снова идёт в каталог
+    assert api.find_by_isbn("9780000000004")["title"] == "Book 4"
 
 
+def test_rate_limiter_spaces_calls():
+    from Infrastructure.integrations.resilience import RateLimiter
 
+    now, waits = [0.0], []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(rate=10, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(5):
+        limiter.acquire()
+
+    assert waits == pytest.approx([0.1, 0.1, 0.1])   # 2 сразу (burst), дальше по 1/rate
+    assert now[0] == pytest.approx(0.3)
+
+
+def test_catalog_feed_readers_stream_into_import(tmp_path):
+    import io
+    from Core_Domains.book_catalog.services import BookCatalogService
+    from Infrastructure.integrations.books.catalog_feed import read_feed, read_jsonl
+    from Infrastructure.Persistence_Layer.in_memory.book_repo import InMemoryBookRepository
+    from Infrastructure.Persistence_Layer.search.in_memory_index import InMemoryBookSearchIndex
+    from Infrastructure.Persistence_Layer.search.indexed_book_repo import IndexedBookRepository
+
+    csv_feed = tmp_path / "feed.csv"
+    csv_feed.write_text(
+        "\ufeffid,title,price,authors\n"
+        + "".join(f'{i},"Book {i}, vol. {i}",{i}.5,Author {i % 3}\n' for i in range(1, 2501)),
+        encoding="utf-8",
+    )
+    jsonl_feed = io.StringIO('{"id": 3000, "title": "Json", "price": 1}\n\n{oops\n[1]\n')
+
+    index = InMemoryBookSearchIndex()
+    svc = BookCatalogService(IndexedBookRepository(InMemoryBookRepository(), index), search_index=index)
+
+    progress = svc.import_books(read_feed(csv_feed), chunk_size=1000)
+    assert (progress.imported, progress.chunks) == (2500, 3)
+    assert svc.get_book(7).title == "Book 7, vol. 7"
+    assert len(svc.search(author="author 1")) == 834     # индекс обновлён пачками
+
+    progress = svc.import_books(read_jsonl(jsonl_feed))
+    assert progress.imported == 1
+    reasons = [reason for _, reason in progress.errors]
+    assert reasons[0].startswith("invalid JSON") and reasons[1] == "row is not an object"
+
+    with pytest.raises(ValueError):
+        read_feed(tmp_path / "feed.xml")
 
 
 # ======================================================================
@@ -107,6 +209,72 @@ def test_audit_logger(caplog):
 
 
 
+def test_audit_pipeline_writes_json_lines_off_thread(tmp_path, caplog):
+    import json
+    from Infrastructure.integrations.logging.audit_logger import AuditLogger
+    from Infrastructure.integrations.logging.audit_pipeline import AuditPipeline
+
+    caplog.set_level(logging.INFO, logger="audit")
+    path = tmp_path / "audit" / "audit.jsonl"
+
+    with AuditPipeline(str(path), batch_size=4) as pipeline:
+        logger = AuditLogger()
+        for i in range(10):
+            logger.log_stock_movement(10, 1, 2, i)
+        logger.log_user_login(7)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 11 and pipeline.dropped == 0
+    assert lines[3]["event"] == "stock_movement"
+    assert lines[3]["message"] == "Stock movement: book=10, from=1, to=2, qty=3"
+    assert (lines[3]["book_id"], lines[3]["qty"]) == (10, 3)
+    assert lines[-1]["user_id"] == 7
+    # пока конвейер работал, аудит не шёл в корневые обработчики
+    assert not [r for r in caplog.records if r.name == "audit"]
+    assert logging.getLogger("audit").propagate
+
+
+def test_audit_queue_drop_and_block_policies():
+    import time
+    from Infrastructure.integrations.logging.audit_pipeline import BoundedQueueHandler
+
+    record = logging.makeLogRecord({"name": "audit", "msg": "event %s", "args": (1,)})
+
+    dropping = BoundedQueueHandler(maxsize=3)
+    for _ in range(20):
+        dropping.handle(record)
+    assert dropping.queue.qsize() == 3 and dropping.dropped == 17
+    # форматирование отложено до слушателя
+    assert dropping.queue.get().args == (1,)
+
+    blocking = BoundedQueueHandler(maxsize=1, policy="block", block_timeout=0.05)
+    blocking.handle(record)
+    started = time.monotonic()
+    blocking.handle(record)
+    assert time.monotonic() - started >= 0.05
+    assert blocking.dropped == 1
+
+
+def test_audit_file_handler_rotates_batches(tmp_path):
+    import json
+    from Infrastructure.integrations.logging.audit_pipeline import (
+        BatchingRotatingFileHandler, JsonLineFormatter
+    )
+
+    path = tmp_path / "audit.jsonl"
+    handler = BatchingRotatingFileHandler(str(path), maxBytes=400, backupCount=2, delay=True)
+    handler.setFormatter(JsonLineFormatter())
+    handler.emit_batch([
+        logging.makeLogRecord({"name": "audit", "msg": "event %s", "args": (i,)}) for i in range(20)
+    ])
+    handler.close()
+
+    rotated = tmp_path / "audit.jsonl.1"
+    assert rotated.exists() and not (tmp_path / "audit.jsonl.3").exists()
+    for line in (path.read_text() + rotated.read_text()).splitlines():
+        assert json.loads(line)["message"].startswith("event ")
+
+
 # ======================================================================
 #                         TEST BankGateway
 # ======================================================================
@@ -135,3 +303,454 @@ def test_bank_gateway_transaction_status():
 
     gw = BankGateway()
     assert gw.get_transaction_status("xxx") == TransactionStatus.SUCCESS
+
+
+# ======================================================================
+#                   TEST ResilientPaymentGateway + StubBankServer
+# ======================================================================
+
+@pytest.fixture
+def stub_bank():
+    from Infrastructure.integrations.payments.stub_bank import StubBankServer
+
+    with StubBankServer(limit_minor=100_00) as bank:
+        yield bank
+
+
+def _resilient_gateway(url, **kw):
+    from Infrastructure.integrations.payments.gateway_client import (
+        HttpBankTransport, ResilientPaymentGateway
+    )
+    from Infrastructure.integrations.resilience import RetryPolicy
+
+    transport = HttpBankTransport(url, connect_timeout=0.5, read_timeout=kw.pop("read_timeout", 1.0))
+    kw.setdefault("retry", RetryPolicy(attempts=3, base_delay=0.001, max_delay=0.002))
+    return ResilientPaymentGateway(transport, **kw)
+
+
+def test_gateway_retries_transient_errors_with_same_key(stub_bank):
+    from Core_Domains.Payments.gateway_interface import idempotency_key
+    from Core_Domains.Payments.value_objects import Money
+
+    gw = _resilient_gateway(stub_bank.url)
+    stub_bank.fail_next(2)
+
+    with idempotency_key("trx-1"):
+        assert gw.authorize(Money(50)) is True
+        assert gw.authorize(Money(50)) is True   # повтор — ответ из кеша банка
+    assert gw.authorize(Money(500)) is False     # отказ банка — без повторов
+
+    assert stub_bank.received["authorize"] == 5
+    assert stub_bank.executed["authorize"] == 2
+    assert gw.stats.retries == 2
+    assert gw.breaker.state == "closed"
+
+
+def test_gateway_timeout_and_circuit_breaker(stub_bank):
+    from Core_Domains.Payments.exceptions import GatewayUnavailable
+    from Core_Domains.Payments.value_objects import Money
+    from Infrastructure.integrations.resilience import CircuitBreaker
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    gw = _resilient_gateway(stub_bank.url, breaker=breaker, read_timeout=0.05)
+    stub_bank.latency = 0.3
+
+    with pytest.raises(GatewayUnavailable):
+        gw.capture(Money(1))
+    assert breaker.state == "open"
+
+    # цепь разомкнута — отказ без обращения к банку
+    received = sum(stub_bank.received.values())
+    with pytest.raises(GatewayUnavailable):
+        gw.capture(Money(1))
+    assert sum(stub_bank.received.values()) == received
+    assert gw.stats.short_circuited == 1
+
+    # после reset_timeout пробный вызов закрывает цепь
+    stub_bank.latency = 0
+    now[0] = 11
+    assert breaker.state == "half_open"
+    assert gw.capture(Money(1)) is True
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_half_open_failure_reopens():
+    from Infrastructure.integrations.resilience import CircuitBreaker
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 5
+    assert breaker.allow()          # единственный пробный вызов
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_half_open_probe_is_released_on_unexpected_errors():
+    import asyncio
+    from Core_Domains.Payments.value_objects import Money
+    from Infrastructure.integrations.payments.gateway_client import ResilientPaymentGateway
+    from Infrastructure.integrations.resilience import CircuitBreaker
+
+    class FlakyTransport:
+        def __init__(self):
+            self.errors = [ValueError("bad json"), asyncio.CancelledError()]
+
+        def send(self, operation, payload, idempotency_key, timeout):
+            if self.errors:
+                raise self.errors.pop(0)
+            return {"approved": True}
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=lambda: now[0])
+    gw = ResilientPaymentGateway(FlakyTransport(), breaker=breaker, clock=lambda: now[0])
+    breaker.record_failure()
+
+    now[0] = 5
+    with pytest.raises(ValueError):
+        gw.capture(Money(1))            # битый ответ на пробный вызов — снова open
+    assert breaker.state == "open"
+
+    now[0] = 10
+    with pytest.raises(asyncio.CancelledError):
+        gw.capture(Money(1))            # отмена: цепь не трогаем, но слот свободен
+    assert breaker.state == "half_open"
+
+    assert gw.capture(Money(1)) is True
+    assert breaker.state == "closed"
+
+
+def test_payment_service_over_stub_bank(stub_bank):
+    from Core_Domains.Payments.exceptions import GatewayUnavailable
+    from Core_Domains.Payments.models import Account
+    from Core_Domains.Payments.services import PaymentService
+    from Core_Domains.Payments.value_objects import Money
+    from Infrastructure.Persistence_Layer.in_memory.payments_repo import (
+        InMemoryAccountRepository, InMemoryTransactionRepository
+    )
+
+    accounts = InMemoryAccountRepository()
+    accounts.save(Account(id=1, owner_id=1, balance=Money(100)))
+    accounts.save(Account(id=2, owner_id=2, balance=Money(0)))
+    svc = PaymentService(accounts, InMemoryTransactionRepository(), _resilient_gateway(stub_bank.url))
+
+    stub_bank.fail_next(1)
+    svc.transfer(1, 2, Money(30))
+    assert accounts.get(2).balance == Money(30)
+    assert stub_bank.executed == {"authorize": 1, "capture": 1}
+
+    stub_bank.fail_next(10)
+    with pytest.raises(GatewayUnavailable):
+        svc.transfer(1, 2, Money(10))
+    assert accounts.get(1).balance == Money(70)
+
+
+def test_in_process_bank_transport_is_idempotent(monkeypatch):
+    from Core_Domains.Payments.gateway_interface import idempotency_key
+    from Core_Domains.Payments.value_objects import Money
+    from Infrastructure.integrations.payments.bank_gateway import BankGateway
+    from Infrastructure.integrations.payments.gateway_client import (
+        InProcessBankTransport, ResilientPaymentGateway
+    )
+
+    gw = ResilientPaymentGateway(InProcessBankTransport(BankGateway()))
+    monkeypatch.setattr("Infrastructure.integrations.payments.bank_gateway.random.random", lambda: 0.01)
+    with idempotency_key("trx-7"):
+        assert gw.authorize(Money(5)) is False
+        monkeypatch.setattr("Infrastructure.integrations.payments.bank_gateway.random.random", lambda: 0.99)
+        assert gw.authorize(Money(5)) is False   # тот же ключ — тот же ответ
+    assert gw.authorize(Money(5)) is True
+
+    transport = InProcessBankTransport(BankGateway(), max_replies=2)
+    for key in ("a", "b", "c"):
+        transport.send("capture", {}, key, 1.0)
+    assert list(transport._replies) == ["b", "c"]
+
+
+def test_gateway_io_leaves_event_loop_free():
+    import asyncio
+    import time
+    from sqlalchemy.util import greenlet_spawn
+    from Core_Domains.Payments.value_objects import Money
+    from Infrastructure.integrations.payments.gateway_client import (
+        ResilientPaymentGateway, TransientGatewayError
+    )
+    from Infrastructure.integrations.resilience import RetryPolicy
+
+    class SlowBank:
+        def __init__(self):
+            self.failed = set()
+
+        def send(self, operation, payload, key, timeout):
+            time.sleep(0.2)
+            if key not in self.failed:        # первая попытка — сбой, backoff, повтор
+                self.failed.add(key)
+                raise TransientGatewayError("timeout")
+            return {"approved": True}
+
+    gw = ResilientPaymentGateway(SlowBank(), retry=RetryPolicy(base_delay=0.1, jitter=False))
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick = asyncio.ensure_future(ticker())
+        started = time.monotonic()
+        # так сервисы вызываются из обработчиков в режиме memory (_run_on_loop)
+        results = await asyncio.gather(*(greenlet_spawn(gw.capture, Money(1)) for _ in range(4)))
+        elapsed = time.monotonic() - started
+        tick.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(main())
+    assert results == [True] * 4
+    assert elapsed < 1.5              # параллельно, а не 4 × (0.2 + 0.1 + 0.2) = 2 с
+    assert ticks > 10                 # loop не стоял, пока шлюз отвечал
+
+
+# ======================================================================
+#                   TEST Notification outbox + fake SMTP/Telegram
+# ======================================================================
+
+def _outbox(now=None):
+    import time
+    from Infrastructure.Persistence_Layer.sqlite.outbox_repo import SQLiteOutbox
+
+    return SQLiteOutbox("sqlite://", clock=(lambda: now[0]) if now else time.time)
+
+
+def _worker(outbox, **senders):
+    from Infrastructure.integrations.notifications.outbox import NotificationWorker
+    from Infrastructure.integrations.resilience import RetryPolicy
+
+    retry = RetryPolicy(base_delay=10, max_delay=10, jitter=False)
+    return NotificationWorker(outbox, senders, batch_size=10, max_attempts=3, retry=retry)
+
+
+def test_outbox_delivers_email_batch_over_one_smtp_connection():
+    from Infrastructure.integrations.email.smtp_service import SmtpEmailService
+    from Infrastructure.integrations.notifications.fake_servers import FakeSmtpServer
+    from Infrastructure.integrations.notifications.outbox import OutboxEmailService
+
+    with FakeSmtpServer(reject={"ghost@example.com"}) as smtp:
+        host, port = smtp.address
+        sender = SmtpEmailService(host, port, login="shop@example.com", password="pw", starttls=False)
+        outbox = _outbox()
+        emails = OutboxEmailService(outbox)
+        for i in range(5):
+            emails.send_email(f"user{i}@example.com", f"Order {i}", "shipped")
+        emails.send_email("ghost@example.com", "Order", "lost")
+
+        worker = _worker(outbox, email=sender)
+        worker.drain()
+        sender.close()
+
+    assert [m["to"] for m in smtp.messages] == [[f"user{i}@example.com"] for i in range(5)]
+    assert "Subject: Order 0" in smtp.messages[0]["data"]
+    assert smtp.connections == 1 and sender.connects == 1
+    # 550 — сразу dead, без повторов
+    dead = outbox.dead()
+    assert [d["recipient"] for d in dead] == ["ghost@example.com"]
+    assert dead[0]["attempts"] == 1 and "SMTPRecipientsRefused" in dead[0]["last_error"]
+    assert outbox.counts() == {"dead": 1}
+
+
+def test_smtp_reconnects_after_server_drops_connection():
+    from Infrastructure.integrations.email.smtp_service import SmtpEmailService
+    from Infrastructure.integrations.notifications.fake_servers import FakeSmtpServer
+
+    with FakeSmtpServer() as smtp:
+        smtp.drop_after(1)
+        host, port = smtp.address
+        sender = SmtpEmailService(host, port, login="", starttls=False, sender="shop@example.com")
+        sender.send_email("a@example.com", "1", "x")
+        sender.send_email("b@example.com", "2", "x")
+        sender.close()
+
+    assert len(smtp.messages) == 2
+    assert smtp.connections == 2
+
+
+def test_telegram_retries_with_backoff_and_keep_alive():
+    from Infrastructure.integrations.notifications.fake_servers import FakeTelegramServer
+    from Infrastructure.integrations.notifications.outbox import OutboxTelegramNotifier
+    from Infrastructure.integrations.notifications.telegram_notifier import TelegramNotifier
+
+    now = [1000.0]
+    with FakeTelegramServer() as tg:
+        bot = TelegramNotifier(token="T", chat_id="42", base_url=tg.url, timeout=1)
+        outbox = _outbox(now)
+        notifier = OutboxTelegramNotifier(outbox, chat_id="42")
+        for text in ("a", "b", "c"):
+            notifier.send(text)
+        worker = _worker(outbox, telegram=bot)
+
+        tg.fail_next(1, status=429, retry_after=30)
+        assert worker.run_once() == 3
+        assert tg.messages == []                 # 429 — остаток пачки отложен целиком
+        assert worker.run_once() == 0            # ещё не пора
+
+        now[0] += 30
+        tg.fail_next(1, status=502)
+        worker.run_once()
+        assert [m["text"] for m in tg.messages] == ["b", "c"]
+
+        now[0] += 9
+        assert worker.run_once() == 0            # backoff 10 с
+        now[0] += 1
+        worker.run_once()
+        bot.close()
+
+    assert [m["text"] for m in tg.messages] == ["b", "c", "a"]
+    assert {m["chat_id"] for m in tg.messages} == {"42"}
+    assert tg.connections == 1
+    assert outbox.counts() == {}
+
+
+def test_outbox_gives_up_and_reclaims_expired_lease():
+    from Infrastructure.integrations.notifications.outbox import DeliveryError, OutboxMessage
+
+    class Flaky:
+        def send_batch(self, messages):
+            return [DeliveryError("down")] * len(messages)
+
+    now = [0.0]
+    outbox = _outbox(now)
+    outbox.enqueue(OutboxMessage("telegram", "1", "x"))
+    worker = _worker(outbox, telegram=Flaky())
+    for _ in range(3):
+        worker.run_once()
+        now[0] += 10
+    assert outbox.dead()[0]["attempts"] == 3
+
+    # воркер упал после claim: сообщение вернётся после аренды
+    outbox.enqueue(OutboxMessage("email", "a@example.com", "y"))
+    assert len(outbox.claim(10, lease=60)) == 1
+    assert outbox.claim(10, lease=60) == []
+    now[0] += 60
+    assert [m.recipient for m in outbox.claim(10, lease=60)] == ["a@example.com"]
+
+
+def test_outbox_buries_message_whose_lease_keeps_expiring():
+    from Infrastructure.integrations.notifications.outbox import OutboxMessage
+
+    class Hanging:
+        def send_batch(self, messages):
+            raise AssertionError("must not be sent again")
+
+    now = [0.0]
+    outbox = _outbox(now)
+    outbox.enqueue(OutboxMessage("telegram", "1", "x"))
+    # воркер трижды забрал сообщение и пропал, не отметив результат
+    for attempt in (1, 2, 3):
+        assert [m.attempts for m in outbox.claim(10, lease=60)] == [attempt]
+        now[0] += 60
+
+    worker = _worker(outbox, telegram=Hanging())   # max_attempts=3
+    assert worker.run_once() == 1
+    dead = outbox.dead()
+    assert (dead[0]["attempts"], dead[0]["last_error"]) == (4, "Delivery lease expired")
+
+
+def test_notification_worker_thread_delivers_on_wake():
+    import time
+    from Infrastructure.integrations.notifications.fake_servers import FakeTelegramServer
+    from Infrastructure.integrations.notifications.outbox import OutboxTelegramNotifier
+    from Infrastructure.integrations.notifications.telegram_notifier import TelegramNotifier
+
+    with FakeTelegramServer() as tg:
+        outbox = _outbox()
+        worker = _worker(outbox, telegram=TelegramNotifier(token="T", base_url=tg.url, timeout=1))
+        worker.poll_interval = 30
+        worker.start()
+        OutboxTelegramNotifier(outbox, chat_id="7", notify=worker.wake).send("hi")
+
+        deadline = time.monotonic() + 5
+        while not tg.messages and time.monotonic() < deadline:
+            time.sleep(0.01)
+        worker.stop()
+
+    assert tg.messages == [{"chat_id": "7", "text": "hi"}]
+
+
+# ======================================================================
+#                         TEST PooledPasswordHasher
+# ======================================================================
+
+def test_pooled_hasher_roundtrip_and_stats():
+    from concurrent.futures import ThreadPoolExecutor
+    from Infrastructure.integrations.security.pooled_hasher import PooledPasswordHasher
+
+    hasher = PooledPasswordHasher(executor=ThreadPoolExecutor(2))
+    h = hasher.hash("pw")
+
+    assert hasher.verify("pw", h)
+    assert not hasher.verify("bad", h)
+    assert not hasher.needs_rehash(h)
+
+    stats = hasher.stats.as_dict()
+    assert stats["completed"] == 3
+    assert stats["in_flight"] == 0
+    assert stats["avg_ms"] > 0
+    hasher.shutdown()
+
+
+def test_pooled_hasher_rejects_over_capacity():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from Core_Domains.User_Security.exceptions import PasswordHashingBusy
+    from Infrastructure.integrations.security.pooled_hasher import PooledPasswordHasher
+
+    gate = threading.Event()
+
+    class SlowExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            return super().submit(lambda: gate.wait() and fn(*args))
+
+    hasher = PooledPasswordHasher(max_pending=1, executor=SlowExecutor(1))
+    t = threading.Thread(target=hasher.hash, args=("pw",))
+    t.start()
+    while hasher.stats.in_flight == 0:
+        pass
+
+    with pytest.raises(PasswordHashingBusy):
+        hasher.hash("pw")
+
+    gate.set()
+    t.join()
+    assert hasher.stats.rejected == 1
+    assert hasher.stats.peak_in_flight == 1
+    hasher.shutdown()
+
+
+def test_pooled_hasher_waits_on_event_loop_in_greenlet():
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy.util import greenlet_spawn
+    from Infrastructure.integrations.security.pooled_hasher import PooledPasswordHasher
+
+    hasher = PooledPasswordHasher(executor=ThreadPoolExecutor(2))
+    ticks = []
+
+    async def ticker():
+        for _ in range(3):
+            ticks.append(1)
+            await asyncio.sleep(0)
+
+    async def scenario():
+        # пока greenlet ждёт пул, loop продолжает крутить другие задачи
+        h, _ = await asyncio.gather(greenlet_spawn(hasher.hash, "pw"), ticker())
+        return h
+
+    assert asyncio.run(scenario()).startswith("pbkdf2_sha256$")
+    assert len(ticks) == 3
+    hasher.shutdown()
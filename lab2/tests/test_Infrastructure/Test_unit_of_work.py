@@ -0,0 +1,212 @@
+# lab2re/Unit_tests/test_Infrastructure/Test_unit_of_work.py
+
+import threading
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from Infrastructure.Persistence_Layer.sqlite.db import Base
+from Infrastructure.Persistence_Layer.sqlite.unit_of_work import SQLiteUnitOfWork, current_session
+from Core_Domains.Payments.models import Account
+from Core_Domains.Payments.value_objects import Money
+
+
+@pytest.fixture
+def sqlite_session(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'uow.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def account_repo(sqlite_session, monkeypatch):
+    from Infrastructure.Persistence_Layer.sqlite.payments_repo import SQLiteAccountRepository
+
+    monkeypatch.setattr("Infrastructure.Persistence_Layer.sqlite.payments_repo.SessionLocal", sqlite_session)
+    return SQLiteAccountRepository()
+
+
+def _count_commits(session_factory):
+    commits = []
+    event.listen(session_factory.kw["bind"], "commit", lambda conn: commits.append(1))
+    return commits
+
+
+def test_uow_batches_writes_into_one_commit(sqlite_session, account_repo):
+    commits = _count_commits(sqlite_session)
+
+    with SQLiteUnitOfWork(sqlite_session):
+        for i in range(10):
+            account_repo.save(Account(id=i, owner_id=1, balance=Money(10)))
+        # внутри unit of work записи уже видны
+        assert account_repo.get(3).balance.amount == 10
+
+    assert len(commits) == 1
+    assert account_repo.get(9).owner_id == 1
+
+
+def test_uow_rolls_back_on_error(sqlite_session, account_repo):
+    with pytest.raises(RuntimeError):
+        with SQLiteUnitOfWork(sqlite_session):
+            account_repo.save(Account(id=1, owner_id=1, balance=Money(10)))
+            raise RuntimeError("boom")
+
+    with pytest.raises(KeyError):
+        account_repo.get(1)
+
+
+def test_nested_uow_joins_outer(sqlite_session):
+    with SQLiteUnitOfWork(sqlite_session) as outer:
+        with SQLiteUnitOfWork(sqlite_session) as inner:
+            assert inner.session is outer.session
+        assert current_session() is outer.session
+
+    assert current_session() is None
+
+
+def test_atomic_inside_uow_commits_before_outer_ends(sqlite_session, account_repo):
+    other = sqlite_session()
+
+    with SQLiteUnitOfWork(sqlite_session):
+        with account_repo.atomic():
+            account_repo.save(Account(id=1, owner_id=1, balance=Money(10)))
+        # другая сессия видит запись до конца запроса
+        assert other.execute(text("SELECT balance_minor FROM accounts WHERE id = 1")).scalar() == 10_00
+
+
+def test_atomic_rereads_rows_committed_by_other_sessions(sqlite_session, account_repo):
+    account_repo.save(Account(id=1, owner_id=1, balance=Money(10)))
+
+    with SQLiteUnitOfWork(sqlite_session):
+        assert account_repo.get(1).balance == Money(10)
+        other = sqlite_session()
+        other.execute(text("UPDATE accounts SET balance_minor = 2500 WHERE id = 1"))
+        other.commit()
+
+        with account_repo.atomic():
+            assert account_repo.get(1).balance == Money(25)
+
+
+def test_locked_read_modify_write_under_request_uow_loses_no_updates(sqlite_session, account_repo):
+    account_repo.save(Account(id=1, owner_id=1, balance=Money(0)))
+    lock = threading.Lock()
+
+    def request():
+        for _ in range(10):
+            # запрос: сессия на весь запрос, блокировка сервиса — только на операцию
+            with SQLiteUnitOfWork(sqlite_session):
+                account_repo.get(1)
+                with lock, account_repo.atomic():
+                    acc = account_repo.get(1)
+                    acc.deposit(Money(1))
+                    account_repo.save(acc)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+
+    assert account_repo.get(1).balance == Money(80)
+
+
+def test_repo_outside_uow_uses_session_per_thread(account_repo):
+    sessions = []
+    t = threading.Thread(target=lambda: sessions.append(account_repo.db))
+    t.start()
+    t.join()
+
+    assert sessions[0] is not account_repo.db
+
+
+def test_uow_dependency_scopes_session_per_request(sqlite_session, monkeypatch):
+    import Infrastructure.api.dependencies as deps
+
+    monkeypatch.setattr(deps, "uow_factory", lambda: SQLiteUnitOfWork(sqlite_session))
+
+    app = FastAPI()
+    seen = []
+
+    @app.get("/probe")
+    def probe(uow=Depends(deps.get_unit_of_work)):
+        # sync-обработчик в threadpool видит сессию запроса
+        seen.append(current_session())
+        return {"same": current_session() is uow.session}
+
+    client = TestClient(app)
+    assert client.get("/probe").json() == {"same": True}
+    assert client.get("/probe").json() == {"same": True}
+    assert seen[0] is not seen[1]
+
+
+# ============================================================
+#                   ASYNC (aiosqlite) UNIT OF WORK
+# ============================================================
+
+@pytest.fixture
+def async_session_factory(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from Infrastructure.Persistence_Layer.sqlite.db import create_async_sqlite_engine
+
+    engine = create_async_sqlite_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def test_async_uow_runs_sync_repo_and_commits(sqlite_session, account_repo, async_session_factory):
+    import asyncio
+    from Infrastructure.Persistence_Layer.sqlite.async_unit_of_work import AsyncSQLiteUnitOfWork
+
+    async def scenario():
+        async with AsyncSQLiteUnitOfWork(async_session_factory) as uow:
+            await uow.run(account_repo.save, Account(id=1, owner_id=7, balance=Money(10)))
+            loaded = await uow.run(account_repo.get, 1)
+            assert loaded.owner_id == 7
+
+        with pytest.raises(RuntimeError):
+            async with AsyncSQLiteUnitOfWork(async_session_factory) as uow:
+                await uow.run(account_repo.save, Account(id=2, owner_id=7, balance=Money(10)))
+                raise RuntimeError("boom")
+
+    asyncio.run(scenario())
+
+    # sync-репозиторий (другое соединение) видит только закоммиченное
+    assert account_repo.get(1).owner_id == 7
+    with pytest.raises(KeyError):
+        account_repo.get(2)
+
+
+def test_async_uow_interleaves_requests_under_greenlet_locks(sqlite_session, async_session_factory, monkeypatch):
+    import asyncio
+    from Core_Domains.Warehouse.models import Cell
+    from Core_Domains.Warehouse.services import WarehouseService
+    from Infrastructure.Persistence_Layer.sqlite.async_unit_of_work import (
+        AsyncSQLiteUnitOfWork, GreenletLock
+    )
+    import Infrastructure.Persistence_Layer.sqlite.warehouse_repo as wr
+
+    monkeypatch.setattr(wr, "SessionLocal", sqlite_session)
+    wh = WarehouseService(
+        wr.SQLiteCellRepository(), wr.SQLiteStockRepository(),
+        wr.SQLiteStockMovementRepository(), wr.SQLiteInventorySessionRepository(),
+        lock_factory=GreenletLock,
+    )
+    wh.cell_repo.save(Cell(id=1, shelf_id=1, code="A", capacity=1000))
+
+    async def one_inbound():
+        async with AsyncSQLiteUnitOfWork(async_session_factory) as uow:
+            await uow.run(wh.inbound, 5, 1, 1)
+
+    async def scenario():
+        # 20 запросов на одну ячейку в одном потоке: threading.Lock здесь повесил бы loop
+        await asyncio.wait_for(asyncio.gather(*(one_inbound() for _ in range(20))), timeout=30)
+
+    asyncio.run(scenario())
+
+    assert wh.stock_repo.get(5, 1).quantity.amount == 20
+    assert wh.cell_repo.get(1).used == 20